@@ -7,10 +7,15 @@ import os
 import json
 import hashlib
 import time
+import threading
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 
+# The cost log is a single JSON list rewritten on every call; serialize updates so
+# concurrent summarizer threads don't drop each other's entries
+_cost_log_lock = threading.Lock()
+
 class APICostOptimizer:
     """API 비용 최적화를 위한 유틸리티 클래스"""
     
@@ -119,35 +124,36 @@ class APICostOptimizer:
             'estimated_cost_usd': round(cost, 6)
         }
         
-        # 기존 로그 읽기 (에러 처리 강화)
-        logs = []
-        if self.cost_log_file.exists():
-            try:
-                with open(self.cost_log_file, 'r') as f:
-                    content = f.read()
-                    if content.strip():  # 빈 파일이 아닌 경우만
-                        logs = json.loads(content)
-                        # 리스트가 아닌 경우 리스트로 변환
-                        if not isinstance(logs, list):
-                            logs = [logs]
-            except (json.JSONDecodeError, ValueError) as e:
-                print(f"⚠️ Warning: Corrupted cost log file, creating new one. Error: {e}")
-                # 백업 생성
-                backup_file = self.cost_log_file.with_suffix('.json.backup')
-                if self.cost_log_file.exists():
-                    import shutil
-                    shutil.copy(self.cost_log_file, backup_file)
-                    print(f"  Backup saved to: {backup_file}")
-                logs = []
+        with _cost_log_lock:
+            # 기존 로그 읽기 (에러 처리 강화)
+            logs = []
+            if self.cost_log_file.exists():
+                try:
+                    with open(self.cost_log_file, 'r') as f:
+                        content = f.read()
+                        if content.strip():  # 빈 파일이 아닌 경우만
+                            logs = json.loads(content)
+                            # 리스트가 아닌 경우 리스트로 변환
+                            if not isinstance(logs, list):
+                                logs = [logs]
+                except (json.JSONDecodeError, ValueError) as e:
+                    print(f"⚠️ Warning: Corrupted cost log file, creating new one. Error: {e}")
+                    # 백업 생성
+                    backup_file = self.cost_log_file.with_suffix('.json.backup')
+                    if self.cost_log_file.exists():
+                        import shutil
+                        shutil.copy(self.cost_log_file, backup_file)
+                        print(f"  Backup saved to: {backup_file}")
+                    logs = []
         
-        logs.append(log_entry)
+            logs.append(log_entry)
         
-        # 로그 저장 (안전하게)
-        try:
-            with open(self.cost_log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
-        except Exception as e:
-            print(f"⚠️ Failed to save cost log: {e}")
+            # 로그 저장 (안전하게)
+            try:
+                with open(self.cost_log_file, 'w') as f:
+                    json.dump(logs, f, indent=2)
+            except Exception as e:
+                print(f"⚠️ Failed to save cost log: {e}")
         
         return cost
     
@@ -121,20 +121,26 @@ def validate_env(required: Sequence[str] = ('ZOTERO_USER_ID', 'ZOTERO_API_KEY'))
     require_env(*required)
 
 
-def get_zotero_client(library_type: str = 'user'):
+def get_zotero_client(library_type: str = 'user', user_id: Optional[str] = None,
+                      api_key: Optional[str] = None):
     """Construct a pyzotero client from ZOTERO_USER_ID / ZOTERO_API_KEY.
 
+    Explicit ``user_id`` / ``api_key`` take precedence over the environment.
     Raises ConfigError with a clear message if either credential is missing.
     """
-    require_env('ZOTERO_USER_ID', 'ZOTERO_API_KEY')
+    user_id = user_id or os.getenv('ZOTERO_USER_ID')
+    api_key = api_key or os.getenv('ZOTERO_API_KEY')
+    missing = [name for name, value in (('ZOTERO_USER_ID', user_id), ('ZOTERO_API_KEY', api_key))
+               if not value]
+    if missing:
+        raise ConfigError(
+            f"Missing required environment variable(s): {', '.join(missing)}. "
+            f"Set them in your .env file."
+        )
     # Imported lazily so modules that only need config (not the Zotero API)
     # don't pay the pyzotero import cost.
     from pyzotero import zotero
-    return zotero.Zotero(
-        os.getenv('ZOTERO_USER_ID'),
-        library_type,
-        os.getenv('ZOTERO_API_KEY'),
-    )
+    return zotero.Zotero(user_id, library_type, api_key)
 
 
 def resolve_output_dir(required: bool = True, expand: bool = True) -> Optional[str]:
@@ -0,0 +1,201 @@
+"""
+Brute-Force Exact Search for Small Collections
+작은 ChromaDB 컬렉션을 메모리에 올려 정확한 코사인 top-k 검색
+"""
+
+import threading
+import numpy as np
+from typing import List, Dict, Optional, Any
+
+# SIMD cosine kernels (AVX2/AVX-512/NEON auto-dispatch); NumPy matmul otherwise
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+# Collections up to this size are scanned in memory instead of via HNSW
+BRUTE_FORCE_MAX_VECTORS = 5000
+
+# int8 mode: candidates per query re-scored in FP32 after the int8 scan
+INT8_RERANK_CANDIDATES = 100
+
+
+def _is_equality_filter(where: Optional[Dict]) -> bool:
+    """True for None or a flat {field: scalar} filter (no $and/$in operators)."""
+    if not where:
+        return True
+    return all(not key.startswith('$') and isinstance(value, (str, int, float, bool))
+               for key, value in where.items())
+
+
+def _quantize_int8(vectors: np.ndarray) -> np.ndarray:
+    """Symmetric per-row int8 quantization (cosine ignores the per-row scale)."""
+    peak = np.abs(vectors).max(axis=1, keepdims=True)
+    peak[peak == 0] = 1.0
+    return np.round(vectors * (127.0 / peak)).astype(np.int8)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+class BruteForceIndex:
+    """
+    In-memory mirror of a ChromaDB collection answering queries exactly.
+
+    query() mimics collection.query() so callers can use either interchangeably.
+    The mirror is loaded on first use and rebuilt after invalidate(); once the
+    collection grows past max_vectors, queries return None and the caller falls
+    back to ChromaDB.
+
+    With int8=True the full scan runs over an int8 copy of the corpus (a
+    quarter of the bytes per vector) and only the best INT8_RERANK_CANDIDATES
+    per query are re-scored against the FP32 vectors, so returned scores stay
+    exact.
+    """
+
+    def __init__(self, collection, max_vectors: int = BRUTE_FORCE_MAX_VECTORS, int8: bool = False):
+        """
+        Initialize the index (nothing is loaded until the first query).
+
+        Args:
+            collection: ChromaDB collection to mirror
+            max_vectors: Largest collection size scanned in memory
+            int8: Scan an int8-quantized corpus and re-rank candidates in FP32
+        """
+        self.collection = collection
+        self.max_vectors = max_vectors
+        self.int8 = int8
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._corpus: Optional[np.ndarray] = None
+        self._corpus_i8: Optional[np.ndarray] = None
+        self._norms_i8: Optional[np.ndarray] = None
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def invalidate(self):
+        """Drop the mirror so the next query reloads it (call after adding vectors)."""
+        with self._lock:
+            self._loaded = False
+            self._corpus = None
+            self._corpus_i8 = None
+            self._norms_i8 = None
+            self._columns = {}
+
+    def _load(self) -> bool:
+        """Load the collection if it is small enough; returns whether it is in memory."""
+        with self._lock:
+            if self._loaded:
+                return self._corpus is not None
+
+            self._loaded = True
+            if self.collection.count() > self.max_vectors:
+                return False
+
+            data = self.collection.get(include=["embeddings", "documents", "metadatas"])
+            corpus = np.asarray(data['embeddings'], dtype=np.float32)
+            if corpus.ndim != 2 or len(corpus) == 0:
+                return False
+
+            # Unit rows, so the NumPy path is a plain dot product
+            norms = np.linalg.norm(corpus, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._corpus = np.ascontiguousarray(corpus / norms)
+            if self.int8:
+                self._corpus_i8 = _quantize_int8(self._corpus)
+                self._norms_i8 = np.linalg.norm(self._corpus_i8.astype(np.float32), axis=1)
+                self._norms_i8[self._norms_i8 == 0] = 1.0
+            self._ids = list(data['ids'])
+            self._documents = list(data['documents'] or [''] * len(self._ids))
+            self._metadatas = [md or {} for md in (data['metadatas'] or [{}] * len(self._ids))]
+            return True
+
+    def _mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Boolean row mask for an equality filter (None means all rows)."""
+        if not where:
+            return None
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, value in where.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = np.empty(len(self._metadatas), dtype=object)
+                column[:] = [md.get(key) for md in self._metadatas]
+                self._columns[key] = column
+            mask &= column == value
+        return mask
+
+    def _scores(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Cosine similarity of each query against the (selected) corpus rows."""
+        corpus = self._corpus if rows is None else self._corpus[rows]
+        if SIMSIMD_AVAILABLE:
+            return 1.0 - np.asarray(simsimd.cdist(queries, corpus, metric="cosine"))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (queries / norms) @ corpus.T
+
+    def _scores_int8(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Approximate cosine of each query against the int8 corpus rows."""
+        corpus = self._corpus_i8 if rows is None else self._corpus_i8[rows]
+        queries = _quantize_int8(queries)
+        if SIMSIMD_AVAILABLE:
+            return 1.0 - np.asarray(simsimd.cdist(queries, corpus, metric="cosine"))
+        norms = self._norms_i8 if rows is None else self._norms_i8[rows]
+        query_norms = np.linalg.norm(queries.astype(np.float32), axis=1, keepdims=True)
+        query_norms[query_norms == 0] = 1.0
+        dots = queries.astype(np.int32) @ corpus.astype(np.int32).T
+        return dots / (query_norms * norms)
+
+    def query(self,
+              query_embeddings: List[Any],
+              n_results: int = 10,
+              where: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Exact top-k cosine search shaped like collection.query() output.
+
+        Args:
+            query_embeddings: One or more query vectors
+            n_results: Number of results per query
+            where: Optional equality metadata filter
+
+        Returns:
+            Dict of ids/documents/metadatas/distances (one list per query), or
+            None when the collection is too large or the filter unsupported
+        """
+        if not _is_equality_filter(where) or not self._load():
+            return None
+
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        mask = self._mask(where)
+        rows = None if mask is None else np.flatnonzero(mask)
+
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        if rows is not None and len(rows) == 0:
+            for key in results:
+                results[key] = [[] for _ in queries]
+            return results
+
+        scores = self._scores_int8(queries, rows) if self.int8 else self._scores(queries, rows)
+        n = scores.shape[1]
+        k = min(n_results, n)
+        for query, row_scores in zip(queries, scores):
+            if self.int8:
+                # Re-score the int8 shortlist exactly against the FP32 vectors
+                candidates = _top_k(row_scores, min(max(k, INT8_RERANK_CANDIDATES), n))
+                exact = self._scores(query[None, :], candidates if rows is None else rows[candidates])[0]
+                order = _top_k(exact, k)
+                top, top_scores = candidates[order], exact[order]
+            else:
+                top = _top_k(row_scores, k)
+                top_scores = row_scores[top]
+            hits = top if rows is None else rows[top]
+            results['ids'].append([self._ids[i] for i in hits])
+            results['documents'].append([self._documents[i] for i in hits])
+            results['metadatas'].append([dict(self._metadatas[i]) for i in hits])
+            results['distances'].append((1.0 - top_scores).tolist())
+        return results
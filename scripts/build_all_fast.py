@@ -89,6 +89,9 @@ def process_image_batch(papers_batch):
                 'status': 'error',
                 'images': 0
             })
+
+    # Write the images still buffered for ChromaDB and release this batch's instance
+    image_rag.close()
     return results
 
 
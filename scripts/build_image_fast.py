@@ -151,6 +151,9 @@ def build_image_database_fast():
                     'Speed': f"{stats['success']/(time.time()-start_time)*60:.1f}/min"
                 })
 
+    # Write the images still buffered for ChromaDB
+    image_rag.flush()
+
     elapsed = time.time() - start_time
 
     # Final report
@@ -150,6 +150,8 @@ class MultimodalRAGBuilder:
                     print(f"  ❌ Error processing {paper_id}: {e}")
                     self.stats['errors'].append(f"Image/{paper_id}: {str(e)}")
 
+            # Write the images still buffered for ChromaDB
+            self.image_rag.flush()
             print(f"\n✅ Image DB complete: {self.stats['images']} images")
 
         except Exception as e:
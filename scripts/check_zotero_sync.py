@@ -2,28 +2,123 @@
 Diagnostic script to check Zotero sync status and file availability.
 """
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from dotenv import dotenv_values
 from app_config import get_zotero_client
 from zotero_path_finder import get_default_pdf_dir
 
+# Zotero data directory detection probes several filesystem locations; do it once per process
+_get_pdf_dir = lru_cache(maxsize=1)(get_default_pdf_dir)
+
+# Keep concurrency low to stay within Zotero API rate limits
+API_WORKERS = 4
+
+_thread_local = threading.local()
+_backoff_lock = threading.Lock()
+_backoff_until = 0.0
+# (user_id, api_key) parsed from .env by check_zotero_sync(); passed to every client
+_credentials = (None, None)
+
+def _thread_client():
+    """One Zotero client per worker thread (pyzotero clients keep per-request state)."""
+    if not hasattr(_thread_local, 'zot'):
+        user_id, api_key = _credentials
+        _thread_local.zot = get_zotero_client(user_id=user_id, api_key=api_key)
+    return _thread_local.zot
+
+def _wait_for_backoff():
+    """Sleep until any server-requested pause has elapsed."""
+    with _backoff_lock:
+        wait = _backoff_until - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+
+def _note_backoff(zot):
+    """Pause all workers if the last response carried a Backoff or Retry-After header."""
+    global _backoff_until
+    response = getattr(zot, 'request', None)
+    headers = getattr(response, 'headers', None) or {}
+    delay = headers.get('Backoff') or headers.get('Retry-After')
+    if not delay:
+        return
+    try:
+        delay = float(delay)
+    except ValueError:
+        return
+    with _backoff_lock:
+        _backoff_until = max(_backoff_until, time.monotonic() + delay)
+    print(f"   ⏸️  Zotero asked to back off for {delay:.0f}s")
+
+def _zotero_call(fn, *args):
+    """Run one Zotero API call, honoring the shared backoff window before and after."""
+    zot = _thread_client()
+    _wait_for_backoff()
+    try:
+        return fn(zot, *args)
+    finally:
+        _note_backoff(zot)
+
+def _scan_local_storage(storage_dir, keys):
+    """Map storage key -> {filename: size} with one directory listing per key.
+
+    Only the attachment directories we need are listed, so the cost doesn't grow
+    with the size of the whole library.
+    """
+    index = {}
+    for key in keys:
+        files = {}
+        try:
+            with os.scandir(os.path.join(storage_dir, key)) as it:
+                for entry in it:
+                    if entry.is_file():
+                        files[entry.name] = entry.stat().st_size
+        except OSError:
+            pass
+        index[key] = files
+    return index
+
+def _check_item_remote(item):
+    """Fetch an item's PDF attachments and probe each on the server.
+
+    Returns (pdf_attachments, server_status) where server_status maps attachment
+    key to 'ok', 'empty', '404' or the exception type name.
+    """
+    attachments = _zotero_call(lambda zot, key: zot.children(key), item['key'])
+    pdf_attachments = [a for a in attachments if a['data'].get('contentType') == 'application/pdf']
+
+    server_status = {}
+    for att in pdf_attachments:
+        file_key = att['data'].get('key', '')
+        try:
+            file_info = _zotero_call(lambda zot, key: zot.file(key), file_key)
+            server_status[file_key] = 'ok' if file_info else 'empty'
+        except Exception as e:
+            server_status[file_key] = '404' if '404' in str(e) else type(e).__name__
+    return pdf_attachments, server_status
+
 def check_zotero_sync():
     """Check Zotero sync status and file availability."""
-    # Load environment
+    global _credentials
+    # Read .env without mutating os.environ; real environment variables still apply
     env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-    load_dotenv(env_path)
+    config = dotenv_values(env_path)
     
-    user_id = os.getenv('ZOTERO_USER_ID')
-    api_key = os.getenv('ZOTERO_API_KEY')
+    user_id = config.get('ZOTERO_USER_ID') or os.getenv('ZOTERO_USER_ID')
+    api_key = config.get('ZOTERO_API_KEY') or os.getenv('ZOTERO_API_KEY')
     
     if not user_id or not api_key:
         print("❌ Missing ZOTERO_USER_ID or ZOTERO_API_KEY in .env file")
         return
     
+    _credentials = (user_id, api_key)
     print(f"🔍 Checking Zotero sync status for user {user_id}...\n")
     
     try:
         # Initialize Zotero API
-        zot = get_zotero_client()
+        zot = get_zotero_client(user_id=user_id, api_key=api_key)
         
         # Get storage info
         print("📊 Storage Information:")
@@ -38,18 +133,23 @@ def check_zotero_sync():
         print("\n📄 Checking recent items with PDFs:")
         items = zot.items(limit=5, itemType='journalArticle')
         
-        pdf_base_dir = get_default_pdf_dir()
+        pdf_base_dir = _get_pdf_dir()
         items_with_pdfs = 0
         items_with_sync = 0
         
-        for item in items:
+        # Fetch attachments and probe the server for all items concurrently;
+        # results are reported below in the original item order
+        with ThreadPoolExecutor(max_workers=API_WORKERS) as executor:
+            remote_results = list(executor.map(_check_item_remote, items))
+        
+        # List every needed attachment directory once instead of stat-ing each file
+        attachment_keys = {att['data'].get('key', '') for pdf_attachments, _ in remote_results for att in pdf_attachments}
+        local_index = _scan_local_storage(os.path.join(pdf_base_dir, 'storage'), attachment_keys)
+        
+        for item, (pdf_attachments, server_status) in zip(items, remote_results):
             title = item['data'].get('title', 'Unknown')[:50]
             print(f"\n   📖 {title}")
             
-            # Get attachments
-            attachments = zot.children(item['key'])
-            pdf_attachments = [a for a in attachments if a['data'].get('contentType') == 'application/pdf']
-            
             if not pdf_attachments:
                 print(f"      ⚠️  No PDF attachments")
                 continue
@@ -65,27 +165,23 @@ def check_zotero_sync():
                 print(f"         Key: {file_key}")
                 
                 # Check local file
-                local_path = os.path.join(pdf_base_dir, 'storage', file_key, filename)
-                if os.path.exists(local_path):
-                    size = os.path.getsize(local_path)
+                size = local_index.get(file_key, {}).get(filename)
+                if size is not None:
                     print(f"         ✓ Local: {size:,} bytes")
                 else:
                     print(f"         ✗ Not found locally")
                 
-                # Try to check if it's on server
-                try:
-                    # Test if we can access file info
-                    file_info = zot.file(file_key)
-                    if file_info:
-                        items_with_sync += 1
-                        print(f"         ✓ Available on Zotero server")
-                    else:
-                        print(f"         ⚠️  Empty response from server")
-                except Exception as e:
-                    if '404' in str(e):
-                        print(f"         ✗ Not synced to Zotero server (404)")
-                    else:
-                        print(f"         ⚠️  Server check failed: {type(e).__name__}")
+                # Server availability (probed above)
+                status = server_status.get(file_key)
+                if status == 'ok':
+                    items_with_sync += 1
+                    print(f"         ✓ Available on Zotero server")
+                elif status == 'empty':
+                    print(f"         ⚠️  Empty response from server")
+                elif status == '404':
+                    print(f"         ✗ Not synced to Zotero server (404)")
+                else:
+                    print(f"         ⚠️  Server check failed: {status}")
         
         # Summary
         print(f"\n📈 Summary:")
@@ -6,6 +6,7 @@ vector_db_builder.py에서 사용할 JSON 파일 생성
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 스크립트 디렉토리를 path에 추가
@@ -14,49 +15,113 @@ sys.path.insert(0, 'scripts')
 
 from zotero_path_finder import get_default_pdf_dir
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# storage/ 하위 디렉토리 스캔은 I/O 대기 위주이므로 스레드를 넉넉히 사용
+SCAN_WORKERS = 32
+
+
+def _make_entry(pdf_path, filename, storage_key):
+    """배치 파일의 논문 항목 하나 생성"""
+    return {
+        'pdf_path': pdf_path,
+        'paper_id': storage_key,
+        'metadata': {
+            'filename': filename,
+            'storage_key': storage_key
+        }
+    }
+
+
+def _scan_storage_dir(subdir):
+    """storage/XXXXXXXX/ 디렉토리 하나에서 PDF 항목 추출"""
+    storage_key = os.path.basename(subdir)
+    entries = []
+    try:
+        with os.scandir(subdir) as it:
+            for entry in it:
+                if entry.name.lower().endswith('.pdf') and entry.is_file():
+                    entries.append(_make_entry(entry.path, entry.name, storage_key))
+    except OSError as e:
+        print(f"⚠️ 디렉토리 읽기 실패: {subdir} ({e})")
+    return entries
+
+
+def _find_storage_pdfs(storage_dir):
+    """storage/의 8자리 키 디렉토리들을 스레드 풀로 병렬 스캔 (항목을 하나씩 yield)"""
+    with os.scandir(storage_dir) as it:
+        subdirs = [e.path for e in it if len(e.name) == 8 and e.is_dir()]
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        for entries in executor.map(_scan_storage_dir, subdirs):
+            yield from entries
+
+
+def _walk_pdfs(pdf_dir):
+    """storage/ 폴더가 없는 비표준 위치용: 전체 트리를 순회하며 PDF 찾기 (항목을 하나씩 yield)"""
+    for root, dirs, files in os.walk(pdf_dir):
+        # storage 키는 PDF가 들어있는 디렉토리 이름 (storage/XXXXXXXX/) — 디렉토리당 한 번만 계산
+        storage_key = os.path.basename(root)
+        if len(storage_key) != 8 or os.path.basename(os.path.dirname(root)) != 'storage':
+            continue
+        for file in files:
+            if file.lower().endswith('.pdf'):
+                yield _make_entry(os.path.join(root, file), file, storage_key)
+
+
+def _dumps_entry(entry):
+    """항목 하나를 UTF-8 JSON 바이트로 직렬화 (orjson 우선)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(entry, option=orjson.OPT_INDENT_2)
+    return json.dumps(entry, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _write_batch_json(entries, output_file):
+    """항목을 하나씩 JSON 배열로 기록 (전체 목록을 메모리에 모으지 않음). 기록한 개수 반환"""
+    count = 0
+    with open(output_file, 'wb') as f:
+        f.write(b'[')
+        for entry in entries:
+            f.write(b',\n' if count else b'\n')
+            f.write(_dumps_entry(entry))
+            count += 1
+        f.write(b'\n]\n' if count else b']\n')
+    return count
+
+
 def create_batch_file():
     """모든 PDF 정보를 담은 배치 파일 생성"""
-    
+
     pdf_dir = get_default_pdf_dir()
     print(f"📂 Zotero 디렉토리: {pdf_dir}")
-    
-    papers = []
-    
-    # 모든 PDF 찾기
-    for root, dirs, files in os.walk(pdf_dir):
-        for file in files:
-            if file.lower().endswith('.pdf'):
-                pdf_path = os.path.join(root, file)
-                
-                # storage 키 추출
-                parts = pdf_path.split(os.sep)
-                for i, part in enumerate(parts):
-                    if part == 'storage' and i + 1 < len(parts):
-                        storage_key = parts[i + 1]
-                        if len(storage_key) == 8:
-                            papers.append({
-                                'pdf_path': pdf_path,
-                                'paper_id': storage_key,
-                                'metadata': {
-                                    'filename': file,
-                                    'storage_key': storage_key
-                                }
-                            })
-                            break
-    
-    print(f"📄 발견된 PDF: {len(papers)}개")
-    
-    # JSON 파일로 저장
+
+    # 모든 PDF 찾기 (PDF_DIR이 storage/ 자체를 가리키는 경우도 처리)
+    if os.path.basename(os.path.normpath(pdf_dir)) == 'storage':
+        storage_dir = pdf_dir
+    else:
+        storage_dir = os.path.join(pdf_dir, 'storage')
+
+    if os.path.isdir(storage_dir):
+        papers = _find_storage_pdfs(storage_dir)
+    else:
+        papers = _walk_pdfs(pdf_dir)
+
+    # JSON 파일로 저장 (스캔 결과를 바로 스트리밍 기록)
     output_file = 'papers_batch.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(papers, f, ensure_ascii=False, indent=2)
-    
+    count = _write_batch_json(papers, output_file)
+
+    print(f"📄 발견된 PDF: {count}개")
+
     print(f"✅ 배치 파일 생성 완료: {output_file}")
     print(f"\n사용법:")
     print(f"  python scripts/vector_db_builder.py --batch {output_file}")
     print(f"  python scripts/vector_db_builder.py --batch {output_file} --db pinecone")
-    
+
     return output_file
 
 if __name__ == "__main__":
-    create_batch_file()
\ No newline at end of file
+    create_batch_file()
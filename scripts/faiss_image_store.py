@@ -0,0 +1,236 @@
+"""
+FAISS Image Store
+ChromaDB 대신 FAISS HNSW 인덱스 + SQLite 메타데이터로 이미지 벡터 저장
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+from typing import List, Dict, Optional, Any
+
+import faiss
+
+from brute_force_search import _is_equality_filter
+
+# SQLite bound-parameter limit is 999 on older builds
+_IN_BATCH_SIZE = 900
+
+INDEX_FILE = "image_faiss.index"
+METADATA_FILE = "image_faiss.sqlite"
+
+
+def _unit_rows(vectors: Any) -> np.ndarray:
+    """float32 copy with unit-length rows (inner product == cosine)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32)).copy()
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class FaissImageStore:
+    """
+    Collection-like image store: FAISS HNSW over unit vectors plus an SQLite
+    table of documents and metadata keyed by the FAISS row id.
+
+    add/query/get/count mirror the ChromaDB collection calls ImageRAGCLIP
+    makes, so its ChromaDB code paths work unchanged. Writes stay in memory
+    and in an open SQLite transaction until persist(), which writes the index
+    file first and then commits, so the metadata never references vectors
+    missing from the saved index.
+    """
+
+    def __init__(self, path: str, dim: int, hnsw_m: int = 32, ef_search: int = 64):
+        """
+        Open (or create) the store under path.
+
+        Args:
+            path: Directory for the index file and SQLite database
+            dim: Embedding dimension
+            hnsw_m: HNSW graph degree for a new index
+            ef_search: HNSW search breadth
+        """
+        os.makedirs(path, exist_ok=True)
+        self.index_path = os.path.join(path, INDEX_FILE)
+        self._lock = threading.Lock()
+        self.unsaved = 0
+
+        if os.path.exists(self.index_path):
+            self.index = faiss.read_index(self.index_path)
+        else:
+            self.index = faiss.IndexIDMap2(
+                faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT))
+        faiss.downcast_index(self.index.index).hnsw.efSearch = ef_search
+
+        # Writes come from the background writer thread; every access holds _lock
+        self.conn = sqlite3.connect(os.path.join(path, METADATA_FILE), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                row INTEGER PRIMARY KEY,
+                image_id TEXT UNIQUE NOT NULL,
+                paper_id TEXT,
+                document TEXT,
+                metadata TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_paper ON images(paper_id)")
+        self.conn.commit()
+
+        # Continue after the highest id in either file (the index may hold
+        # rows whose metadata commit never happened)
+        max_row = self.conn.execute("SELECT MAX(row) FROM images").fetchone()[0]
+        ids = faiss.vector_to_array(self.index.id_map)
+        self._next_row = max(max_row if max_row is not None else -1,
+                             int(ids.max()) if len(ids) else -1) + 1
+
+    def _select_in(self, query: str, values: List[Any]) -> List[tuple]:
+        """Run query with its '{placeholders}' IN list filled, in batches."""
+        rows = []
+        for start in range(0, len(values), _IN_BATCH_SIZE):
+            batch = values[start:start + _IN_BATCH_SIZE]
+            rows.extend(self.conn.execute(
+                query.format(placeholders=','.join('?' * len(batch))), batch))
+        return rows
+
+    def _where_sql(self, where: Optional[Dict]):
+        """SQL condition and parameters for an equality metadata filter."""
+        if not where:
+            return "1", []
+        if not _is_equality_filter(where):
+            raise ValueError(f"FAISS image store supports equality filters only: {where}")
+        clauses, params = [], []
+        for key, value in where.items():
+            if key == 'paper_id':
+                clauses.append("paper_id = ?")
+            else:
+                clauses.append(f"json_extract(metadata, '$.{key}') = ?")
+            params.append(value)
+        return " AND ".join(clauses), params
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def add(self,
+            ids: List[str],
+            documents: List[str],
+            embeddings: Any,
+            metadatas: List[Dict]):
+        """Add new vectors; ids already stored are skipped (as ChromaDB does)."""
+        vectors = _unit_rows(embeddings)
+        with self._lock:
+            stored = {row[0] for row in self._select_in(
+                "SELECT image_id FROM images WHERE image_id IN ({placeholders})", list(ids))}
+            new = []
+            for i, image_id in enumerate(ids):
+                if image_id not in stored:
+                    stored.add(image_id)
+                    new.append(i)
+            if not new:
+                return
+
+            rows = np.arange(self._next_row, self._next_row + len(new), dtype=np.int64)
+            self.index.add_with_ids(vectors[new], rows)
+            self.conn.executemany(
+                "INSERT INTO images (row, image_id, paper_id, document, metadata) VALUES (?, ?, ?, ?, ?)",
+                [(int(row), ids[i], metadatas[i].get('paper_id'), documents[i],
+                  json.dumps(metadatas[i], ensure_ascii=False))
+                 for row, i in zip(rows, new)]
+            )
+            self._next_row += len(new)
+            self.unsaved += len(new)
+
+    def persist(self):
+        """Write the index file, then commit the metadata written since the last persist."""
+        with self._lock:
+            if not self.unsaved:
+                return
+            tmp = f"{self.index_path}.tmp"
+            faiss.write_index(self.index, tmp)
+            os.replace(tmp, self.index_path)
+            self.conn.commit()
+            self.unsaved = 0
+
+    def _records(self, rows: List[int]) -> Dict[int, tuple]:
+        """row id -> (image_id, document, metadata) for the given rows."""
+        return {row: (image_id, document, json.loads(metadata))
+                for row, image_id, document, metadata in self._select_in(
+                    "SELECT row, image_id, document, metadata FROM images "
+                    "WHERE row IN ({placeholders})", rows)}
+
+    def query(self,
+              query_embeddings: List[Any],
+              n_results: int = 10,
+              where: Optional[Dict] = None) -> Dict:
+        """
+        Top-k cosine search shaped like collection.query() output.
+
+        Unfiltered queries go through HNSW; filtered ones score the matching
+        rows exactly (filters such as a paper_id select few rows).
+        """
+        queries = _unit_rows(query_embeddings)
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+
+        with self._lock:
+            if where:
+                condition, params = self._where_sql(where)
+                candidates = np.array([row for (row,) in self.conn.execute(
+                    f"SELECT row FROM images WHERE {condition}", params)], dtype=np.int64)
+                if len(candidates):
+                    vectors = np.vstack([self.index.reconstruct(int(row)) for row in candidates])
+                    scores = queries @ vectors.T
+                    k = min(n_results, len(candidates))
+                    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+                    hits = candidates[order]
+                    hit_scores = np.take_along_axis(scores, order, axis=1)
+                else:
+                    hits = np.empty((len(queries), 0), dtype=np.int64)
+                    hit_scores = np.empty((len(queries), 0), dtype=np.float32)
+            elif self.index.ntotal:
+                hit_scores, hits = self.index.search(queries, min(n_results, self.index.ntotal))
+            else:
+                hits = np.empty((len(queries), 0), dtype=np.int64)
+                hit_scores = np.empty((len(queries), 0), dtype=np.float32)
+
+            records = self._records(sorted({int(row) for row in hits.ravel() if row >= 0}))
+
+        for row_hits, row_scores in zip(hits, hit_scores):
+            ids, documents, metadatas, distances = [], [], [], []
+            for row, score in zip(row_hits.tolist(), row_scores.tolist()):
+                record = records.get(row)
+                if record is None:
+                    continue
+                ids.append(record[0])
+                documents.append(record[1])
+                metadatas.append(record[2])
+                distances.append(1.0 - score)
+            results['ids'].append(ids)
+            results['documents'].append(documents)
+            results['metadatas'].append(metadatas)
+            results['distances'].append(distances)
+        return results
+
+    def get(self,
+            where: Optional[Dict] = None,
+            limit: Optional[int] = None,
+            include: Optional[List[str]] = None) -> Dict:
+        """Metadata lookup shaped like collection.get() output (no vectors)."""
+        condition, params = self._where_sql(where)
+        sql = f"SELECT image_id, document, metadata FROM images WHERE {condition} ORDER BY row"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = params + [limit]
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return {
+            'ids': [image_id for image_id, _, _ in rows],
+            'documents': [document for _, document, _ in rows],
+            'metadatas': [json.loads(metadata) for _, _, metadata in rows],
+        }
+
+    def close(self):
+        """Persist pending writes and close the metadata database."""
+        self.persist()
+        with self._lock:
+            self.conn.close()
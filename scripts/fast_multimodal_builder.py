@@ -105,6 +105,9 @@ def build_image_db_fast(papers: List[Dict], workers: int = 8):
                     'Images': stats['images']
                 })
 
+    # Write the images still buffered for ChromaDB
+    image_rag.flush()
+
     # Print final statistics
     print(f"\n📊 Image Processing Complete:")
     print(f"  ✅ Success: {stats['success']}/{stats['total']}")
@@ -3,34 +3,23 @@ Generate summaries using Google Gemini API with multimodal support.
 """
 import os
 import time
+import random
 import base64
+import hashlib
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from typing import List, Dict, Optional
 import google.generativeai as genai
+from google.generativeai import caching
 from text_extractor import encode_image_to_base64
+from api_cost_optimizer import APICostOptimizer
 
-def configure_gemini():
-    """Configure Gemini API with API key from environment."""
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY environment variable not set")
-    genai.configure(api_key=api_key)
-
-def summarize_text_with_retry(text: str, prompt: str, model: str = None, max_tokens: int = 500, max_retries: int = 3) -> str:
-    """Generate summary using Gemini API with retry logic for rate limits and errors."""
-    if not text or not text.strip():
-        return "No text available for summarization."
-    
-    model_name = model or os.getenv('GEMINI_MODEL', 'gemini-2.5-pro')
-    
-    configure_gemini()
-    model = genai.GenerativeModel(model_name)
-    
-    # Truncate text if too long
-    max_input_length = 800000  # Gemini 1.5 Pro supports ~1M tokens
-    if len(text) > max_input_length:
-        text = text[:max_input_length] + "... [truncated]"
-    
-    full_prompt = f"""당신은 최고 수준의 학술 논문 분석 전문가입니다.
+# Static instruction blocks shared by every call. Kept at module scope and sent as their
+# own content part, so the request starts with a stable prefix (implicit caching) and
+# they can be used as the system instruction of an explicit context cache.
+_RULES_TEXT = """당신은 최고 수준의 학술 논문 분석 전문가입니다.
 
 🔴 절대 규칙:
 1. 오직 제공된 논문 텍스트에 명시된 내용만 사용하세요
@@ -44,33 +33,322 @@ def summarize_text_with_retry(text: str, prompt: str, model: str = None, max_tok
 - 저자가 사용한 용어와 표현을 그대로 사용
 - 논문의 각 섹션(Introduction, Methods, Results, Discussion)에서 정보 추출
 - 한국어로 명확하고 전문적으로 작성
-- 학술적 정확성과 객관성 유지
+- 학술적 정확성과 객관성 유지"""
 
-{prompt}
+_RULES_IMAGES = """당신은 학술 논문을 정확하게 요약하는 전문가입니다. 
+
+중요한 규칙:
+1. 제공된 텍스트와 이미지에 명시적으로 보이는 내용만을 요약하세요.
+2. 이미지의 그래프, 차트, 표, 다이어그램을 분석하여 핵심 정보를 추출하세요.
+3. 이미지에 나타난 수치 데이터, 트렌드, 패턴을 정확히 설명하세요.
+4. 텍스트와 이미지 정보를 종합하여 일관성 있게 요약하세요.
+5. 추측하거나 일반적인 지식을 추가하지 마세요.
+6. 한국어로 명확하고 간결하게 작성하세요."""
+
+_IMAGE_MIME_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+    '.gif': 'image/gif',
+}
+
+_IMAGES_INTRO = "아래는 논문에서 추출된 이미지들입니다. 각 이미지를 분석하여 요약에 포함하세요:"
+
+# Input token budget for the paper text (Gemini context is ~1M tokens)
+_TOKEN_BUDGET = 900000
+
+# Gemini rejects explicit caches below this many input tokens
+_MIN_CACHE_TOKENS = 4096
+_CACHE_TTL_MINUTES = 10
+
+_paper_caches = {}
+_paper_caches_lock = threading.Lock()
+
+# Papers (by image cache text hash) for which Gemini already refused the multimodal request
+_multimodal_refused = set()
+_multimodal_refused_lock = threading.Lock()
+
+class _MultimodalUnavailable(Exception):
+    """Raised by summarize_with_images when the multimodal request is blocked or fails."""
+
+def configure_gemini():
+    """Configure Gemini API with API key from environment."""
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable not set")
+    genai.configure(api_key=api_key)
+
+@lru_cache(maxsize=1)
+def _configure_once():
+    """Configure the SDK on first use only (a failed attempt is not cached and is retried)."""
+    configure_gemini()
+
+@lru_cache(maxsize=4)
+def _get_model(model_name: str):
+    """Shared GenerativeModel per model name, so calls reuse one client and its connections."""
+    _configure_once()
+    return genai.GenerativeModel(model_name)
+
+def _estimate_tokens(text: str) -> int:
+    """Conservative token estimate (~3 UTF-8 bytes per token for mixed Korean/CJK/English).
+
+    Character counts undercount CJK text, where one character is often more than
+    one token.
+    """
+    return len(text.encode('utf-8')) // 3
+
+@lru_cache(maxsize=8)
+def _count_tokens(model_name: str, text: str) -> int:
+    """Exact token count from the Gemini tokenizer (memoized per model and text)."""
+    return _get_model(model_name).count_tokens(text).total_tokens
+
+def _truncate_to_token_budget(text: str, model_name: str, budget: int = _TOKEN_BUDGET) -> str:
+    """Truncate paper text to stay within the Gemini context window, measured in tokens.
+
+    The byte-based estimate decides cheaply whether truncation is needed; only then
+    is the model's tokenizer asked for the exact count at the cut point.
+    """
+    if _estimate_tokens(text) <= budget:
+        return text
+
+    text = text.encode('utf-8')[:budget * 3].decode('utf-8', errors='ignore')
+    try:
+        tokens = _count_tokens(model_name, text)
+        if tokens > budget:
+            text = text[:int(len(text) * budget / tokens)]
+    except Exception as e:
+        print(f"Token count unavailable, using estimate-based truncation: {e}")
+    return text + "... [truncated]"
+
+def _paper_cache_key(text: str, model_name: str, system_instruction: str) -> str:
+    return hashlib.sha256(f"{model_name}\x00{system_instruction}\x00{text}".encode('utf-8')).hexdigest()
+
+def _get_or_create_paper_cache(text: str, model_name: str, system_instruction: str,
+                               ttl_minutes: int = _CACHE_TTL_MINUTES):
+    """Create (or reuse) an explicit context cache holding the rules + paper text.
+
+    Every prompt for a paper is sent against the same body, so caching it once
+    bills the repeated input at the cached-token rate. Returns None when the text
+    is below Gemini's caching minimum or cache creation fails; callers then use
+    the regular uncached path.
+    """
+    if _estimate_tokens(text) < _MIN_CACHE_TOKENS:
+        return None
+
+    key = _paper_cache_key(text, model_name, system_instruction)
+    with _paper_caches_lock:
+        cache = _paper_caches.get(key)
+    if cache is not None:
+        return cache
+
+    try:
+        _configure_once()
+        cache = caching.CachedContent.create(
+            model=model_name,
+            system_instruction=system_instruction,
+            contents=["논문 내용:", text],
+            ttl=datetime.timedelta(minutes=ttl_minutes),
+        )
+    except Exception as e:
+        print(f"Context cache unavailable, sending full text per call: {e}")
+        return None
+
+    with _paper_caches_lock:
+        _paper_caches[key] = cache
+    return cache
+
+def _release_paper_cache(cache) -> None:
+    """Delete a paper cache once all calls for the paper are done (storage is billed per hour)."""
+    if cache is None:
+        return
+    with _paper_caches_lock:
+        for key in [k for k, v in _paper_caches.items() if v is cache]:
+            del _paper_caches[key]
+    try:
+        cache.delete()
+    except Exception as e:
+        print(f"Failed to delete context cache: {e}")
+
+def _image_mime_type(image_path: str) -> str:
+    """MIME type from the file extension, so non-PNG inputs aren't mislabelled."""
+    return _IMAGE_MIME_TYPES.get(os.path.splitext(image_path)[1].lower(), 'image/png')
+
+@lru_cache(maxsize=8)
+def _load_image_parts(image_keys: tuple) -> tuple:
+    """Read images once and build their labelled content parts.
+
+    `image_keys` is a tuple of (path, filename, page, width, height). Memoized so
+    the several prompts sent for one paper share the same bytes instead of
+    re-reading every file per call. Missing files are skipped.
+    """
+    parts = []
+    for i, (image_path, filename, page, width, height) in enumerate(image_keys):
+        try:
+            if os.path.exists(image_path):
+                # Read and encode image
+                with open(image_path, "rb") as f:
+                    image_data = f.read()
+                
+                # Create image part
+                image_part = {
+                    'mime_type': _image_mime_type(image_path),
+                    'data': image_data
+                }
+                parts.append(f"\n\n[이미지 {i+1}: 페이지 {page}, {width}x{height}]")
+                parts.append(image_part)
+        except Exception as e:
+            print(f"Failed to load image {filename or 'unknown'}: {e}")
+            continue
+    return tuple(parts)
 
-논문 내용:
-{text}"""
+def _build_image_parts(images: Optional[List[Dict]]) -> List:
+    """Content parts (label + image) for up to 5 images, limited to avoid token limits and safety issues."""
+    image_keys = []
+    for img_info in (images or [])[:5]:
+        try:
+            image_keys.append((img_info['path'], img_info.get('filename'),
+                               img_info['page'], img_info['width'], img_info['height']))
+        except KeyError as e:
+            print(f"Failed to load image {img_info.get('filename', 'unknown')}: missing {e}")
+    return list(_load_image_parts(tuple(image_keys)))
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-requested delay from a wrapped HTTP error's Retry-After header, if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+def _next_backoff(previous: float, base: float = 5, cap: float = 60) -> float:
+    """Decorrelated jitter: parallel workers hitting the quota together wake at different times."""
+    return random.uniform(base, min(cap, previous * 3))
+
+@lru_cache(maxsize=1)
+def _shared_response_cache() -> APICostOptimizer:
+    """One APICostOptimizer for every call (creating one makes directories and its cost table)."""
+    return APICostOptimizer()
+
+def _response_cache(use_cache: bool) -> Optional[APICostOptimizer]:
+    """On-disk response cache (24h), unless disabled by argument or GEMINI_RESPONSE_CACHE=false."""
+    if not use_cache or os.getenv('GEMINI_RESPONSE_CACHE', 'true').lower() == 'false':
+        return None
+    return _shared_response_cache()
+
+def _image_cache_text(text: str, images: Optional[List[Dict]]) -> str:
+    """Response-cache key text for multimodal calls: includes the image set so
+    text-only and multimodal answers don't collide."""
+    img_signature = ":".join(
+        (img.get('filename', '') or os.path.basename(img.get('path', '')))
+        for img in (images or [])[:5]
+    )
+    return text + f"\n[IMG:{img_signature}]"
+
+def _lookup_cached_responses(text: str, images: Optional[List[Dict]], prompts: List[str]) -> Optional[List[str]]:
+    """Return cached responses for all prompts, or None if any is missing.
+
+    Lets the generate_* functions skip creating a context cache (billed on
+    creation) when a re-run would be served entirely from the response cache.
+    """
+    response_cache = _response_cache(True)
+    if not response_cache:
+        return None
+    if images and len(images) > 0:
+        model_name = os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
+        cache_text = _image_cache_text(text, images)
+    else:
+        model_name = os.getenv('GEMINI_MODEL', 'gemini-2.5-pro')
+        cache_text = text
+    results = []
+    for prompt in prompts:
+        cached = response_cache.get_cached_response(cache_text, prompt, model_name)
+        if not cached:
+            return None
+        results.append(cached)
+    return results
+
+def _stream_first_line(model, contents, **kwargs) -> str:
+    """Stream a response and stop at the first complete comma-separated line.
+
+    Used for single-line outputs (keywords): the rest of the generation is
+    abandoned instead of waiting for the server to decode up to the token cap.
+    """
+    buffer = ""
+    for chunk in model.generate_content(contents, stream=True, **kwargs):
+        buffer += chunk.text
+        lines = buffer.split('\n')
+        for line in lines[:-1]:
+            if ',' in line:
+                return line.strip()
+    return buffer.strip()
+
+def summarize_text_with_retry(text: str, prompt: str, model: str = None, max_tokens: int = 500, max_retries: int = 3,
+                              cached_content=None, single_line: bool = False, use_cache: bool = True) -> str:
+    """Generate summary using Gemini API with retry logic for rate limits and errors.
+
+    When `cached_content` is given, the rules and paper text are already held by the
+    cache and only `prompt` is sent with the request. `single_line` streams the
+    response and returns as soon as the first comma-separated line is complete.
+    Successful responses are cached on disk by (model, prompt, text).
+    """
+    if not text or not text.strip():
+        return "No text available for summarization."
+    
+    model_name = model or os.getenv('GEMINI_MODEL', 'gemini-2.5-pro')
     
+    response_cache = _response_cache(use_cache)
+    if response_cache:
+        cached = response_cache.get_cached_response(text, prompt, model_name)
+        if cached:
+            return cached
+    cache_text = text
+    
+    if cached_content is not None:
+        _configure_once()
+        model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        contents = prompt
+    else:
+        model = _get_model(model_name)
+
+        text = _truncate_to_token_budget(text, model_name)
+
+        # Separate parts: the rules stay a fixed prefix and the paper text isn't copied
+        contents = [_RULES_TEXT, prompt, "논문 내용:", text]
+    
+    generation_config = genai.types.GenerationConfig(
+        max_output_tokens=max_tokens,
+        temperature=0.3,
+    )
+    
+    backoff = 5
     for attempt in range(max_retries):
         try:
-            response = model.generate_content(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=max_tokens,
-                    temperature=0.3,
+            if single_line:
+                result = _stream_first_line(model, contents, generation_config=generation_config)
+            else:
+                response = model.generate_content(
+                    contents,
+                    generation_config=generation_config
                 )
-            )
+                result = response.text.strip() if response.text else ""
             
-            if response.text:
-                return response.text.strip()
+            if result:
+                if response_cache:
+                    response_cache.save_to_cache(cache_text, prompt, model_name, result)
+                return result
             else:
                 return "[No response generated]"
         
         except Exception as e:
             if "quota" in str(e).lower() or "rate" in str(e).lower():
                 if attempt < max_retries - 1:
-                    wait_time = min(2 ** attempt * 5, 60)
-                    print(f"Rate limit hit. Waiting {wait_time} seconds before retry...")
+                    backoff = _next_backoff(backoff)
+                    wait_time = _retry_after_seconds(e) or backoff
+                    print(f"Rate limit hit. Waiting {wait_time:.1f} seconds before retry...")
                     time.sleep(wait_time)
                 else:
                     print(f"Rate limit error after {max_retries} attempts: {e}")
@@ -83,69 +361,51 @@ def summarize_text_with_retry(text: str, prompt: str, model: str = None, max_tok
                     print(f"Error generating summary after {max_retries} attempts: {e}")
                     return f"[Error generating summary: {type(e).__name__}]"
 
-def summarize_with_images(text: str, images: List[Dict], prompt: str, model: str = None, max_tokens: int = 3000) -> str:
-    """Generate summary using text and images with Gemini multimodal capabilities."""
+def summarize_with_images(text: str, images: List[Dict], prompt: str, model: str = None, max_tokens: int = 3000,
+                          cached_content=None, single_line: bool = False, use_cache: bool = True) -> str:
+    """Generate summary using text and images with Gemini multimodal capabilities.
+
+    When `cached_content` is given, the rules and paper text are already held by the
+    cache and only `prompt` plus the images are sent with the request. `single_line`
+    and `use_cache` behave as in summarize_text_with_retry.
+
+    Raises _MultimodalUnavailable when Gemini blocks or fails the multimodal request,
+    so the caller can switch the rest of the paper to the text-only path.
+    """
     if not text or not text.strip():
         return "No text available for summarization."
     
     model_name = model or os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
     
-    configure_gemini()
-    model = genai.GenerativeModel(model_name)
-    
-    # Truncate text if too long
-    max_input_length = 800000
-    if len(text) > max_input_length:
-        text = text[:max_input_length] + "... [truncated]"
-    
-    # Prepare content list with text and images
-    content_parts = []
+    cache_text = _image_cache_text(text, images)
+    response_cache = _response_cache(use_cache)
+    if response_cache:
+        cached = response_cache.get_cached_response(cache_text, prompt, model_name)
+        if cached:
+            return cached
     
-    # Add system prompt and text
-    full_prompt = f"""당신은 학술 논문을 정확하게 요약하는 전문가입니다. 
-
-중요한 규칙:
-1. 제공된 텍스트와 이미지에 명시적으로 보이는 내용만을 요약하세요.
-2. 이미지의 그래프, 차트, 표, 다이어그램을 분석하여 핵심 정보를 추출하세요.
-3. 이미지에 나타난 수치 데이터, 트렌드, 패턴을 정확히 설명하세요.
-4. 텍스트와 이미지 정보를 종합하여 일관성 있게 요약하세요.
-5. 추측하거나 일반적인 지식을 추가하지 마세요.
-6. 한국어로 명확하고 간결하게 작성하세요.
-
-{prompt}
-
-논문 텍스트:
-{text}
-
-아래는 논문에서 추출된 이미지들입니다. 각 이미지를 분석하여 요약에 포함하세요:"""
+    if cached_content is not None:
+        _configure_once()
+        gen_model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+    else:
+        gen_model = _get_model(model_name)
+        text = _truncate_to_token_budget(text, model_name)
     
-    content_parts.append(full_prompt)
+    # Prepare content list with text and images (rules, prompt and text as separate parts)
+    if cached_content is not None:
+        content_parts = [prompt, _IMAGES_INTRO]
+    else:
+        content_parts = [_RULES_IMAGES, prompt, "논문 텍스트:", text, _IMAGES_INTRO]
     
-    # Add images (limit to 5 images to avoid token limits and safety issues)
-    valid_images = 0
-    for i, img_info in enumerate(images[:5]):
-        try:
-            image_path = img_info['path']
-            if os.path.exists(image_path):
-                # Read and encode image
-                with open(image_path, "rb") as f:
-                    image_data = f.read()
-                
-                # Create image part
-                image_part = {
-                    'mime_type': 'image/png',
-                    'data': image_data
-                }
-                content_parts.append(f"\n\n[이미지 {i+1}: 페이지 {img_info['page']}, {img_info['width']}x{img_info['height']}]")
-                content_parts.append(image_part)
-                valid_images += 1
-        except Exception as e:
-            print(f"Failed to load image {img_info.get('filename', 'unknown')}: {e}")
-            continue
+    # Add images (built once per image set and shared across calls)
+    image_parts = _build_image_parts(images)
+    content_parts.extend(image_parts)
+    valid_images = len(image_parts) // 2
     
     if valid_images == 0:
         print("No valid images found, falling back to text-only summarization")
-        return summarize_text_with_retry(text, prompt, model, max_tokens)
+        return summarize_text_with_retry(text, prompt, model_name, max_tokens, single_line=single_line,
+                                         use_cache=use_cache)
     
     print(f"Generating summary with {valid_images} images...")
     
@@ -170,17 +430,31 @@ def summarize_with_images(text: str, images: List[Dict], prompt: str, model: str
             }
         ]
         
-        response = model.generate_content(
+        generation_config = genai.types.GenerationConfig(
+            max_output_tokens=max_tokens,
+            temperature=0.3,
+        )
+        
+        if single_line:
+            result = _stream_first_line(gen_model, content_parts, generation_config=generation_config,
+                                        safety_settings=safety_settings)
+            if not result:
+                raise ValueError("Empty streamed response")
+            if response_cache:
+                response_cache.save_to_cache(cache_text, prompt, model_name, result)
+            return result
+        
+        response = gen_model.generate_content(
             content_parts,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=max_tokens,
-                temperature=0.3,
-            ),
+            generation_config=generation_config,
             safety_settings=safety_settings
         )
         
         if response.text:
-            return response.text.strip()
+            result = response.text.strip()
+            if response_cache:
+                response_cache.save_to_cache(cache_text, prompt, model_name, result)
+            return result
         else:
             # Check for safety blocks or other issues
             if hasattr(response, 'candidates') and response.candidates:
@@ -189,14 +463,74 @@ def summarize_with_images(text: str, images: List[Dict], prompt: str, model: str
                     print(f"Response blocked - Finish reason: {candidate.finish_reason}")
                     if hasattr(candidate, 'safety_ratings'):
                         print(f"Safety ratings: {candidate.safety_ratings}")
-            return "[No response generated with images - falling back to text only]"
+            raise _MultimodalUnavailable("No response generated with images")
     
+    except _MultimodalUnavailable:
+        raise
     except Exception as e:
         print(f"Multimodal generation failed: {e}")
         if hasattr(e, '__dict__'):
             print(f"Error details: {e.__dict__}")
-        print("Falling back to text-only summarization...")
-        return summarize_text_with_retry(text, prompt, model, max_tokens)
+        raise _MultimodalUnavailable(str(e)) from e
+
+def _summarize_paper(text: str, images: Optional[List[Dict]], prompt: str, max_tokens: int,
+                     cached_content=None, single_line: bool = False) -> str:
+    """Summarize with images when available, remembering per paper if Gemini refused them.
+
+    After one multimodal refusal, this and every later prompt for the same paper go
+    straight to the text-only path instead of re-uploading the images to be refused
+    again.
+    """
+    if not images:
+        return summarize_text_with_retry(text, prompt, max_tokens=max_tokens,
+                                         cached_content=cached_content, single_line=single_line)
+
+    paper_key = hashlib.sha256(_image_cache_text(text, images).encode('utf-8')).hexdigest()
+    with _multimodal_refused_lock:
+        refused = paper_key in _multimodal_refused
+    if not refused:
+        try:
+            return summarize_with_images(text, images, prompt, max_tokens=max_tokens,
+                                         cached_content=cached_content, single_line=single_line)
+        except _MultimodalUnavailable:
+            with _multimodal_refused_lock:
+                _multimodal_refused.add(paper_key)
+
+    # The paper cache was built for the multimodal model with the image rules, so the
+    # text-only fallback sends the full text with the text rules instead
+    print("Multimodal unavailable for this paper, using text-only summarization...")
+    return summarize_text_with_retry(text, prompt, max_tokens=max_tokens, single_line=single_line)
+
+def _run_concurrently(*calls):
+    """Run independent Gemini calls in parallel threads; results keep call order.
+
+    Each call is network-bound, so the per-paper wall time drops to roughly that of
+    the slowest call. Retry backoffs sleep inside their own thread and don't block
+    the other calls.
+    """
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+def _cache_params_for(text: str, images: Optional[List[Dict]]) -> tuple:
+    """(truncated text, model name, rules) of the per-paper cache for the text-only or multimodal path."""
+    if images and len(images) > 0:
+        model_name = os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
+        rules = _RULES_IMAGES
+    else:
+        model_name = os.getenv('GEMINI_MODEL', 'gemini-2.5-pro')
+        rules = _RULES_TEXT
+    return _truncate_to_token_budget(text, model_name), model_name, rules
+
+def _create_cache_for(text: str, images: Optional[List[Dict]]):
+    """Create (or reuse) the per-paper context cache matching the text-only or multimodal path."""
+    return _get_or_create_paper_cache(*_cache_params_for(text, images))
+
+def _release_cache_for(text: str, images: Optional[List[Dict]]) -> None:
+    """Release the paper cache left open by generate_short_long_with_images, if any."""
+    with _paper_caches_lock:
+        cache = _paper_caches.get(_paper_cache_key(*_cache_params_for(text, images)))
+    _release_paper_cache(cache)
 
 def generate_short_long_with_images(text: str, images: List[Dict] = None, captions: List[Dict] = None, title: str = None):
     """Generate both short and long summaries with image analysis."""
@@ -276,13 +610,28 @@ def generate_short_long_with_images(text: str, images: List[Dict] = None, captio
         short_prompt = f"Paper Title: {title}\n\n{short_prompt}"
         long_prompt = f"Paper Title: {title}\n\n{long_prompt}"
     
-    # Use multimodal if images are available
-    if images and len(images) > 0:
-        short = summarize_with_images(text, images, short_prompt, max_tokens=400)
-        long = summarize_with_images(text, images, long_prompt, max_tokens=3000)
-    else:
-        short = summarize_text_with_retry(text, short_prompt, max_tokens=400)
-        long = summarize_text_with_retry(text, long_prompt, max_tokens=3000)
+    # Re-runs: everything already answered, no need to upload anything
+    cached = _lookup_cached_responses(text, images, [short_prompt, long_prompt])
+    if cached:
+        return tuple(cached)
+    
+    # Read image files once; the concurrent calls below reuse the cached parts
+    _build_image_parts(images)
+    
+    # Cache the rules + paper body once; both prompts are sent against it. The cache is
+    # kept for generate_sections_with_images, which callers run next on the same paper
+    # and which releases it (otherwise it expires after _CACHE_TTL_MINUTES).
+    cache = _create_cache_for(text, images)
+    try:
+        # Use multimodal if images are available
+        summarize = partial(_summarize_paper, text, images, cached_content=cache)
+        short, long = _run_concurrently(
+            partial(summarize, short_prompt, max_tokens=400),
+            partial(summarize, long_prompt, max_tokens=3000),
+        )
+    except BaseException:
+        _release_paper_cache(cache)
+        raise
     
     return short, long
 
@@ -432,17 +781,30 @@ def generate_sections_with_images(text: str, images: List[Dict] = None, captions
 - 일반적 단어 회피 (study, research, analysis)
 - 논문 제목의 특수한 문구 회피"""
     
-    # Use multimodal if images are available
-    if images and len(images) > 0:
-        contributions = summarize_with_images(text, images, contribution_prompt, max_tokens=500)
-        limitations = summarize_with_images(text, images, limitations_prompt, max_tokens=500)
-        ideas = summarize_with_images(text, images, ideas_prompt, max_tokens=500)
-        keywords = summarize_with_images(text, images, keywords_prompt, max_tokens=200)
-    else:
-        contributions = summarize_text_with_retry(text, contribution_prompt, max_tokens=500)
-        limitations = summarize_text_with_retry(text, limitations_prompt, max_tokens=500)
-        ideas = summarize_text_with_retry(text, ideas_prompt, max_tokens=500)
-        keywords = summarize_text_with_retry(text, keywords_prompt, max_tokens=200)
+    # Re-runs: everything already answered, no need to upload anything
+    cached = _lookup_cached_responses(text, images, [contribution_prompt, limitations_prompt,
+                                                     ideas_prompt, keywords_prompt])
+    if cached:
+        _release_cache_for(text, images)
+        return tuple(cached)
+    
+    # Read image files once; the concurrent calls below reuse the cached parts
+    _build_image_parts(images)
+    
+    # Cache the rules + paper body once (or reuse the one generate_short_long_with_images
+    # left open); all four prompts are sent against it
+    cache = _create_cache_for(text, images)
+    try:
+        # Use multimodal if images are available
+        summarize = partial(_summarize_paper, text, images, cached_content=cache)
+        contributions, limitations, ideas, keywords = _run_concurrently(
+            partial(summarize, contribution_prompt, max_tokens=500),
+            partial(summarize, limitations_prompt, max_tokens=500),
+            partial(summarize, ideas_prompt, max_tokens=500),
+            partial(summarize, keywords_prompt, max_tokens=200, single_line=True),
+        )
+    finally:
+        _release_paper_cache(cache)
     
     return contributions, limitations, ideas, keywords
 
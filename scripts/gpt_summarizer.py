@@ -9,10 +9,16 @@ Generate summaries using OpenAI API with retry logic.
 
 import json
 import os
+import random
 import re
 import time
 import sys
 import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from typing import List, Dict
 
 from openai import OpenAI
@@ -23,6 +29,12 @@ from openai import (
 )
 from api_cost_optimizer import APICostOptimizer, TextOptimizer, get_optimized_model_choice
 
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 
 class SummarizationFailed(Exception):
     """Raised when summarization cannot be completed after all retries.
@@ -63,6 +75,197 @@ def _build_image_content_blocks(images, max_images: int = 3):
     return blocks
 
 
+# 재시도 대기: 지수 백오프 + 지터, 상한 120초
+_RETRY_BASE_SECONDS = 5
+_RETRY_CAP_SECONDS = 120
+_TRY_AGAIN_RE = re.compile(r"try again in ([\d.]+)(ms|s)\b")
+
+
+# 프로세스 내 응답 메모 (L1, 디스크 캐시는 L2): 원문은 해시로만 보관해 메모리 상한 유지
+_RESPONSE_MEMO_SIZE = 256
+_response_memo = OrderedDict()
+_response_memo_lock = threading.Lock()
+
+
+def _memo_key(text: str, prompt: str, model: str, max_tokens: int, json_output: bool) -> tuple:
+    return (hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(),
+            prompt, model, max_tokens, json_output)
+
+
+def _memo_get(key: tuple):
+    with _response_memo_lock:
+        result = _response_memo.get(key)
+        if result is not None:
+            _response_memo.move_to_end(key)
+        return result
+
+
+def _memo_put(key: tuple, result: str) -> None:
+    with _response_memo_lock:
+        _response_memo[key] = result
+        _response_memo.move_to_end(key)
+        if len(_response_memo) > _RESPONSE_MEMO_SIZE:
+            _response_memo.popitem(last=False)
+
+
+@lru_cache(maxsize=4)
+def _optimizer_for(cache_dir: str) -> APICostOptimizer:
+    return APICostOptimizer(cache_dir=cache_dir)
+
+
+def _get_optimizer() -> APICostOptimizer:
+    """Shared response cache / cost logger, one per cache directory.
+
+    OPENAI_CACHE_DIR overrides the cache location and is read on every call.
+    """
+    return _optimizer_for(os.getenv("OPENAI_CACHE_DIR", "./cache/api_responses"))
+
+
+# MODEL 미설정 시 기본값: 텍스트 경로 / 이미지 포함(Responses API) 경로
+_DEFAULT_TEXT_MODEL = "gpt-5.2-pro"
+_DEFAULT_VISION_MODEL = "gpt-5.5"
+
+# 요약 출력 토큰 예산 (리뷰 논문은 깊이 있는 요약을 위해 추가 헤드룸)
+_TOKEN_BUDGETS = {
+    "short": 1200,
+    "long": 6000,
+    "long_review": 9000,
+    "combined": 11000,
+    "combined_review": 14000,
+}
+
+
+@lru_cache(maxsize=None)
+def _configured_model(default: str) -> str:
+    """MODEL from the environment, falling back to `default`.
+
+    Read once on first use rather than at import, since some entry points
+    (process_zotero_pdf) load .env only after importing this module.
+    """
+    return os.getenv("MODEL") or default
+
+
+def _token_budget(kind: str, paper_type: str = None) -> int:
+    """Output token budget for 'short' / 'long' / 'combined', with review headroom."""
+    if paper_type == 'review' and f"{kind}_review" in _TOKEN_BUDGETS:
+        return _TOKEN_BUDGETS[f"{kind}_review"]
+    return _TOKEN_BUDGETS[kind]
+
+
+_DEFAULT_TIMEOUT = 300  # 전체 요청 타임아웃 (초)
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> OpenAI:
+    """Process-wide OpenAI client, built on first use so OPENAI_API_KEY is read after .env loads.
+
+    Sharing one client keeps its httpx connection pool (and warm TLS sessions)
+    alive across calls instead of paying a handshake per summary. Retries are
+    handled manually, hence max_retries=0.
+    """
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=0,
+        timeout=_DEFAULT_TIMEOUT,
+    )
+
+
+def _client_with_timeout(timeout: float, max_retries: int = 0) -> OpenAI:
+    """Shared client, re-optioned for another timeout / SDK retry count (with_options keeps the same pool)."""
+    client = _get_client()
+    if timeout == _DEFAULT_TIMEOUT and max_retries == 0:
+        return client
+    return client.with_options(timeout=timeout, max_retries=max_retries)
+
+
+# 모델별 컨텍스트 윈도우 (토큰, 접두사 매칭 — 긴 접두사 우선). 모르는 모델은 128k로 가정
+_CONTEXT_WINDOWS = {
+    "gpt-5.5": 1_000_000,
+    "gpt-5": 400_000,
+    "gpt-4.1": 1_000_000,
+    "gpt-4o": 128_000,
+    "gpt-3.5-turbo": 16_385,
+}
+_DEFAULT_CONTEXT_WINDOW = 128_000
+# 메시지 포맷 오버헤드 등 여유분
+_CONTEXT_HEADROOM_TOKENS = 500
+
+
+def _context_window(model: str) -> int:
+    for prefix in sorted(_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return _CONTEXT_WINDOWS[prefix]
+    return _DEFAULT_CONTEXT_WINDOW
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """tiktoken encoding for a model; gpt-5 and unknown models use o200k_base."""
+    if not model.startswith('gpt-5'):
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding('o200k_base')
+
+
+@lru_cache(maxsize=8)
+def _encode_text(encoding_name: str, text: str) -> tuple:
+    """Token ids of a paper's text, memoized so the several prompts sent for one
+    paper don't re-encode it each time."""
+    return tuple(tiktoken.get_encoding(encoding_name).encode(text, disallowed_special=()))
+
+
+def _truncate_to_context(text: str, model: str, max_tokens: int, prompt: str) -> str:
+    """Trim text so system prompt + prompt + text + output fit the model's context.
+
+    Falls back to the 30000-character cut when tiktoken isn't installed.
+    """
+    if not TIKTOKEN_AVAILABLE:
+        max_input_length = 30000  # ~7.5k 토큰 수준 가정
+        if len(text) > max_input_length:
+            text = text[:max_input_length] + "... [truncated]"
+        return text
+
+    enc = _get_encoding(model)
+    ids = _encode_text(enc.name, text)
+    instructions = len(enc.encode(_SYSTEM_PROMPT_DATA_FOCUSED + prompt, disallowed_special=()))
+    budget = _context_window(model) - max_tokens - instructions - _CONTEXT_HEADROOM_TOKENS
+    if len(ids) <= budget:
+        return text
+    return enc.decode(list(ids[:max(budget, 0)])) + "... [truncated]"
+
+
+def _retry_after_seconds(error: Exception):
+    """Server-suggested delay from a 429: the Retry-After header, else the
+    'Please try again in 1.2s' hint in the error message. None if absent."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers:
+        try:
+            return float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    match = _TRY_AGAIN_RE.search(str(error))
+    if match:
+        value = float(match.group(1))
+        return value / 1000 if match.group(2) == 'ms' else value
+    return None
+
+
+def _backoff_seconds(attempt: int, server_hint: float = None) -> float:
+    """Exponential backoff with random jitter so concurrent workers don't retry in
+    lockstep; never shorter than the server's hint, never longer than the cap.
+
+    Callers sleep in their own worker thread, so a long wait only delays that one
+    request. The retrying clients are built with max_retries=0, so these loops are
+    the only retry layer.
+    """
+    step = _RETRY_BASE_SECONDS * (2 ** attempt)
+    delay = max(server_hint or 0, step) + random.uniform(0, step * 0.5)
+    return min(delay, _RETRY_CAP_SECONDS)
+
+
 _SYSTEM_PROMPT_DATA_FOCUSED = (
     "당신은 데이터 중심 논문 분석 전문가입니다. 수치와 구체적 정보만 추출합니다.\n\n"
     "🔴 절대 금지 (위반 시 실패):\n"
@@ -85,16 +288,19 @@ _SYSTEM_PROMPT_DATA_FOCUSED = (
     "논문에 없는 정보: '[명시되지 않음]' 표기"
 )
 
+_SYSTEM_MSG = {"role": "system", "content": _SYSTEM_PROMPT_DATA_FOCUSED}
+
 
 def summarize_text_with_retry(
     text: str,
     prompt: str,
     model: str = None,
     max_tokens: int = 500,
-    max_retries: int = 3,
+    max_retries: int = 6,
     request_timeout: int = 300,  # 5분으로 증가
     use_cache: bool = True,
     use_optimizer: bool = True,
+    json_output: bool = False,
 ) -> str:
     """
     Generate summary using OpenAI API with retry logic for rate limits and errors.
@@ -104,34 +310,38 @@ def summarize_text_with_retry(
     - max_tokens: 출력 토큰 상한 (chat.completions: max_tokens)
     - max_retries: 수동 재시도 횟수
     - request_timeout: 요청 타임아웃(초)
+    - json_output: JSON 모드 요청 (prompt에 'JSON' 언급 필요)
     """
     if not text or not text.strip():
         return "No text available for summarization."
 
-    # 비용 최적화 도구 초기화
-    if use_optimizer:
-        optimizer = APICostOptimizer()
-        
-        # 캐시 확인
-        if use_cache:
-            cached = optimizer.get_cached_response(text, prompt, model or os.getenv("MODEL", "gpt-4o-mini"))
-            if cached:
-                return cached
-    
     # 모델 자동 선택 (최적화 모드)
     if use_optimizer and not model:
         task_type = "keywords" if "키워드" in prompt else "summary"
         model = get_optimized_model_choice(len(text), task_type)
         print(f"📊 Selected model: {model} for {len(text)} chars")
     else:
-        model = model or os.getenv("MODEL", "gpt-4o-mini")
+        model = model or _configured_model(_DEFAULT_TEXT_MODEL)
 
-    # 클라이언트에 timeout 지정 (요청마다 timeout을 주고 싶다면 with_options 사용)
-    client = OpenAI(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        max_retries=0,           # 수동 재시도 제어
-        timeout=request_timeout, # 전체 요청 타임아웃 (기본 5분)
-    )
+    # 같은 실행 안에서 이미 받은 응답이면 디스크/API 없이 반환
+    memo_key = _memo_key(text, prompt, model, max_tokens, json_output)
+    if use_cache:
+        cached = _memo_get(memo_key)
+        if cached is not None:
+            return cached
+
+    # 비용 최적화 도구 초기화 + 캐시 확인 (트렁케이션 전 원문 + 최종 모델 기준, 저장도 같은 키)
+    cache_text_key = text
+    if use_optimizer:
+        optimizer = _get_optimizer()
+        if use_cache:
+            cached = optimizer.get_cached_response(cache_text_key, prompt, model)
+            if cached:
+                _memo_put(memo_key, cached)
+                return cached
+
+    # 공유 클라이언트 (요청 타임아웃이 기본값과 다르면 with_options로 지정)
+    client = _client_with_timeout(request_timeout)
 
     # 텍스트 최적화 (스마트 트렁케이션)
     if use_optimizer:
@@ -140,19 +350,16 @@ def summarize_text_with_retry(
         if len(text) < original_length:
             print(f"✂️ Text optimized: {original_length} → {len(text)} chars")
     else:
-        # 기존 단순 트렁케이션
-        max_input_length = 30000  # ~7.5k 토큰 수준 가정
-        if len(text) > max_input_length:
-            text = text[:max_input_length] + "... [truncated]"
+        # 모델 컨텍스트 윈도우 기준 토큰 트렁케이션
+        text = _truncate_to_context(text, model, max_tokens, prompt)
 
+    # 논문 본문을 지시문 앞에 두어, 같은 논문에 대한 여러 프롬프트가 긴 공통 접두사
+    # (시스템 프롬프트 + 본문)를 공유하도록 함 → OpenAI 자동 프롬프트 캐싱 적중
     messages = [
-        {
-            "role": "system",
-            "content": _SYSTEM_PROMPT_DATA_FOCUSED,
-        },
+        _SYSTEM_MSG,
         {
             "role": "user",
-            "content": f"{prompt}\n\n논문 내용:\n{text}",
+            "content": f"논문 내용:\n{text}\n\n{prompt}",
         },
     ]
 
@@ -165,6 +372,7 @@ def summarize_text_with_retry(
                     input=messages,
                     max_output_tokens=max_tokens,
                     reasoning={"effort": "medium"},  # 적절한 추론 수준
+                    **({"text": {"format": {"type": "json_object"}}} if json_output else {}),
                 )
                 # Response에서 텍스트 추출 (null 체크 추가)
                 text_parts = []
@@ -181,8 +389,9 @@ def summarize_text_with_retry(
                     raise ValueError("Empty response from GPT-5")
 
                 # 성공 시 캐시 저장 및 비용 로깅
+                _memo_put(memo_key, result)
                 if use_optimizer:
-                    optimizer.save_to_cache(text, prompt, model, result)
+                    optimizer.save_to_cache(cache_text_key, prompt, model, result)
                     cost = optimizer.log_api_usage(model, text + prompt, result)
                     print(f"💰 Estimated cost: ${cost:.4f}")
 
@@ -192,12 +401,14 @@ def summarize_text_with_retry(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
+                    **({"response_format": {"type": "json_object"}} if json_output else {}),
                 )
                 result = resp.choices[0].message.content.strip()
                 
                 # 성공 시 캐시 저장 및 비용 로깅
+                _memo_put(memo_key, result)
                 if use_optimizer:
-                    optimizer.save_to_cache(text, prompt, model, result)
+                    optimizer.save_to_cache(cache_text_key, prompt, model, result)
                     cost = optimizer.log_api_usage(model, text + prompt, result)
                     print(f"💰 Estimated cost: ${cost:.4f}")
                 
@@ -206,23 +417,25 @@ def summarize_text_with_retry(
         except RateLimitError as e:
             # 429 → 지수 백오프
             if attempt < max_retries - 1:
-                wait = min(5 * (2**attempt), 60)
-                print(f"[RateLimit] Waiting {wait}s... ({attempt+1}/{max_retries})")
+                wait = _backoff_seconds(attempt, _retry_after_seconds(e))
+                print(f"[RateLimit] Waiting {wait:.1f}s... ({attempt+1}/{max_retries})")
                 time.sleep(wait)
                 continue
             raise SummarizationFailed(f"Rate limit exceeded after {max_retries} retries")
 
         except (APITimeoutError,) as e:
             if attempt < max_retries - 1:
-                print(f"[Timeout] Retrying... ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Timeout] Retrying in {wait:.1f}s... ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"API timeout after {max_retries} retries")
 
         except (APIConnectionError,) as e:
             if attempt < max_retries - 1:
-                print(f"[Connection] {e} → retry ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Connection] {e} → retry in {wait:.1f}s ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"Connection error after {max_retries} retries")
 
@@ -233,15 +446,17 @@ def summarize_text_with_retry(
         except (InternalServerError, APIError) as e:
             # 5xx 또는 기타 APIError → 1~2회 재시도 후 중단
             if attempt < max_retries - 1:
-                print(f"[Server/APIError] retry ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Server/APIError] retry in {wait:.1f}s ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"API error after {max_retries} retries: {type(e).__name__}")
 
         except Exception as e:
             if attempt < max_retries - 1:
-                print(f"[Unexpected] {e} → retry ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Unexpected] {e} → retry in {wait:.1f}s ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"Unexpected error after {max_retries} retries: {type(e).__name__}: {e}")
 
@@ -252,7 +467,7 @@ def summarize_text_with_images_retry(
     prompt: str,
     model: str = None,
     max_tokens: int = 500,
-    max_retries: int = 3,
+    max_retries: int = 6,
     request_timeout: int = 300,
     use_cache: bool = True,
     use_optimizer: bool = True,
@@ -274,32 +489,24 @@ def summarize_text_with_images_retry(
     )
     cache_text_key = text + f"\n[IMG:{img_signature}]"
 
-    # 비용 최적화 도구 초기화
-    if use_optimizer:
-        optimizer = APICostOptimizer()
-
-        # 캐시 확인
-        if use_cache:
-            cached = optimizer.get_cached_response(
-                cache_text_key, prompt, model or os.getenv("MODEL", "gpt-5.5")
-            )
-            if cached:
-                return cached
-
     # 모델 자동 선택 (최적화 모드)
     if use_optimizer and not model:
         task_type = "keywords" if "키워드" in prompt else "summary"
         model = get_optimized_model_choice(len(text), task_type)
         print(f"📊 Selected model: {model} for {len(text)} chars (multimodal)")
     else:
-        model = model or os.getenv("MODEL", "gpt-5.5")
+        model = model or _configured_model(_DEFAULT_VISION_MODEL)
 
-    # 클라이언트에 timeout 지정
-    client = OpenAI(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        max_retries=0,
-        timeout=request_timeout,
-    )
+    # 비용 최적화 도구 초기화 + 캐시 확인 (최종 모델 기준)
+    if use_optimizer:
+        optimizer = _get_optimizer()
+        if use_cache:
+            cached = optimizer.get_cached_response(cache_text_key, prompt, model)
+            if cached:
+                return cached
+
+    # 공유 클라이언트에 timeout 지정
+    client = _client_with_timeout(request_timeout)
 
     # 텍스트 최적화 (멀티모달은 이미지 토큰 여유분 확보를 위해 24000자로 제한)
     if use_optimizer:
@@ -318,14 +525,11 @@ def summarize_text_with_images_retry(
 
     # Responses API용 messages: user content는 input_text + input_image 블록 리스트
     messages = [
-        {
-            "role": "system",
-            "content": _SYSTEM_PROMPT_DATA_FOCUSED,
-        },
+        _SYSTEM_MSG,
         {
             "role": "user",
             "content": [
-                {"type": "input_text", "text": f"{prompt}\n\n논문 내용:\n{text}"},
+                {"type": "input_text", "text": f"논문 내용:\n{text}\n\n{prompt}"},
                 *image_blocks,
             ],
         },
@@ -360,23 +564,25 @@ def summarize_text_with_images_retry(
 
         except RateLimitError as e:
             if attempt < max_retries - 1:
-                wait = min(5 * (2**attempt), 60)
-                print(f"[RateLimit/MM] Waiting {wait}s... ({attempt+1}/{max_retries})")
+                wait = _backoff_seconds(attempt, _retry_after_seconds(e))
+                print(f"[RateLimit/MM] Waiting {wait:.1f}s... ({attempt+1}/{max_retries})")
                 time.sleep(wait)
                 continue
             raise SummarizationFailed(f"Rate limit exceeded after {max_retries} retries (multimodal)")
 
         except (APITimeoutError,) as e:
             if attempt < max_retries - 1:
-                print(f"[Timeout/MM] Retrying... ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Timeout/MM] Retrying in {wait:.1f}s... ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"API timeout after {max_retries} retries (multimodal)")
 
         except (APIConnectionError,) as e:
             if attempt < max_retries - 1:
-                print(f"[Connection/MM] {e} → retry ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Connection/MM] {e} → retry in {wait:.1f}s ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"Connection error after {max_retries} retries (multimodal)")
 
@@ -385,15 +591,17 @@ def summarize_text_with_images_retry(
 
         except (InternalServerError, APIError) as e:
             if attempt < max_retries - 1:
-                print(f"[Server/APIError MM] retry ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Server/APIError MM] retry in {wait:.1f}s ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"API error after {max_retries} retries (multimodal): {type(e).__name__}")
 
         except Exception as e:
             if attempt < max_retries - 1:
-                print(f"[Unexpected/MM] {e} → retry ({attempt+1}/{max_retries})")
-                time.sleep(2)
+                wait = _backoff_seconds(attempt)
+                print(f"[Unexpected/MM] {e} → retry in {wait:.1f}s ({attempt+1}/{max_retries})")
+                time.sleep(wait)
                 continue
             raise SummarizationFailed(f"Unexpected error after {max_retries} retries (multimodal): {type(e).__name__}: {e}")
 
@@ -403,6 +611,18 @@ def summarize_text(text: str, prompt: str, model: str = None, max_tokens: int =
     return summarize_text_with_retry(text, prompt, model, max_tokens)
 
 
+def _run_concurrently(*calls):
+    """Run independent OpenAI calls in parallel threads; results keep call order.
+
+    Each call is network-bound, so the per-paper wall time drops to roughly that of
+    the slowest call. Retry backoffs sleep inside their own thread and don't block
+    the other calls.
+    """
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        futures = [executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+
 def detect_paper_type(text: str, title: str = None, folder_hint: str = None) -> str:
     """
     논문 유형 감지 (단순화): experimental, review, computational
@@ -813,21 +1033,15 @@ def generate_short_long(text: str, title: str = None, use_optimizer: bool = True
     # 유형별 프롬프트 가져오기 (title 이미 포함됨)
     short_prompt, long_prompt = get_prompts_for_paper_type(paper_type, title)
 
-    # 모델 선택: 환경변수 우선, 기본값은 gpt-5.2-pro
-    model = os.getenv("MODEL", "gpt-5.2-pro")
-
-    # 모든 요약에 동일한 모델 사용 (최신 모델로 품질 향상)
-    short_model = model
-    long_model = model
+    # 모델 선택: 환경변수 우선, 기본값은 gpt-5.2-pro (short/long 동일 모델)
+    model = _configured_model(_DEFAULT_TEXT_MODEL)
 
-    # 토큰 수: 리뷰는 깊이 있는 요약을 위해 추가 헤드룸
-    short_tokens = 1200
-    long_tokens = 9000 if paper_type == 'review' else 6000
-
-    short = summarize_text_with_retry(text, short_prompt, model=short_model,
-                                      max_tokens=short_tokens, use_optimizer=use_optimizer)
-    long = summarize_text_with_retry(text, long_prompt, model=long_model,
-                                     max_tokens=long_tokens, use_optimizer=use_optimizer)
+    short, long = _run_concurrently(
+        partial(summarize_text_with_retry, text, short_prompt, model=model,
+                max_tokens=_token_budget("short"), use_optimizer=use_optimizer),
+        partial(summarize_text_with_retry, text, long_prompt, model=model,
+                max_tokens=_token_budget("long", paper_type), use_optimizer=use_optimizer),
+    )
     return short, long
 
 
@@ -846,14 +1060,12 @@ def generate_short_long_with_images(text: str, images, captions, title: str = No
         caption_block = "\n\n📷 그림 캡션 (참고):\n" + "\n".join(f"- {c}" for c in captions[:10])
         long_prompt = long_prompt + caption_block
 
-    model = os.getenv("MODEL", "gpt-5.5")
-    short_tokens = 1200
-    long_tokens = 9000 if paper_type == 'review' else 6000
-    short = summarize_text_with_images_retry(
-        text, images, short_prompt, model=model, max_tokens=short_tokens, use_optimizer=use_optimizer
-    )
-    long = summarize_text_with_images_retry(
-        text, images, long_prompt, model=model, max_tokens=long_tokens, use_optimizer=use_optimizer
+    model = _configured_model(_DEFAULT_VISION_MODEL)
+    short, long = _run_concurrently(
+        partial(summarize_text_with_images_retry, text, images, short_prompt, model=model,
+                max_tokens=_token_budget("short"), use_optimizer=use_optimizer),
+        partial(summarize_text_with_images_retry, text, images, long_prompt, model=model,
+                max_tokens=_token_budget("long", paper_type), use_optimizer=use_optimizer),
     )
     return short, long
 
@@ -926,26 +1138,58 @@ def _section_prompt_texts(title: str = None):
     return contribution_prompt, limitations_prompt, ideas_prompt, keywords_prompt
 
 
+def _build_sections_prompt(title: str = None) -> str:
+    """Compose ONE prompt that yields contributions, limitations, ideas and
+    keywords as a single JSON object, reusing the shared section prompts."""
+    contrib, limits, ideas, keywords = _section_prompt_texts(title)
+    return (
+        "당신은 학술 논문을 읽고 아래 4개 필드를 담은 JSON 객체 **하나만** 출력합니다.\n"
+        "코드펜스(```), 설명, 그 외 어떤 텍스트도 붙이지 마세요. 유효한 JSON만 출력합니다.\n"
+        "JSON 문자열 값 안에서는 줄바꿈을 \\n 으로 이스케이프하고 큰따옴표를 \\\" 로 이스케이프하세요.\n\n"
+        "각 필드의 작성 지침은 다음과 같습니다.\n\n"
+        "━━━ contributions (문자열, 마크다운 불릿) ━━━\n" + contrib + "\n\n"
+        "━━━ limitations (문자열, 마크다운 불릿) ━━━\n" + limits + "\n\n"
+        "━━━ ideas (문자열, 마크다운 불릿) ━━━\n" + ideas + "\n\n"
+        "━━━ keywords (문자열 10개의 JSON 배열) ━━━\n" + keywords + "\n\n"
+        "최종 출력은 정확히 이 형태의 JSON 하나입니다:\n"
+        '{"contributions": "...", "limitations": "...", "ideas": "...", "keywords": ["kw1", "kw2", "..."]}'
+    )
+
+
 def generate_sections(text: str, title: str = None, use_optimizer: bool = True):
-    """Generate contributions, limitations, ideas, keywords (legacy 4-call path).
+    """Generate contributions, limitations, ideas, keywords.
 
-    Retained as the fallback for generate_all* when the single consolidated call
-    can't be parsed. Kept behavior-identical to the original implementation.
+    All four come from one JSON-mode call, so the paper text is sent (and billed)
+    once instead of four times. If that response can't be parsed, falls back to
+    the per-section calls. Also the fallback for generate_all* when the single
+    consolidated call can't be parsed.
     """
-    contribution_prompt, limitations_prompt, ideas_prompt, _ = _section_prompt_texts(title)
-
     # 섹션 추출은 gpt-4o-mini 사용 (비용 절감: contributions/limitations/ideas는 간단한 추출 작업)
     model = "gpt-4o-mini"
     section_tokens = 1500  # 섹션별 요약용
     keyword_tokens = 300   # 키워드용
 
-    contributions = summarize_text_with_retry(text, contribution_prompt, model=model,
-                                             max_tokens=section_tokens, use_optimizer=use_optimizer)
-    limitations = summarize_text_with_retry(text, limitations_prompt, model=model,
-                                           max_tokens=section_tokens, use_optimizer=use_optimizer)
-    ideas = summarize_text_with_retry(text, ideas_prompt, model=model,
-                                     max_tokens=section_tokens, use_optimizer=use_optimizer)
-    keywords = generate_keywords_only(text, keyword_tokens)
+    try:
+        raw = summarize_text_with_retry(text, _build_sections_prompt(title), model=model,
+                                        max_tokens=3 * section_tokens + keyword_tokens,
+                                        use_optimizer=use_optimizer, json_output=True)
+        data = _extract_json_obj(raw)
+        if data and data.get('contributions'):
+            return _unpack_combined(data)[2:]
+        print("⚠️ Sections JSON unusable; falling back to per-section calls")
+    except SummarizationFailed:
+        print("⚠️ Sections call failed; falling back to per-section calls")
+
+    contribution_prompt, limitations_prompt, ideas_prompt, _ = _section_prompt_texts(title)
+
+    summarize = partial(summarize_text_with_retry, text, model=model,
+                        max_tokens=section_tokens, use_optimizer=use_optimizer)
+    contributions, limitations, ideas, keywords = _run_concurrently(
+        partial(summarize, contribution_prompt),
+        partial(summarize, limitations_prompt),
+        partial(summarize, ideas_prompt),
+        partial(generate_keywords_only, text, keyword_tokens),
+    )
     return contributions, limitations, ideas, keywords
 
 
@@ -1032,8 +1276,8 @@ def generate_all_with_images(text, images, captions, title=None, use_optimizer=T
     if captions:
         prompt += "\n\n📷 그림 캡션 (참고):\n" + "\n".join(f"- {c}" for c in captions[:10])
 
-    model = os.getenv("MODEL", "gpt-5.5")
-    max_tokens = 14000 if paper_type == 'review' else 11000
+    model = _configured_model(_DEFAULT_VISION_MODEL)
+    max_tokens = _token_budget("combined", paper_type)
     try:
         raw = summarize_text_with_images_retry(text, images, prompt, model=model,
                                                max_tokens=max_tokens, use_optimizer=use_optimizer)
@@ -1060,8 +1304,8 @@ def generate_all(text, title=None, use_optimizer=True, folder_hint=None, paper_t
     print(f"📄 Detected paper type: {paper_type} (consolidated)")
 
     prompt = _build_combined_prompt(paper_type, title)
-    model = os.getenv("MODEL", "gpt-5.2-pro")
-    max_tokens = 14000 if paper_type == 'review' else 11000
+    model = _configured_model(_DEFAULT_TEXT_MODEL)
+    max_tokens = _token_budget("combined", paper_type)
     try:
         raw = summarize_text_with_retry(text, prompt, model=model,
                                         max_tokens=max_tokens, use_optimizer=use_optimizer)
@@ -1078,39 +1322,38 @@ def generate_all(text, title=None, use_optimizer=True, folder_hint=None, paper_t
     return short, long, contributions, limitations, ideas, keywords
 
 
+_KEYWORDS_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You extract SPECIFIC keywords from academic papers for indexing.\n\n"
+        "PRIORITIZE (in order):\n"
+        "1. Named methods/models (e.g., gigatime, alphafold, bert-base)\n"
+        "2. Specific techniques (e.g., cross-modal-translation, multiplex-immunofluorescence)\n"
+        "3. Disease/target names (e.g., ccrcc, egfr-mutation, pd-l1)\n"
+        "4. Dataset names (e.g., tcga, bindingdb, chembl)\n"
+        "5. Specific metrics/concepts (e.g., tumor-microenvironment, survival-analysis)\n\n"
+        "AVOID generic terms like: deep-learning, machine-learning, cancer, ai, model, method, analysis\n\n"
+        "Rules:\n"
+        "- Output ONLY keywords, nothing else\n"
+        "- Use lowercase English with hyphens\n"
+        "- NO numbers, NO parentheses, NO colons, NO Korean\n"
+        "- Separate keywords with commas on a SINGLE line\n"
+        "- Output exactly 10 specific keywords"
+    ),
+}
+
+
 def generate_keywords_only(text: str, max_tokens: int = 300) -> str:
     """Generate specific, paper-relevant keywords from academic papers."""
-    from openai import OpenAI
-
-    client = OpenAI(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        timeout=60,
-    )
+    # 자체 재시도 루프가 없으므로 SDK 기본 재시도(2회)는 유지
+    client = _client_with_timeout(60, max_retries=2)
 
     # Truncate text for keyword extraction
     if len(text) > 10000:
         text = text[:10000]
 
     messages = [
-        {
-            "role": "system",
-            "content": (
-                "You extract SPECIFIC keywords from academic papers for indexing.\n\n"
-                "PRIORITIZE (in order):\n"
-                "1. Named methods/models (e.g., gigatime, alphafold, bert-base)\n"
-                "2. Specific techniques (e.g., cross-modal-translation, multiplex-immunofluorescence)\n"
-                "3. Disease/target names (e.g., ccrcc, egfr-mutation, pd-l1)\n"
-                "4. Dataset names (e.g., tcga, bindingdb, chembl)\n"
-                "5. Specific metrics/concepts (e.g., tumor-microenvironment, survival-analysis)\n\n"
-                "AVOID generic terms like: deep-learning, machine-learning, cancer, ai, model, method, analysis\n\n"
-                "Rules:\n"
-                "- Output ONLY keywords, nothing else\n"
-                "- Use lowercase English with hyphens\n"
-                "- NO numbers, NO parentheses, NO colons, NO Korean\n"
-                "- Separate keywords with commas on a SINGLE line\n"
-                "- Output exactly 10 specific keywords"
-            ),
-        },
+        _KEYWORDS_SYSTEM_MSG,
         {
             "role": "user",
             "content": f"Extract 10 SPECIFIC keywords (method names, techniques, diseases, datasets) from this paper:\n\n{text[:8000]}",
@@ -1133,49 +1376,111 @@ def generate_keywords_only(text: str, max_tokens: int = 300) -> str:
         return ""
 
 
+_TRANSLATOR_SYSTEM_MSG = {"role": "system", "content": "You are a professional academic translator."}
+
+# 캡션 번역은 한 번의 호출에 여러 개를 묶어서 요청 (호출 수와 반복되는 지시문 토큰 절감)
+CAPTION_BATCH_SIZE = 20
+
+
+def _translate_caption_single(client, title: str, caption_type: str, log) -> str:
+    """Translate one caption title; returns the original title on failure."""
+    full_prompt = (
+        f"다음 논문 {'그림' if caption_type == 'figure' else '표'} 제목을 한국어로 번역.\n"
+        f"전문용어는 영어 병기.\n\n원문: {title}\n\n"
+        "번역된 한국어 제목만 출력:"
+    )
+    try:
+        # 번역은 항상 gpt-4o-mini 사용 (빠르고 저렴)
+        resp = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                _TRANSLATOR_SYSTEM_MSG,
+                {"role": "user", "content": full_prompt},
+            ],
+            max_tokens=200,  # gpt-4o-mini는 max_tokens 사용
+        )
+        return resp.choices[0].message.content.strip()
+    except Exception as e:
+        # API 할당량 초과 등의 에러 시 원문 사용
+        if "insufficient_quota" in str(e):
+            log.warning(f"API quota exceeded - using original title")
+        else:
+            log.warning(f"Translation failed for '{title[:50]}...': {e}")
+        return title
+
+
+def _translate_caption_batch(client, titles: List[str], caption_type: str, log) -> List[str]:
+    """Translate several caption titles with one JSON-mode call.
+
+    Titles the response doesn't cover (or the whole batch, if the response can't be
+    parsed) are retried one by one.
+    """
+    numbered = "\n".join(f"{i}. {t}" for i, t in enumerate(titles, 1))
+    full_prompt = (
+        f"다음 논문 {'그림' if caption_type == 'figure' else '표'} 제목들을 각각 한국어로 번역.\n"
+        f"전문용어는 영어 병기.\n"
+        f"번호를 키로 하는 JSON 객체 하나만 출력: {{\"1\": \"번역1\", \"2\": \"번역2\", ...}}\n\n"
+        f"원문:\n{numbered}\n\n"
+    )
+    data = None
+    try:
+        resp = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                _TRANSLATOR_SYSTEM_MSG,
+                {"role": "user", "content": full_prompt},
+            ],
+            max_tokens=200 * len(titles),
+            response_format={"type": "json_object"},
+        )
+        data = _extract_json_obj(resp.choices[0].message.content)
+    except Exception as e:
+        if "insufficient_quota" in str(e):
+            # 할당량 초과 시 개별 재시도도 실패하므로 원문 사용
+            log.warning("API quota exceeded - using original titles")
+            return list(titles)
+        log.warning(f"Batch caption translation failed, retrying one by one: {e}")
+
+    translated = []
+    for i, title in enumerate(titles, 1):
+        title_kr = str((data or {}).get(str(i), "")).strip()
+        translated.append(title_kr or _translate_caption_single(client, title, caption_type, log))
+    return translated
+
+
 def translate_captions(captions: List[Dict], caption_type: str = "figure") -> List[Dict]:
-    """Translate figure/table captions to Korean."""
+    """Translate figure/table captions to Korean.
+
+    Captions are sent CAPTION_BATCH_SIZE at a time, with the batches running
+    concurrently.
+    """
     import logging
     log = logging.getLogger(__name__)
 
     if not captions:
         return captions
 
-    client = OpenAI(timeout=60)  # 번역은 더 짧은 타임아웃
+    client = _client_with_timeout(60, max_retries=2)  # 번역은 더 짧은 타임아웃, SDK 기본 재시도 유지
+
+    titles = [cap.get("title", "") for cap in captions]
+    pending = [i for i, title in enumerate(titles) if title]
+    batches = [pending[i:i + CAPTION_BATCH_SIZE] for i in range(0, len(pending), CAPTION_BATCH_SIZE)]
+    results = _run_concurrently(*(
+        partial(_translate_caption_batch, client, [titles[i] for i in batch], caption_type, log)
+        for batch in batches
+    )) if batches else []
+
+    title_kr = {}
+    for batch, batch_result in zip(batches, results):
+        title_kr.update(zip(batch, batch_result))
 
     translated = []
-    for cap in captions:
-        title = cap.get("title", "")
-        if not title:
+    for i, cap in enumerate(captions):
+        if i not in title_kr:
             translated.append(cap)
             continue
-
-        full_prompt = (
-            f"다음 논문 {'그림' if caption_type == 'figure' else '표'} 제목을 한국어로 번역.\n"
-            f"전문용어는 영어 병기.\n\n원문: {title}\n\n"
-            "번역된 한국어 제목만 출력:"
-        )
-        try:
-            # 번역은 항상 gpt-4o-mini 사용 (빠르고 저렴)
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional academic translator."},
-                    {"role": "user", "content": full_prompt},
-                ],
-                max_tokens=200,  # gpt-4o-mini는 max_tokens 사용
-            )
-            title_kr = resp.choices[0].message.content.strip()
-        except Exception as e:
-            # API 할당량 초과 등의 에러 시 원문 사용
-            if "insufficient_quota" in str(e):
-                log.warning(f"API quota exceeded - using original title")
-            else:
-                log.warning(f"Translation failed for '{title[:50]}...': {e}")
-            title_kr = title
-
         new_cap = cap.copy()
-        new_cap["title_kr"] = title_kr
+        new_cap["title_kr"] = title_kr[i]
         translated.append(new_cap)
 
     return translated
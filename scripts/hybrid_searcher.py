@@ -5,13 +5,25 @@ Hybrid Searcher for Multimodal RAG
 
 import os
 import sys
+import re
 import json
+import hashlib
+import threading
 import numpy as np
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any, Union
+from typing import List, Dict, Optional, Tuple, Any, Union, Set
 from datetime import datetime
 from PIL import Image
 import heapq
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional JIT for the hybrid merge score aggregation
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Add script directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -20,11 +32,97 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from text_rag_bge_m3 import TextRAGBGEM3
 from image_rag_clip import ImageRAGCLIP
 from relation_manager import RelationManager
+from brute_force_search import BRUTE_FORCE_MAX_VECTORS
 
 # Environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+# 쿼리 임베딩 LRU 크기 (같은 쿼리 재검색 시 인코더 생략)
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Query-intent cues, matched as substrings (case-insensitive) in one scan each
+_IMAGE_INTENT_RE = re.compile(
+    r'figure|graph|chart|diagram|image|plot|그림|도표|차트|그래프', re.IGNORECASE)
+_TEXT_INTENT_RE = re.compile(
+    r'abstract|introduction|methods|results|discussion|conclusion|'
+    r'초록|서론|방법|결과|논의|결론', re.IGNORECASE)
+
+# Enrichment kinds: 'related' (related images / text context), 'paper' (paper info)
+ENRICH_ALL = frozenset({'related', 'paper'})
+
+# Words dropped from extracted query keywords
+_STOP = frozenset({'the', 'and', 'or', 'in', 'on', 'at'})
+
+
+def _unique_results(results: List[Dict]) -> List[Dict]:
+    """Drop repeated hits, keyed by (modality, id); first occurrence wins."""
+    seen = set()
+    unique = []
+    for r in results:
+        key = (r.get('modality'), r.get('id'))
+        if key not in seen:
+            seen.add(key)
+            unique.append(r)
+    return unique
+
+
+def _paper_scores_numpy(codes, scores, is_text, n_papers):
+    """
+    Per-paper aggregates of flat merge columns using NumPy ufunc reductions.
+
+    Returns:
+        (combined score, text count, image count, first text index,
+         first image index) per paper code; -1 marks a missing modality
+    """
+    positions = np.arange(len(scores))
+
+    def per_paper(mask):
+        # max score, match count and first result index of one modality
+        best = np.full(n_papers, -np.inf)
+        np.maximum.at(best, codes[mask], scores[mask])
+        first = np.full(n_papers, len(scores), dtype=np.intp)
+        np.minimum.at(first, codes[mask], positions[mask])
+        counts = np.bincount(codes[mask], minlength=n_papers)
+        first[counts == 0] = -1
+        return np.where(counts > 0, best, 0.0), counts, first
+
+    text_max, text_counts, first_text = per_paper(is_text)
+    image_max, image_counts, first_image = per_paper(~is_text)
+    return text_max + image_max, text_counts, image_counts, first_text, first_image
+
+
+def _paper_scores_loop(codes, scores, is_text, n_papers):
+    """Same aggregates as _paper_scores_numpy in one pass (compiled by Numba)."""
+    text_max = np.full(n_papers, -np.inf)
+    image_max = np.full(n_papers, -np.inf)
+    text_counts = np.zeros(n_papers, dtype=np.int64)
+    image_counts = np.zeros(n_papers, dtype=np.int64)
+    first_text = np.full(n_papers, -1, dtype=np.int64)
+    first_image = np.full(n_papers, -1, dtype=np.int64)
+
+    for i in range(len(scores)):
+        p = codes[i]
+        if is_text[i]:
+            if first_text[p] < 0:
+                first_text[p] = i
+            text_counts[p] += 1
+            if scores[i] > text_max[p]:
+                text_max[p] = scores[i]
+        else:
+            if first_image[p] < 0:
+                first_image[p] = i
+            image_counts[p] += 1
+            if scores[i] > image_max[p]:
+                image_max[p] = scores[i]
+
+    combined = np.where(text_counts > 0, text_max, 0.0) + np.where(image_counts > 0, image_max, 0.0)
+    return combined, text_counts, image_counts, first_text, first_image
+
+
+# cache=True keeps the compiled kernel on disk so only the first run pays the JIT
+_paper_scores = njit(cache=True)(_paper_scores_loop) if NUMBA_AVAILABLE else _paper_scores_numpy
+
 
 class HybridSearcher:
     """
@@ -35,7 +133,9 @@ class HybridSearcher:
     def __init__(self,
                  text_db_type: str = "chroma",
                  image_db_type: str = "chroma",
-                 use_relations: bool = True):
+                 use_relations: bool = True,
+                 brute_force: bool = True,
+                 brute_force_int8: bool = False):
         """
         Initialize the hybrid searcher.
 
@@ -43,19 +143,29 @@ class HybridSearcher:
             text_db_type: Database type for text RAG
             image_db_type: Database type for image RAG
             use_relations: Whether to use relation manager
+            brute_force: Scan small ChromaDB collections exactly in memory
+                (SimSIMD cosine when installed) instead of querying HNSW
+            brute_force_int8: Run that scan over int8-quantized vectors
+                (top candidates are re-ranked in FP32)
         """
         print("🚀 Initializing Hybrid Searcher...")
 
         # Initialize individual RAG systems
+        brute_force_max_vectors = BRUTE_FORCE_MAX_VECTORS if brute_force else 0
+
         try:
-            self.text_rag = TextRAGBGEM3(db_type=text_db_type)
+            self.text_rag = TextRAGBGEM3(db_type=text_db_type,
+                                         brute_force_max_vectors=brute_force_max_vectors,
+                                         brute_force_int8=brute_force_int8)
             print("✅ Text RAG (BGE-M3) initialized")
         except Exception as e:
             print(f"⚠️ Text RAG initialization failed: {e}")
             self.text_rag = None
 
         try:
-            self.image_rag = ImageRAGCLIP(db_type=image_db_type)
+            self.image_rag = ImageRAGCLIP(db_type=image_db_type,
+                                          brute_force_max_vectors=brute_force_max_vectors,
+                                          brute_force_int8=brute_force_int8)
             print("✅ Image RAG (CLIP) initialized")
         except Exception as e:
             print(f"⚠️ Image RAG initialization failed: {e}")
@@ -72,15 +182,117 @@ class HybridSearcher:
         else:
             self.relations = None
 
+        # 텍스트/이미지 검색을 동시에 돌리기 위한 풀 (DB 쿼리 + 임베딩이 겹치도록)
+        self._executor = ThreadPoolExecutor(max_workers=4)
+
+        # (modality, sha256(query)) -> embedding; 쿼리 원문은 보관하지 않음
+        self._query_embeddings = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+
         print("✅ Hybrid Searcher ready")
 
+    def _cached_query_embedding(self,
+                                modality: str,
+                                query: str,
+                                encode,
+                                digest: Optional[bytes] = None) -> np.ndarray:
+        """
+        Return the embedding of query for modality, encoding it only on a miss.
+
+        Args:
+            modality: "text" (BGE-M3), "image" (CLIP text tower) or
+                      "image_file" (CLIP vision tower)
+            query: Search query (text, or image path)
+            encode: Encoder to call on a cache miss
+            digest: Content hash to key on instead of the query text
+
+        Returns:
+            Read-only query embedding
+        """
+        key = (modality, digest or hashlib.sha256(query.encode('utf-8')).digest())
+        embedding = self._embedding_get(key)
+        if embedding is None:
+            embedding = self._embedding_put(key, encode(query))
+        return embedding
+
+    def _cached_query_embeddings(self, modality: str, queries: List[str], encode_batch) -> np.ndarray:
+        """
+        Embeddings of several queries; all cache misses are encoded in one batch.
+
+        Args:
+            modality: "text" (BGE-M3) or "image" (CLIP text tower)
+            queries: Search queries
+            encode_batch: Batch encoder called once with the missing queries
+
+        Returns:
+            Query embeddings, one row per query
+        """
+        keys = [(modality, hashlib.sha256(q.encode('utf-8')).digest()) for q in queries]
+        found = {key: self._embedding_get(key) for key in keys}
+        missing = {key: q for key, q in zip(keys, queries) if found[key] is None}
+        if missing:
+            for key, embedding in zip(missing, encode_batch(list(missing.values()))):
+                found[key] = self._embedding_put(key, embedding)
+        return np.stack([found[key] for key in keys])
+
+    def _embedding_get(self, key: tuple) -> Optional[np.ndarray]:
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(key)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(key)
+            return embedding
+
+    def _embedding_put(self, key: tuple, embedding) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        embedding.setflags(write=False)  # shared between callers and threads
+
+        with self._query_embeddings_lock:
+            self._query_embeddings[key] = embedding
+            self._query_embeddings.move_to_end(key)
+            if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        return embedding
+
+    def _search_text(self, query: str, k: int, filter_dict: Optional[Dict] = None) -> List[Dict]:
+        """Text RAG search with the query embedding served from the LRU."""
+        embedding = self._cached_query_embedding('text', query, self.text_rag.embed_query)
+        return self.text_rag.search(query, k=k, filter_dict=filter_dict, query_embedding=embedding)
+
+    def _search_images_by_text(self, query: str, k: int, filter_dict: Optional[Dict] = None) -> List[Dict]:
+        """Text→image CLIP search with the query embedding served from the LRU."""
+        embedding = self._cached_query_embedding('image', query, self.image_rag.embed_text)
+        return self.image_rag.search_by_text(query, k=k, filter_dict=filter_dict, query_embedding=embedding)
+
+    def _search_by_image(self, image_path: str, k: int, filter_dict: Optional[Dict] = None) -> List[Dict]:
+        """Image→image CLIP search; the embedding is cached by file content."""
+        try:
+            with open(image_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).digest()
+            embedding = self._cached_query_embedding(
+                'image_file', image_path, self.image_rag.embed_image, digest)
+        except Exception as e:
+            print(f"Error loading query image: {e}")
+            return []
+        return self.image_rag.search_by_image(image_path, k=k, filter_dict=filter_dict, query_embedding=embedding)
+
+    def _search_text_batch(self, queries: List[str], k: int, filter_dict: Optional[Dict] = None) -> List[List[Dict]]:
+        """Batched text RAG search; uncached queries are encoded together."""
+        embeddings = self._cached_query_embeddings('text', queries, self.text_rag.embed_queries)
+        return self.text_rag.search_batch(queries, k=k, filter_dict=filter_dict, query_embeddings=embeddings)
+
+    def _search_images_by_text_batch(self, queries: List[str], k: int, filter_dict: Optional[Dict] = None) -> List[List[Dict]]:
+        """Batched text→image CLIP search; uncached queries are encoded together."""
+        embeddings = self._cached_query_embeddings('image', queries, self.image_rag.embed_texts)
+        return self.image_rag.search_by_text_batch(queries, k=k, filter_dict=filter_dict, query_embeddings=embeddings)
+
     def search_comprehensive(self,
                             query: str,
                             mode: str = "hybrid",
                             k: int = 10,
                             text_weight: float = 0.65,
                             image_weight: float = 0.35,
-                            filter_paper: Optional[str] = None) -> List[Dict]:
+                            filter_paper: Optional[str] = None,
+                            enrich: Optional[Set[str]] = None) -> List[Dict]:
         """
         Comprehensive search across text and image databases.
 
@@ -91,73 +303,170 @@ class HybridSearcher:
             text_weight: Weight for text results (hybrid mode)
             image_weight: Weight for image results (hybrid mode)
             filter_paper: Optional paper ID to filter results
+            enrich: Relation info to attach, subset of ENRICH_ALL (default all);
+                pass an empty set to skip relation lookups entirely
 
         Returns:
             List of search results with enriched information
         """
-        results = []
-
         # Prepare filter
         filter_dict = {'paper_id': filter_paper} if filter_paper else None
 
-        # Text search
-        if mode in ["text", "hybrid"] and self.text_rag:
-            text_results = self.text_rag.search(query, k=k*2, filter_dict=filter_dict)
-
-            # Enrich text results
-            for result in text_results:
-                result['modality'] = 'text'
-                result['weighted_score'] = result['score'] * text_weight if mode == "hybrid" else result['score']
-
-                # Add related images if relations available
-                if self.relations:
-                    chunk_id = result['id']
-                    related_images = self.relations.get_related_images(chunk_id)
-                    result['related_images'] = related_images[:3]  # Top 3 related images
-
-                    # Add paper info
-                    paper_id = result['metadata'].get('paper_id')
-                    if paper_id:
-                        paper_info = self.relations.get_paper_info(paper_id)
-                        if paper_info:
-                            result['paper_title'] = paper_info.get('title', '')
-                            result['paper_year'] = paper_info.get('year', 0)
-                            result['paper_authors'] = paper_info.get('authors', '')
-
-                results.extend([result])
-
-        # Image search
-        if mode in ["image", "hybrid"] and self.image_rag:
-            image_results = self.image_rag.search_by_text(query, k=k*2, filter_dict=filter_dict)
-
-            # Enrich image results
-            for result in image_results:
-                result['modality'] = 'image'
-                result['weighted_score'] = result['score'] * image_weight if mode == "hybrid" else result['score']
-
-                # Add text context if relations available
-                if self.relations:
-                    image_id = result['id']
-                    text_context = self.relations.get_image_context(image_id)
-                    result['text_context'] = text_context[:3]  # Top 3 related chunks
-
-                    # Add paper info
-                    paper_id = result['metadata'].get('paper_id')
-                    if paper_id:
-                        paper_info = self.relations.get_paper_info(paper_id)
-                        if paper_info:
-                            result['paper_title'] = paper_info.get('title', '')
-                            result['paper_year'] = paper_info.get('year', 0)
-                            result['paper_authors'] = paper_info.get('authors', '')
-
-                results.append(result)
+        # Dispatch both searches before enriching either, so in hybrid mode the
+        # text and image queries overlap instead of running back to back
+        run_text = mode in ["text", "hybrid"] and self.text_rag
+        run_image = mode in ["image", "hybrid"] and self.image_rag
+        if run_text:
+            f_text = self._executor.submit(self._search_text, query, k*2, filter_dict)
+        if run_image:
+            f_image = self._executor.submit(self._search_images_by_text, query, k*2, filter_dict)
+
+        text_results = f_text.result() if run_text else []
+        image_results = f_image.result() if run_image else []
+
+        return self._enrich_and_rank(text_results, image_results, mode, k, text_weight, image_weight,
+                                     ENRICH_ALL if enrich is None else enrich)
+
+    def search_batch(self,
+                     queries: List[str],
+                     mode: str = "hybrid",
+                     k: int = 10,
+                     text_weight: float = 0.65,
+                     image_weight: float = 0.35,
+                     filter_paper: Optional[str] = None,
+                     enrich: Optional[Set[str]] = None) -> List[List[Dict]]:
+        """
+        search_comprehensive for several queries at once.
+
+        Queries are embedded in one batch per model and each database is hit
+        with one multi-query request, so on the in-memory exact index every
+        corpus tile is reused across all queries (Q @ corpus.T).
+
+        Args:
+            queries: Search queries
+            mode: Search mode - "text", "image", or "hybrid"
+            k: Number of results per query
+            text_weight: Weight for text results (hybrid mode)
+            image_weight: Weight for image results (hybrid mode)
+            filter_paper: Optional paper ID to filter results
+            enrich: Relation info to attach, subset of ENRICH_ALL (default all)
+
+        Returns:
+            One list of enriched search results per query
+        """
+        if not queries:
+            return []
+
+        filter_dict = {'paper_id': filter_paper} if filter_paper else None
+
+        run_text = mode in ["text", "hybrid"] and self.text_rag
+        run_image = mode in ["image", "hybrid"] and self.image_rag
+        if run_text:
+            f_text = self._executor.submit(self._search_text_batch, queries, k*2, filter_dict)
+        if run_image:
+            f_image = self._executor.submit(self._search_images_by_text_batch, queries, k*2, filter_dict)
+
+        no_results = [[] for _ in queries]
+        text_batches = f_text.result() if run_text else no_results
+        image_batches = f_image.result() if run_image else no_results
+
+        enrich = ENRICH_ALL if enrich is None else enrich
+        return [self._enrich_and_rank(text_results, image_results, mode, k, text_weight, image_weight, enrich)
+                for text_results, image_results in zip(text_batches, image_batches)]
+
+    def _enrich_and_rank(self,
+                         text_results: List[Dict],
+                         image_results: List[Dict],
+                         mode: str,
+                         k: int,
+                         text_weight: float,
+                         image_weight: float,
+                         enrich: Set[str] = ENRICH_ALL) -> List[Dict]:
+        """
+        Add relation info and weighted scores to raw hits, then rank them.
+
+        Args:
+            text_results: Text RAG hits
+            image_results: Image RAG hits
+            mode: Search mode - "text", "image", or "hybrid"
+            k: Number of results to return
+            text_weight: Weight for text results (hybrid mode)
+            image_weight: Weight for image results (hybrid mode)
+            enrich: Relation info to attach ('related', 'paper')
+
+        Returns:
+            Top-k enriched results
+        """
+        results = []
+
+        # Loop invariants bound once
+        relations = self.relations
+        hybrid = mode == "hybrid"
+        add_related = bool(relations) and 'related' in enrich
+        add_paper = bool(relations) and 'paper' in enrich
+
+        # Fetch relations for all hits up front: one IN (...) query per relation
+        # type instead of a lookup per result, and only the kinds requested
+        if add_related:
+            get_related = relations.get_related_images_batch(
+                [r['id'] for r in text_results]).get
+            get_context = relations.get_image_context_batch(
+                [r['id'] for r in image_results]).get
+        if add_paper:
+            get_paper = relations.get_paper_info_batch(
+                [r['metadata'].get('paper_id') for r in text_results + image_results]).get
+
+        # Enrich text results
+        for result in text_results:
+            result['modality'] = 'text'
+            result['weighted_score'] = result['score'] * text_weight if hybrid else result['score']
+
+            # Add related images if relations available
+            if add_related:
+                result['related_images'] = get_related(result['id'], [])[:3]  # Top 3 related images
+
+            # Add paper info
+            if add_paper:
+                paper_id = result['metadata'].get('paper_id')
+                if paper_id:
+                    paper_info = get_paper(paper_id)
+                    if paper_info:
+                        result['paper_title'] = paper_info.get('title', '')
+                        result['paper_year'] = paper_info.get('year', 0)
+                        result['paper_authors'] = paper_info.get('authors', '')
+
+            results.append(result)
+
+        # Enrich image results
+        for result in image_results:
+            result['modality'] = 'image'
+            result['weighted_score'] = result['score'] * image_weight if hybrid else result['score']
+
+            # Add text context if relations available
+            if add_related:
+                result['text_context'] = get_context(result['id'], [])[:3]  # Top 3 related chunks
+
+            # Add paper info
+            if add_paper:
+                paper_id = result['metadata'].get('paper_id')
+                if paper_id:
+                    paper_info = get_paper(paper_id)
+                    if paper_info:
+                        result['paper_title'] = paper_info.get('title', '')
+                        result['paper_year'] = paper_info.get('year', 0)
+                        result['paper_authors'] = paper_info.get('authors', '')
+
+            results.append(result)
+
+        # Same hit twice (e.g. overlapping batches) would take two top-k slots
+        results = _unique_results(results)
 
         # Merge and rank results for hybrid mode
-        if mode == "hybrid" and len(results) > 0:
+        if hybrid and len(results) > 0:
             results = self._merge_and_rank_results(results, k)
         else:
-            # Simple sorting for single-mode search
-            results = sorted(results, key=lambda x: x.get('weighted_score', x.get('score', 0)), reverse=True)[:k]
+            # Simple top-k for single-mode search
+            results = heapq.nlargest(k, results, key=lambda x: x.get('weighted_score', x.get('score', 0)))
 
         return results
 
@@ -174,75 +483,55 @@ class HybridSearcher:
         Returns:
             Merged and ranked results
         """
-        # Group results by paper
-        paper_groups = {}
-        for result in results:
-            paper_id = result['metadata'].get('paper_id', 'unknown')
-            if paper_id not in paper_groups:
-                paper_groups[paper_id] = {
-                    'text_results': [],
-                    'image_results': [],
-                    'max_score': 0,
-                    'paper_info': {}
-                }
-
-            if result['modality'] == 'text':
-                paper_groups[paper_id]['text_results'].append(result)
-            else:
-                paper_groups[paper_id]['image_results'].append(result)
-
-            # Track maximum score and paper info
-            score = result.get('weighted_score', result.get('score', 0))
-            if score > paper_groups[paper_id]['max_score']:
-                paper_groups[paper_id]['max_score'] = score
-                paper_groups[paper_id]['paper_info'] = {
-                    'title': result.get('paper_title', ''),
-                    'year': result.get('paper_year', 0),
-                    'authors': result.get('paper_authors', '')
-                }
+        if not results:
+            return []
 
-        # Create merged results
-        merged = []
-        for paper_id, group in paper_groups.items():
-            # Calculate combined score
-            text_scores = [r.get('weighted_score', 0) for r in group['text_results']]
-            image_scores = [r.get('weighted_score', 0) for r in group['image_results']]
-
-            combined_score = max(text_scores) if text_scores else 0
-            combined_score += max(image_scores) if image_scores else 0
-
-            # Create merged result
-            merged_result = {
-                'paper_id': paper_id,
-                'combined_score': combined_score,
-                'text_matches': len(group['text_results']),
-                'image_matches': len(group['image_results']),
-                'best_text': group['text_results'][0] if group['text_results'] else None,
-                'best_image': group['image_results'][0] if group['image_results'] else None,
-                'paper_info': group['paper_info']
-            }
-            merged.append(merged_result)
-
-        # Sort by combined score
-        merged = sorted(merged, key=lambda x: x['combined_score'], reverse=True)
+        # Flat per-result columns: paper code (first-appearance order), score,
+        # modality. Per-paper aggregates then run in native code.
+        paper_codes = {}
+        codes = np.fromiter(
+            (paper_codes.setdefault(r['metadata'].get('paper_id', 'unknown'), len(paper_codes))
+             for r in results), dtype=np.intp, count=len(results))
+        scores = np.fromiter((r.get('weighted_score', 0) for r in results),
+                             dtype=np.float64, count=len(results))
+        is_text = np.fromiter((r['modality'] == 'text' for r in results),
+                              dtype=bool, count=len(results))
+        n_papers = len(paper_codes)
+
+        combined, text_counts, image_counts, first_text, first_image = _paper_scores(
+            codes, scores, is_text, n_papers)
+
+        # Top-k papers by combined score, found without sorting every paper:
+        # keep those at or above the k-th largest score (ties included), then
+        # order only that slice; the stable sort keeps first-appearance order
+        if n_papers > k:
+            kth = np.partition(combined, n_papers - k)[n_papers - k]
+            candidates = np.flatnonzero(combined >= kth)
+        else:
+            candidates = np.arange(n_papers)
+        top = candidates[np.argsort(-combined[candidates], kind='stable')[:k]]
 
         # Expand back to individual results
         final_results = []
-        for m in merged[:k]:
+        for p in top:
+            best_text = results[first_text[p]] if first_text[p] >= 0 else None
+            best_image = results[first_image[p]] if first_image[p] >= 0 else None
+            combined_score = float(combined[p])
+
             # Add best text result
-            if m['best_text']:
-                m['best_text']['combined_score'] = m['combined_score']
-                final_results.append(m['best_text'])
+            if best_text:
+                best_text['combined_score'] = combined_score
+                final_results.append(best_text)
 
             # Add best image result if no text or high image score
-            if m['best_image'] and (not m['best_text'] or m['image_matches'] > m['text_matches']):
-                m['best_image']['combined_score'] = m['combined_score']
-                final_results.append(m['best_image'])
+            if best_image and (not best_text or image_counts[p] > text_counts[p]):
+                best_image['combined_score'] = combined_score
+                final_results.append(best_image)
 
             if len(final_results) >= k:
                 break
 
-        return final_results[:k]
+        return _unique_results(final_results)[:k]
 
     def find_paper_by_image(self,
                             image_path: str,
@@ -262,38 +551,37 @@ class HybridSearcher:
             return []
 
         # Search for similar images
-        similar_images = self.image_rag.search_by_image(image_path, k=k*3)
+        similar_images = self._search_by_image(image_path, k*3)
+
+        # Paper info for every distinct paper in a single lookup
+        paper_infos = {}
+        if self.relations:
+            paper_infos = self.relations.get_paper_info_batch(
+                [img['metadata'].get('paper_id') for img in similar_images])
 
         # Group by paper and enrich
         papers = {}
         for img in similar_images:
             paper_id = img['metadata'].get('paper_id')
-            if paper_id not in papers:
-                papers[paper_id] = {
+            paper = papers.get(paper_id)
+            if paper is None:
+                # Hits arrive best first, so the first image sets the paper's score
+                paper = papers[paper_id] = {
                     'paper_id': paper_id,
                     'best_match_score': img['score'],
                     'matched_images': [],
-                    'paper_info': {}
+                    'paper_info': paper_infos.get(paper_id, {})
                 }
 
-                # Get paper info from relations
-                if self.relations:
-                    paper_info = self.relations.get_paper_info(paper_id)
-                    if paper_info:
-                        papers[paper_id]['paper_info'] = paper_info
-
-            papers[paper_id]['matched_images'].append({
+            paper['matched_images'].append({
                 'image_id': img['id'],
                 'score': img['score'],
                 'page': img['metadata'].get('page', 0),
                 'caption': img.get('caption', '')
             })
 
-        # Convert to list and sort
-        paper_list = list(papers.values())
-        paper_list = sorted(paper_list, key=lambda x: x['best_match_score'], reverse=True)
-
-        return paper_list[:k]
+        # Top-k papers by best match
+        return heapq.nlargest(k, papers.values(), key=lambda x: x['best_match_score'])
 
     def get_paper_summary(self, paper_id: str) -> Dict:
         """
@@ -314,6 +602,13 @@ class HybridSearcher:
             'statistics': {}
         }
 
+        # Vector DB lookups run on the pool while the relation lookups run here
+        # (the SQLite connection belongs to this thread)
+        if self.text_rag:
+            f_text = self._executor.submit(self.text_rag.list_by_paper, paper_id, 100)
+        if self.image_rag:
+            f_images = self._executor.submit(self.image_rag.get_paper_images, paper_id)
+
         # Get paper info from relations
         if self.relations:
             paper_info = self.relations.get_paper_info(paper_id)
@@ -323,14 +618,13 @@ class HybridSearcher:
 
         # Get text chunks
         if self.text_rag:
-            filter_dict = {'paper_id': paper_id}
-            text_chunks = self.text_rag.search("", k=100, filter_dict=filter_dict)
-            summary['text_chunks'] = text_chunks[:10]  # Top 10 chunks
+            text_chunks = f_text.result()
+            summary['text_chunks'] = text_chunks[:10]  # First 10 chunks
             summary['statistics']['total_text_chunks'] = len(text_chunks)
 
         # Get images
         if self.image_rag:
-            images = self.image_rag.get_paper_images(paper_id)
+            images = f_images.result()
             summary['images'] = images
             summary['statistics']['total_images'] = len(images)
 
@@ -356,17 +650,24 @@ class HybridSearcher:
         results = []
 
         if query_type == "text":
-            # Text query
-            if target_type in ["image", "both"] and self.image_rag:
+            # Text query: both targets are submitted up front and run concurrently
+            run_image = target_type in ["image", "both"] and self.image_rag
+            run_text = target_type in ["text", "both"] and self.text_rag
+            if run_image:
+                f_image = self._executor.submit(self._search_images_by_text, query, k)
+            if run_text:
+                f_text = self._executor.submit(self._search_text, query, k)
+
+            if run_image:
                 # Text → Image search using CLIP
-                image_results = self.image_rag.search_by_text(query, k=k)
+                image_results = f_image.result()
                 for r in image_results:
                     r['search_type'] = 'text_to_image'
                 results.extend(image_results)
 
-            if target_type in ["text", "both"] and self.text_rag:
+            if run_text:
                 # Regular text search
-                text_results = self.text_rag.search(query, k=k)
+                text_results = f_text.result()
                 for r in text_results:
                     r['search_type'] = 'text_to_text'
                 results.extend(text_results)
@@ -375,7 +676,7 @@ class HybridSearcher:
             # Image query
             if target_type in ["image", "both"] and self.image_rag:
                 # Image → Image search
-                image_results = self.image_rag.search_by_image(query, k=k)
+                image_results = self._search_by_image(query, k)
                 for r in image_results:
                     r['search_type'] = 'image_to_image'
                 results.extend(image_results)
@@ -383,8 +684,8 @@ class HybridSearcher:
             # Note: Image → Text search would require different approach
             # (e.g., generating text description from image first)
 
-        # Sort by score
-        results = sorted(results, key=lambda x: x.get('score', 0), reverse=True)[:k]
+        # Top-k by score
+        results = heapq.nlargest(k, results, key=lambda x: x.get('score', 0))
 
         return results
 
@@ -406,24 +707,18 @@ class HybridSearcher:
         }
 
         # Check for image-related keywords
-        image_keywords = ['figure', 'graph', 'chart', 'diagram', 'image', 'plot',
-                         '그림', '도표', '차트', '그래프']
-        for keyword in image_keywords:
-            if keyword.lower() in query.lower():
-                analysis['recommended_mode'] = 'image'
-                analysis['likely_targets'].append('image')
+        if _IMAGE_INTENT_RE.search(query):
+            analysis['recommended_mode'] = 'image'
+            analysis['likely_targets'].append('image')
 
         # Check for text-heavy keywords
-        text_keywords = ['abstract', 'introduction', 'methods', 'results', 'discussion',
-                        'conclusion', '초록', '서론', '방법', '결과', '논의', '결론']
-        for keyword in text_keywords:
-            if keyword.lower() in query.lower():
-                analysis['recommended_mode'] = 'text'
-                analysis['likely_targets'].append('text')
+        if _TEXT_INTENT_RE.search(query):
+            analysis['recommended_mode'] = 'text'
+            analysis['likely_targets'].append('text')
 
         # Extract potential keywords
         words = query.split()
-        keywords = [w for w in words if len(w) > 3 and not w.lower() in ['the', 'and', 'or', 'in', 'on', 'at']]
+        keywords = [w for w in words if len(w) > 3 and w.lower() not in _STOP]
         analysis['keywords'] = keywords
 
         return analysis
@@ -451,6 +746,9 @@ class HybridSearcher:
 
     def close(self):
         """Close all connections."""
+        self._executor.shutdown(wait=True)
+        if self.image_rag:
+            self.image_rag.close()
         if self.relations:
             self.relations.close()
 
@@ -7,6 +7,14 @@ True multimodal embeddings for cross-modal search
 import os
 import sys
 import json
+import atexit
+import threading
+import weakref
+from contextlib import nullcontext
+from dataclasses import dataclass
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any
@@ -19,6 +27,7 @@ import hashlib
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import custom modules
+from brute_force_search import BruteForceIndex
 from text_extractor import extract_text_and_images
 
 # Environment variables
@@ -33,6 +42,29 @@ except ImportError:
     CLIP_AVAILABLE = False
     print("⚠️ Sentence Transformers not available. Install with: pip install sentence-transformers")
 
+# Direct open_clip backend (clip_backend="open_clip"): one encode_image per batch
+try:
+    import open_clip
+    OPEN_CLIP_AVAILABLE = True
+except ImportError:
+    OPEN_CLIP_AVAILABLE = False
+
+# torch is only needed for inference_mode and releasing CUDA memory after an OOM
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+# libjpeg-turbo SIMD decoder for JPEG figures; PIL decodes everything otherwise
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbo_jpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except Exception:
+    # ImportError, or the libturbojpeg shared library is missing
+    TURBOJPEG_AVAILABLE = False
+
 # Vector database imports
 try:
     import chromadb
@@ -42,6 +74,13 @@ except ImportError:
     CHROMA_AVAILABLE = False
     print("⚠️ ChromaDB not available. Install with: pip install chromadb")
 
+# In-process FAISS HNSW + SQLite store (db_type="faiss")
+try:
+    from faiss_image_store import FaissImageStore
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
 try:
     from pinecone import Pinecone, ServerlessSpec
     PINECONE_AVAILABLE = True
@@ -49,6 +88,244 @@ except ImportError:
     PINECONE_AVAILABLE = False
     print("⚠️ Pinecone not available. Install with: pip install pinecone-client")
 
+# Shorter side CLIP's preprocessor resizes to (ViT-B/32, B/16, L/14)
+CLIP_INPUT_SIZE = 224
+
+# Below this many images, handing decodes to the decode threads isn't worth it
+PARALLEL_DECODE_MIN_IMAGES = 8
+
+# Append-only raw copy of every stored vector (float32 rows, np.memmap-able)
+# plus a JSONL sidecar with one {"id", "metadata"} line per row
+EMBEDDING_STORE_FILE = "embeddings.f32"
+EMBEDDING_STORE_INDEX = "embeddings.jsonl"
+
+# FAISS: rows added before the index file is rewritten and papers marked processed
+FAISS_PERSIST_ROWS = 10000
+
+# Background DB writes allowed in flight before process_paper waits
+STORE_QUEUE_DEPTH = 2
+
+# Pinecone upserts: vectors per request, vectors in flight at once, client threads
+PINECONE_UPSERT_BATCH = 64
+PINECONE_UPSERT_CHUNK = 1000
+PINECONE_POOL_THREADS = 30
+
+
+@dataclass
+class ImageRecord:
+    """One extracted image on its way to the vector database."""
+    # Explicit slots (no per-instance __dict__); fields therefore have no defaults
+    __slots__ = ('paper_id', 'image_id', 'filename', 'path', 'page', 'width', 'height',
+                 'is_featured', 'caption_text', 'caption_id',
+                 'paper_title', 'paper_year', 'paper_authors')
+    paper_id: str
+    image_id: str
+    filename: str
+    path: str
+    page: int
+    width: int
+    height: int
+    is_featured: bool
+    caption_text: str
+    caption_id: Optional[str]
+    paper_title: str
+    paper_year: Any
+    paper_authors: Any
+
+
+# Instances not yet closed; the exit hook below flushes them. Weak references, so an
+# instance dropped without close() can still be garbage collected.
+_open_instances = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_instances():
+    """Don't lose buffered rows if a caller never calls flush()/close()."""
+    for rag in list(_open_instances):
+        try:
+            rag.close()
+        except Exception as e:
+            print(f"  ❌ Failed to write buffered images at exit: {e}")
+
+
+def _read_embedding_index(index_path: str) -> Tuple[List[Dict], List[int]]:
+    """
+    Parse the embedding store's JSONL sidecar up to its last complete line.
+
+    A torn final line left by an interrupted append is ignored.
+
+    Returns:
+        (records, byte offset just past each record's line)
+    """
+    records, ends = [], []
+    offset = 0
+    with open(index_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            if line.strip():
+                records.append(json.loads(line))
+                ends.append(offset)
+    return records, ends
+
+
+def _chunks(iterable, size: int):
+    """Yield successive tuples of up to size items."""
+    it = iter(iterable)
+    chunk = tuple(islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = tuple(islice(it, size))
+
+
+def _decode_and_resize(image_path: str):
+    """
+    Decode an image to RGB at CLIP input scale (runs in the decode threads).
+
+    JPEGs are decoded reduced-size by libjpeg itself (turbojpeg scaling or
+    PIL draft mode). Anything still larger is shrunk once with BICUBIC so the
+    shorter side is CLIP_INPUT_SIZE - the same resize CLIP's preprocessor
+    applies, done here in parallel (PIL and libjpeg-turbo release the GIL).
+
+    Returns:
+        (PIL image, None) on success, (None, error message) on failure
+    """
+    try:
+        image = None
+        if TURBOJPEG_AVAILABLE and image_path.lower().endswith(('.jpg', '.jpeg')):
+            try:
+                with open(image_path, 'rb') as f:
+                    data = f.read()
+                width, height, _, _ = _turbo_jpeg.decode_header(data)
+                # Largest IDCT scale-down that keeps the short side >= CLIP input
+                scale = next(((1, d) for d in (8, 4, 2)
+                              if min(width, height) // d >= CLIP_INPUT_SIZE), None)
+                # RGB (not OpenCV-style BGR) to match CLIP's preprocessing
+                image = Image.fromarray(_turbo_jpeg.decode(
+                    data, pixel_format=TJPF_RGB, scaling_factor=scale))
+            except OSError:
+                # e.g. CMYK or truncated JPEGs turbojpeg rejects; PIL copes with them
+                image = None
+        if image is None:
+            image = Image.open(image_path)
+            # JPEG only (no-op otherwise): decode at 1/2..1/8 scale, short side >= target
+            image.draft('RGB', (CLIP_INPUT_SIZE, CLIP_INPUT_SIZE))
+            image = image.convert('RGB')
+
+        short_side = min(image.size)
+        if short_side > CLIP_INPUT_SIZE:
+            ratio = CLIP_INPUT_SIZE / short_side
+            image = image.resize((max(1, round(image.width * ratio)),
+                                  max(1, round(image.height * ratio))),
+                                 Image.Resampling.BICUBIC)
+
+        return image, None
+    except Exception as e:
+        return None, str(e)
+
+
+# sentence-transformers CLIP names -> (open_clip architecture, pretrained tag)
+OPEN_CLIP_MODELS = {
+    "clip-ViT-B-32": ("ViT-B-32", "openai"),
+    "clip-ViT-B-16": ("ViT-B-16", "openai"),
+    "clip-ViT-L-14": ("ViT-L-14", "openai"),
+}
+
+
+class OpenCLIPEncoder:
+    """
+    open_clip CLIP model behind the slice of the SentenceTransformer API used here.
+
+    encode() stacks each batch's preprocessed images into one tensor and calls
+    encode_image (or tokenizes and calls encode_text), so ImageRAGCLIP can
+    swap it in for SentenceTransformer unchanged. Same OpenAI weights, so
+    vectors live in the same space as the sentence-transformers model.
+    """
+
+    def __init__(self, model_name: str):
+        """
+        Load an OpenAI CLIP checkpoint through open_clip.
+
+        Args:
+            model_name: sentence-transformers style name (see OPEN_CLIP_MODELS)
+        """
+        if model_name not in OPEN_CLIP_MODELS:
+            raise ValueError(f"No open_clip mapping for {model_name}: {sorted(OPEN_CLIP_MODELS)}")
+        arch, pretrained = OPEN_CLIP_MODELS[model_name]
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        model, _, self.preprocess = open_clip.create_model_and_transforms(arch, pretrained=pretrained)
+        self.model = model.to(self.device).eval()
+        self.tokenizer = open_clip.get_tokenizer(arch)
+        self.dtype = torch.float32
+        self.compiled = False
+
+    def half(self):
+        """Switch weights (and image inputs) to FP16."""
+        self.model.half()
+        self.dtype = torch.float16
+        return self
+
+    def compile(self, batch_size: int):
+        """
+        Compile the vision tower for (batch_size, 3, H, W) inputs and warm it up.
+
+        Image batches are padded to batch_size afterwards so the compiled graph
+        only ever sees one shape. No-op on torch builds without torch.compile.
+        """
+        compile_fn = getattr(torch, 'compile', None)
+        if compile_fn is None:
+            print("⚠️ torch.compile unavailable; running eagerly")
+            return
+        self.model.visual = compile_fn(self.model.visual, mode='reduce-overhead', dynamic=False)
+        self.compiled = True
+
+        size = self.model.visual.image_size
+        if isinstance(size, int):
+            size = (size, size)
+        print(f"   - Compiling vision tower for batch {batch_size} (one-time warmup)...")
+        warmup = [torch.zeros((3, *size))] * batch_size
+        with torch.inference_mode():
+            self._encode_pixels(warmup, batch_size)
+
+    def _encode_pixels(self, pixels: List[Any], batch_size: int):
+        """encode_image on preprocessed tensors, zero-padded to batch_size when compiled."""
+        count = len(pixels)
+        if self.compiled and count < batch_size:
+            pixels = pixels + [torch.zeros_like(pixels[0])] * (batch_size - count)
+        batch = torch.stack(pixels).to(self.device, dtype=self.dtype, non_blocking=True)
+        return self.model.encode_image(batch)[:count]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.visual.output_dim
+
+    def encode(self, inputs, batch_size: int = 32, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Embed a string, a PIL image, or a list of either.
+
+        Returns:
+            One row per input (a single vector for a single input)
+        """
+        single = isinstance(inputs, (str, Image.Image))
+        items = [inputs] if single else list(inputs)
+
+        outputs = []
+        with torch.inference_mode():
+            for start in range(0, len(items), batch_size):
+                batch = items[start:start + batch_size]
+                if isinstance(batch[0], str):
+                    features = self.model.encode_text(self.tokenizer(batch).to(self.device))
+                else:
+                    features = self._encode_pixels(
+                        [self.preprocess(image) for image in batch], batch_size)
+                outputs.append(features.float().cpu().numpy())
+
+        if not outputs:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        embeddings = np.concatenate(outputs)
+        return embeddings[0] if single else embeddings
+
 
 class ImageRAGCLIP:
     """
@@ -60,24 +337,86 @@ class ImageRAGCLIP:
                  db_type: str = "chroma",
                  db_path: str = "./image_rag_clip",
                  model_name: str = "clip-ViT-B-32",
-                 max_images_per_paper: int = 20):
+                 max_images_per_paper: int = 20,
+                 brute_force_max_vectors: int = 0,
+                 brute_force_int8: bool = False,
+                 encode_batch_size: int = 32,
+                 decode_workers: Optional[int] = None,
+                 flush_batch_size: int = 250,
+                 cache_embeddings: bool = True,
+                 fp16: Optional[bool] = None,
+                 store_embeddings: bool = True,
+                 clip_backend: str = "sentence-transformers",
+                 compile_model: bool = False):
         """
         Initialize Image RAG with CLIP.
 
         Args:
-            db_type: "chroma" or "pinecone"
-            db_path: Path for ChromaDB storage
+            db_type: "chroma", "faiss" or "pinecone"
+            db_path: Path for ChromaDB / FAISS storage
             model_name: CLIP model variant to use
             max_images_per_paper: Maximum images to process per paper
+            brute_force_max_vectors: Search ChromaDB collections up to this size
+                exactly in memory (0 disables)
+            brute_force_int8: Scan that in-memory copy as int8, re-ranking in FP32
+            encode_batch_size: Images per CLIP forward pass (halved on CUDA OOM)
+            decode_workers: Threads decoding images in parallel (default: CPU count);
+                one pool per instance, shared by every thread using it
+            flush_batch_size: Buffer ChromaDB rows across papers and add() them
+                once this many are pending (0 writes every paper immediately)
+            cache_embeddings: Reuse image embeddings keyed by file SHA-256,
+                stored under db_path/emb_cache/<model>
+            fp16: Run CLIP in half precision (default: only when on CUDA)
+            store_embeddings: Also append stored vectors to db_path/embeddings.f32
+                for re-indexing without re-encoding (see load_embedding_store)
+            clip_backend: "sentence-transformers" or "open_clip" (direct
+                encode_image/encode_text calls on the same OpenAI weights)
+            compile_model: torch.compile the open_clip vision tower for a fixed
+                encode_batch_size (warmed up here, not on the first paper)
         """
         self.db_type = db_type
         self.db_path = db_path
         self.max_images_per_paper = max_images_per_paper
+        self.brute_force_max_vectors = brute_force_max_vectors
+        self.brute_force_int8 = brute_force_int8
+        self.encode_batch_size = encode_batch_size
+        self.decode_workers = decode_workers or os.cpu_count() or 1
+        self._decode_executor = None
+        self._decode_executor_lock = threading.Lock()
+        self.flush_batch_size = flush_batch_size
+        self.store_embeddings = store_embeddings
+        # Rows in the embedding store; None until checked by the first append
+        self._store_rows = None
+        # Backends preprocess slightly differently, so each gets its own cache
+        cache_name = model_name.replace('/', '_')
+        if clip_backend == "open_clip":
+            cache_name += "-open_clip"
+        self.embedding_cache_dir = (os.path.join(db_path, "emb_cache", cache_name)
+                                    if cache_embeddings else None)
+
+        # ChromaDB rows waiting to be written; their papers are marked processed
+        # only after the add() succeeds
+        self._pending = {'ids': [], 'documents': [], 'embeddings': [], 'metadatas': []}
+        self._pending_papers = []
+        self._pending_lock = threading.Lock()
+
+        # Single background writer so DB writes overlap decoding/encoding
+        self._store_executor = ThreadPoolExecutor(max_workers=1)
+        self._store_futures = deque()
+        self._store_lock = threading.Lock()
+        self._write_lock = threading.Lock()
 
         # Initialize CLIP model
-        if CLIP_AVAILABLE:
-            print(f"🚀 Loading CLIP model: {model_name}...")
-            self.model = SentenceTransformer(model_name)
+        if clip_backend not in ("sentence-transformers", "open_clip"):
+            raise ValueError(f"Unknown CLIP backend: {clip_backend}")
+        if clip_backend == "open_clip" and not OPEN_CLIP_AVAILABLE:
+            raise ValueError("open_clip not available. Install with: pip install open_clip_torch")
+        if clip_backend == "open_clip" or CLIP_AVAILABLE:
+            print(f"🚀 Loading CLIP model: {model_name} ({clip_backend})...")
+            if clip_backend == "open_clip":
+                self.model = OpenCLIPEncoder(model_name)
+            else:
+                self.model = SentenceTransformer(model_name)
             # Get embedding dimension - CLIP ViT-B-32 is 512
             try:
                 self.embedding_dim = self.model.get_sentence_embedding_dimension()
@@ -93,6 +432,18 @@ class ImageRAGCLIP:
             if self.embedding_dim is None:
                 self.embedding_dim = 512  # Default for CLIP ViT-B-32
 
+            # ViT-B/32 is safe in FP16; halves weight/activation bandwidth on GPU
+            on_cuda = self.model.device.type == 'cuda'
+            self.fp16 = on_cuda if fp16 is None else (fp16 and on_cuda)
+            if self.fp16:
+                self.model.half()
+
+            if compile_model:
+                if clip_backend == "open_clip":
+                    self.model.compile(self.encode_batch_size)
+                else:
+                    print("⚠️ compile_model needs clip_backend='open_clip'; running eagerly")
+
             print(f"✅ CLIP loaded successfully")
             print(f"   - Model: {model_name}")
             print(f"   - Embedding dimension: {self.embedding_dim}")
@@ -103,15 +454,24 @@ class ImageRAGCLIP:
         # Initialize vector database
         self._init_vector_db()
 
-        # Track processed papers
+        # Track processed papers (db_path also holds the embedding store)
+        os.makedirs(self.db_path, exist_ok=True)
         self.processed_papers = set()
         self._load_processed_papers()
 
+        # Kept open (line-buffered) so marking a paper is one write, not open/close
+        self._processed_lock = threading.Lock()
+        self._processed_file = open(os.path.join(self.db_path, "processed_papers.txt"),
+                                    'a', buffering=1)
+
         # Image processing settings
         self.supported_formats = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff'}
 
+        # Closed at interpreter exit unless the caller closes it first
+        _open_instances.add(self)
+
     def _init_vector_db(self):
-        """Initialize the vector database (ChromaDB or Pinecone)."""
+        """Initialize the vector database (ChromaDB, FAISS or Pinecone)."""
         if self.db_type == "chroma" and CHROMA_AVAILABLE:
             # Initialize ChromaDB
             self.client = chromadb.PersistentClient(
@@ -131,6 +491,11 @@ class ImageRAGCLIP:
                 self.collection = self.client.get_collection(collection_name)
                 print(f"✅ Using existing ChromaDB collection: {collection_name}")
 
+            # Exact in-memory scan while the collection is small
+            self.exact_index = (BruteForceIndex(self.collection, self.brute_force_max_vectors,
+                                                int8=self.brute_force_int8)
+                                if self.brute_force_max_vectors else None)
+
         elif self.db_type == "pinecone" and PINECONE_AVAILABLE:
             # Initialize Pinecone
             api_key = os.getenv('PINECONE_API_KEY')
@@ -153,7 +518,16 @@ class ImageRAGCLIP:
             else:
                 print(f"✅ Using existing Pinecone index: {index_name}")
 
-            self.pinecone_index = pc.Index(index_name)
+            # pool_threads lets upsert(async_req=True) send requests in parallel
+            self.pinecone_index = pc.Index(index_name, pool_threads=PINECONE_POOL_THREADS)
+            self.exact_index = None
+
+        elif self.db_type == "faiss" and FAISS_AVAILABLE:
+            # Collection-compatible store, so the ChromaDB code paths apply
+            self.collection = FaissImageStore(self.db_path, self.embedding_dim)
+            self.exact_index = None
+            self._unpersisted_papers = []
+            print(f"✅ Using FAISS image store: {self.db_path} ({self.collection.count()} images)")
         else:
             raise ValueError(f"Database type {self.db_type} not available")
 
@@ -167,11 +541,9 @@ class ImageRAGCLIP:
 
     def _save_processed_paper(self, paper_id: str):
         """Save paper ID as processed."""
-        self.processed_papers.add(paper_id)
-        processed_file = os.path.join(self.db_path, "processed_papers.txt")
-        os.makedirs(self.db_path, exist_ok=True)
-        with open(processed_file, 'a') as f:
-            f.write(f"{paper_id}\n")
+        with self._processed_lock:
+            self.processed_papers.add(paper_id)
+            self._processed_file.write(f"{paper_id}\n")
 
     def process_paper(self,
                      paper_id: str,
@@ -202,9 +574,8 @@ class ImageRAGCLIP:
         try:
             print(f"\n🖼️ Processing images from: {paper_id}")
 
-            # Create output directory for images
+            # Output directory for images (created by the extractor)
             image_dir = os.path.join(self.db_path, "extracted_images", paper_id)
-            os.makedirs(image_dir, exist_ok=True)
 
             # Extract images from PDF
             print("  📖 Extracting images from PDF...")
@@ -231,53 +602,61 @@ class ImageRAGCLIP:
             image_caption_map = self._match_images_captions(images, captions)
             print(f"  ✓ Matched {len(image_caption_map)} images with captions")
 
+            # One directory listing instead of an exists() stat per image
+            try:
+                with os.scandir(image_dir) as entries:
+                    existing = {entry.name for entry in entries}
+            except FileNotFoundError:
+                existing = set()
+
+            # Paper-level fields are the same for every image
+            metadata = metadata or {}
+            paper_title = metadata.get('title', '')
+            paper_year = metadata.get('year', 0)
+            paper_authors = metadata.get('authors', '')
+            featured_name = featured_image.get('filename') if featured_image else None
+
             # Process each image
             image_data = []
             for i, img_info in enumerate(images):
-                img_path = os.path.join(image_dir, img_info['filename'])
+                filename = img_info['filename']
+                img_path = os.path.join(image_dir, filename)
 
-                if not os.path.exists(img_path):
+                if filename not in existing:
                     print(f"  ⚠️ Image file not found: {img_path}")
                     continue
 
                 # Get caption if available
-                caption = image_caption_map.get(img_info['filename'], {})
-
-                # Create image metadata
-                img_metadata = {
-                    'paper_id': paper_id,
-                    'image_id': f"{paper_id}#I{i:03d}",
-                    'filename': img_info['filename'],
-                    'path': img_path,
-                    'page': img_info.get('page', 0),
-                    'width': img_info.get('width', 0),
-                    'height': img_info.get('height', 0),
-                    'is_featured': img_info.get('filename') == featured_image.get('filename') if featured_image else False,
-                    'caption_text': caption.get('text', ''),
-                    'caption_id': f"{paper_id}#C{i:03d}" if caption else None
-                }
-
-                # Add paper metadata if provided
-                if metadata:
-                    img_metadata['paper_title'] = metadata.get('title', '')
-                    img_metadata['paper_year'] = metadata.get('year', 0)
-                    img_metadata['paper_authors'] = metadata.get('authors', '')
-
-                image_data.append(img_metadata)
+                caption = image_caption_map.get(filename, {})
+
+                image_data.append(ImageRecord(
+                    paper_id=paper_id,
+                    image_id=f"{paper_id}#I{i:03d}",
+                    filename=filename,
+                    path=img_path,
+                    page=img_info.get('page', 0),
+                    width=img_info.get('width', 0),
+                    height=img_info.get('height', 0),
+                    is_featured=featured_image is not None and filename == featured_name,
+                    caption_text=caption.get('text', ''),
+                    caption_id=f"{paper_id}#C{i:03d}" if caption else None,
+                    paper_title=paper_title,
+                    paper_year=paper_year,
+                    paper_authors=paper_authors
+                ))
 
             stats['images'] = len(image_data)
 
             # Generate embeddings for images
             print(f"  🔢 Generating CLIP embeddings for {len(image_data)} images...")
             embeddings = self._generate_image_embeddings(image_data)
+            # Unit-length rows in one vectorized pass (zero fallbacks stay zero)
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
             stats['embeddings'] = len(embeddings)
             print(f"  ✓ Generated {len(embeddings)} embeddings")
 
-            # Store in vector database
-            self._store_images(image_data, embeddings)
-
-            # Mark as processed
-            self._save_processed_paper(paper_id)
+            # Store in vector database (also marks the paper as processed)
+            self._store_images(image_data, embeddings, paper_id)
             print(f"  ✅ Successfully processed: {stats['images']} images")
 
         except Exception as e:
@@ -302,38 +681,42 @@ class ImageRAGCLIP:
         Returns:
             Prioritized list of images
         """
-        prioritized = []
+        selected = []
+        # Keyed by filename: one file listed twice by the extractor is one image
+        seen = set()
+
+        def take(order) -> bool:
+            # Append images with unseen filenames in order; True once max_count is reached
+            for i in order:
+                filename = images[i].get('filename')
+                if filename not in seen:
+                    seen.add(filename)
+                    selected.append(i)
+                    if len(selected) >= max_count:
+                        return True
+            return False
 
         # Add featured image first
         if featured_image:
-            for img in images:
-                if img.get('filename') == featured_image.get('filename'):
-                    prioritized.append(img)
+            featured_name = featured_image.get('filename')
+            for i, img in enumerate(images):
+                if img.get('filename') == featured_name:
+                    take((i,))
                     break
 
-        # Add large images (likely to be important figures)
-        large_images = sorted(
-            images,
-            key=lambda x: x.get('width', 0) * x.get('height', 0),
-            reverse=True
-        )
-
-        for img in large_images:
-            if img not in prioritized:
-                prioritized.append(img)
-                if len(prioritized) >= max_count:
-                    break
+        # Add large images (likely to be important figures); stable sort keeps
+        # extraction order among equal areas, as sorted() did
+        areas = np.fromiter((img.get('width', 0) * img.get('height', 0) for img in images),
+                            dtype=np.float64, count=len(images))
+        full = take(np.argsort(-areas, kind='stable').tolist())
 
         # If still room, add images from early pages
-        if len(prioritized) < max_count:
-            early_images = sorted(images, key=lambda x: x.get('page', 999))
-            for img in early_images:
-                if img not in prioritized:
-                    prioritized.append(img)
-                    if len(prioritized) >= max_count:
-                        break
+        if not full:
+            pages = np.fromiter((img.get('page', 999) for img in images),
+                                dtype=np.int64, count=len(images))
+            take(np.argsort(pages, kind='stable').tolist())
 
-        return prioritized[:max_count]
+        return [images[i] for i in selected[:max_count]]
 
     def _match_images_captions(self,
                               images: List[Dict],
@@ -350,12 +733,16 @@ class ImageRAGCLIP:
         """
         image_caption_map = {}
 
+        # Group captions by page once instead of scanning them per image
+        captions_by_page = defaultdict(list)
+        for caption in captions:
+            captions_by_page[caption.get('page', -1)].append(caption)
+
         for img in images:
-            img_page = img.get('page', 0)
             img_filename = img.get('filename', '')
 
             # Find captions on the same page
-            page_captions = [c for c in captions if c.get('page', -1) == img_page]
+            page_captions = captions_by_page.get(img.get('page', 0))
 
             if page_captions:
                 # Simple heuristic: assign first caption on page to image
@@ -364,114 +751,436 @@ class ImageRAGCLIP:
 
         return image_caption_map
 
-    def _generate_image_embeddings(self, image_data: List[Dict]) -> np.ndarray:
+    def _generate_image_embeddings(self, image_data: List[ImageRecord]) -> np.ndarray:
         """
         Generate CLIP embeddings for images.
 
         Args:
-            image_data: List of image metadata with paths
+            image_data: Image records (paths to encode)
 
         Returns:
             Numpy array of embeddings
         """
-        embeddings = []
+        # 디코딩 실패한 이미지는 zero 벡터로 남기고, 나머지는 배치 단위로 인코딩
+        embeddings = np.zeros((len(image_data), self.embedding_dim), dtype=np.float32)
+        all_paths = [record.path for record in image_data]
+
+        # 같은 내용의 이미지(논문 버전 간 동일 figure 등)는 캐시된 임베딩 재사용
+        digests = [self._image_digest(path) for path in all_paths]
+        todo = []
+        for i, digest in enumerate(digests):
+            cached = self._cached_image_embedding(digest)
+            if cached is None:
+                todo.append(i)
+            else:
+                embeddings[i] = cached
+
+        paths = [all_paths[i] for i in todo]
+        if not paths:
+            return embeddings
+
+        images = []
+        positions = []
+
+        def encode_pending():
+            batch = self._encode_images(images)
+            embeddings[positions] = batch
+            for i, embedding in zip(positions, batch):
+                self._cache_image_embedding(digests[i], embedding)
+            images.clear()
+            positions.clear()
+
+        def consume(decoded):
+            # Encode each full batch while the pool keeps decoding the next one
+            for i, (image, error) in zip(todo, decoded):
+                if image is None:
+                    print(f"  ⚠️ Failed to load image {all_paths[i]}: {error}")
+                    continue
+                images.append(image)
+                positions.append(i)
+                if len(images) >= self.encode_batch_size:
+                    encode_pending()
+            if images:
+                encode_pending()
+
+        if self.decode_workers > 1 and len(paths) >= PARALLEL_DECODE_MIN_IMAGES:
+            consume(self._decode_pool().map(_decode_and_resize, paths))
+        else:
+            consume(map(_decode_and_resize, paths))
 
-        for img_info in image_data:
-            img_path = img_info['path']
+        return embeddings
 
-            try:
-                # Load and encode image
-                image = Image.open(img_path).convert('RGB')
+    def _decode_pool(self) -> ThreadPoolExecutor:
+        """The instance's decode threads, started on first use.
 
-                # Resize if too large (CLIP typically uses 224x224)
-                if image.width > 1024 or image.height > 1024:
-                    image.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
+        Threaded builders share one instance, so they also share this pool and
+        decoding never runs more than decode_workers threads in total.
+        """
+        with self._decode_executor_lock:
+            if self._decode_executor is None:
+                self._decode_executor = ThreadPoolExecutor(max_workers=self.decode_workers,
+                                                           thread_name_prefix="clip-decode")
+            return self._decode_executor
+
+    def _encode(self, inputs, **kwargs) -> np.ndarray:
+        """model.encode that always returns float32 (FP16 outputs are upcast)."""
+        # inference_mode also skips the version-counter bookkeeping no_grad keeps
+        with torch.inference_mode() if TORCH_AVAILABLE else nullcontext():
+            embeddings = self.model.encode(inputs, convert_to_numpy=True, **kwargs)
+        return embeddings.astype(np.float32, copy=False)
+
+    def _image_digest(self, image_path: str) -> Optional[str]:
+        """SHA-256 of the image file bytes (None when caching is off or unreadable)."""
+        if not self.embedding_cache_dir:
+            return None
+        try:
+            with open(image_path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _embedding_cache_path(self, digest: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.embedding_cache_dir, digest[:2], f"{digest}.npy")
+
+    def _cached_image_embedding(self, digest: Optional[str]) -> Optional[np.ndarray]:
+        """Load a cached embedding for an image digest, if present and valid."""
+        if digest is None:
+            return None
+        try:
+            embedding = np.load(self._embedding_cache_path(digest))
+        except (OSError, ValueError):
+            return None
+        if embedding.shape != (self.embedding_dim,):
+            return None
+        return embedding
+
+    def _cache_image_embedding(self, digest: Optional[str], embedding: np.ndarray):
+        """Write an embedding to the on-disk cache (atomic rename, best effort)."""
+        if digest is None:
+            return
+        path = self._embedding_cache_path(digest)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                np.save(f, np.asarray(embedding, dtype=np.float32))
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"  ⚠️ Failed to cache embedding {digest[:12]}: {e}")
+
+    def _encode_images(self, images: List[Any]) -> np.ndarray:
+        """
+        Encode PIL images in batched forward passes.
 
-                # Generate embedding
-                embedding = self.model.encode(image)
-                embeddings.append(embedding)
+        On CUDA out-of-memory the batch size is halved and the call retried;
+        the reduced size is kept for later papers.
 
-            except Exception as e:
-                print(f"  ⚠️ Failed to encode image {img_path}: {e}")
-                # Use zero embedding as fallback
-                embeddings.append(np.zeros(self.embedding_dim))
-
-        return np.array(embeddings)
+        Args:
+            images: Decoded RGB PIL images
 
-    def _store_images(self, image_data: List[Dict], embeddings: np.ndarray):
+        Returns:
+            Numpy array of embeddings (one row per image)
+        """
+        while True:
+            try:
+                return self._encode(
+                    images,
+                    batch_size=self.encode_batch_size,
+                    show_progress_bar=False
+                )
+            except RuntimeError as e:
+                # torch.cuda.OutOfMemoryError subclasses RuntimeError
+                if 'out of memory' not in str(e).lower() or self.encode_batch_size <= 1:
+                    raise
+                if TORCH_AVAILABLE and torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                self.encode_batch_size = max(1, self.encode_batch_size // 2)
+                print(f"  ⚠️ CUDA OOM, retrying with batch_size={self.encode_batch_size}")
+
+    def _store_images(self, image_data: List[ImageRecord], embeddings: np.ndarray, paper_id: str):
         """
         Store image embeddings and metadata in vector database.
 
+        ChromaDB rows are buffered and written in batches of flush_batch_size,
+        and Pinecone upserts are queued; both run on a background writer
+        thread (call flush() to wait for them; searches only see rows already
+        written). The paper is recorded as processed once written.
+
         Args:
-            image_data: List of image metadata
+            image_data: Image records, one per embedding row
             embeddings: Numpy array of embeddings
+            paper_id: Paper the images belong to
         """
-        if self.db_type == "chroma":
-            # Prepare data for ChromaDB
-            ids = []
-            documents = []
-            metadatas = []
-
-            for img_info, embedding in zip(image_data, embeddings):
-                # Use image ID as unique identifier
-                ids.append(img_info['image_id'])
-
-                # Use caption as document text, or create description
-                doc_text = img_info['caption_text'] if img_info['caption_text'] else \
-                          f"Image from page {img_info['page']} of {img_info['paper_id']}"
-                documents.append(doc_text)
-
-                # Clean metadata for storage
-                metadata = {
-                    'paper_id': img_info['paper_id'],
-                    'image_id': img_info['image_id'],
-                    'filename': img_info['filename'],
-                    'page': img_info['page'],
-                    'width': img_info['width'],
-                    'height': img_info['height'],
-                    'is_featured': img_info['is_featured'],
-                    'caption_id': img_info.get('caption_id', ''),
-                    'paper_title': img_info.get('paper_title', ''),
-                    'paper_year': img_info.get('paper_year', 0)
-                }
-                metadatas.append(metadata)
-
-            # Add to ChromaDB
-            self.collection.add(
-                ids=ids,
-                documents=documents,
-                embeddings=embeddings.tolist(),
-                metadatas=metadatas
-            )
+        if self.db_type in ("chroma", "faiss"):
+            # Prepare data for ChromaDB: parallel columns straight from the records
+            # Use image ID as unique identifier
+            ids = [record.image_id for record in image_data]
+
+            # Use caption as document text, or create description
+            documents = [record.caption_text or f"Image from page {record.page} of {record.paper_id}"
+                         for record in image_data]
+
+            # Clean metadata for storage
+            metadatas = [{
+                'paper_id': record.paper_id,
+                'image_id': record.image_id,
+                'filename': record.filename,
+                'page': record.page,
+                'width': record.width,
+                'height': record.height,
+                'is_featured': record.is_featured,
+                'caption_id': record.caption_id,
+                'paper_title': record.paper_title,
+                'paper_year': record.paper_year
+            } for record in image_data]
+
+            # Queue for ChromaDB
+            with self._pending_lock:
+                pending = self._pending
+                pending['ids'].extend(ids)
+                pending['documents'].extend(documents)
+                pending['embeddings'].append(embeddings)
+                pending['metadatas'].extend(metadatas)
+                self._pending_papers.append(paper_id)
+                self.processed_papers.add(paper_id)
+                batch = self._take_pending() if len(pending['ids']) >= self.flush_batch_size else None
+
+            if batch:
+                # Written in the background while the next paper is extracted/encoded
+                self._submit_store(self._write_pending, *batch)
 
         elif self.db_type == "pinecone":
             # Prepare data for Pinecone
             vectors = []
-            for img_info, embedding in zip(image_data, embeddings):
+            # One C-level conversion instead of a tolist() per row
+            values = embeddings.astype(np.float32, copy=False).tolist()
+            for record, embedding in zip(image_data, values):
                 metadata = {
-                    'paper_id': img_info['paper_id'],
-                    'filename': img_info['filename'],
-                    'page': img_info['page'],
-                    'is_featured': img_info['is_featured'],
-                    'caption': img_info['caption_text'][:500] if img_info['caption_text'] else ''
+                    'paper_id': record.paper_id,
+                    'filename': record.filename,
+                    'page': record.page,
+                    'is_featured': record.is_featured,
+                    'caption': record.caption_text[:500] if record.caption_text else ''
                 }
 
                 vectors.append({
-                    "id": img_info['image_id'],
-                    "values": embedding.tolist(),
+                    "id": record.image_id,
+                    "values": embedding,
                     "metadata": metadata
                 })
 
-            # Upload in batches
-            batch_size = 100
-            for i in range(0, len(vectors), batch_size):
-                batch = vectors[i:i+batch_size]
-                self.pinecone_index.upsert(vectors=batch)
+            self._submit_store(self._write_pinecone, vectors, embeddings, paper_id)
+
+    def _write_pinecone(self, vectors: List[Dict], embeddings: np.ndarray, paper_id: str):
+        """Upsert one paper's vectors to Pinecone and mark it processed (store thread)."""
+        # Upload in parallel batches, waiting on each chunk before sending more
+        for chunk in _chunks(vectors, PINECONE_UPSERT_CHUNK):
+            async_results = [
+                self.pinecone_index.upsert(vectors=list(batch), async_req=True)
+                for batch in _chunks(chunk, PINECONE_UPSERT_BATCH)
+            ]
+            for result in async_results:
+                result.get()
+
+        with self._write_lock:
+            self._append_embedding_store(
+                [v['id'] for v in vectors], embeddings, [v['metadata'] for v in vectors])
+
+        # Mark as processed
+        self._save_processed_paper(paper_id)
+
+    def _take_pending(self) -> Tuple[Dict, List[str]]:
+        """Swap out the buffered ChromaDB rows (caller holds _pending_lock)."""
+        batch = (self._pending, self._pending_papers)
+        self._pending = {'ids': [], 'documents': [], 'embeddings': [], 'metadatas': []}
+        self._pending_papers = []
+        return batch
+
+    def _write_pending(self, pending: Dict, papers: List[str]):
+        """Write one buffered batch with a single add() and mark its papers processed."""
+        with self._write_lock:
+            if pending['ids']:
+                embeddings = np.vstack(pending['embeddings'])
+                try:
+                    self.collection.add(
+                        ids=pending['ids'],
+                        documents=pending['documents'],
+                        embeddings=embeddings.tolist(),
+                        metadatas=pending['metadatas']
+                    )
+                except Exception:
+                    # Not stored: let these papers be processed again
+                    with self._pending_lock:
+                        self.processed_papers.difference_update(papers)
+                    raise
+                if self.exact_index is not None:
+                    self.exact_index.invalidate()
+                self._append_embedding_store(pending['ids'], embeddings, pending['metadatas'])
+
+            if self.db_type == "faiss":
+                # Processed only once the index file holds their vectors
+                self._unpersisted_papers.extend(papers)
+                if self.collection.unsaved >= FAISS_PERSIST_ROWS:
+                    self._persist_faiss()
+                return
+
+            for paper_id in papers:
+                self._save_processed_paper(paper_id)
+
+    def _persist_faiss(self):
+        """Save the FAISS index and mark the papers it now covers (caller holds _write_lock)."""
+        self.collection.persist()
+        papers, self._unpersisted_papers = self._unpersisted_papers, []
+        for paper_id in papers:
+            self._save_processed_paper(paper_id)
+
+    def _submit_store(self, fn, *args):
+        """
+        Run a store on the background writer thread.
+
+        At most STORE_QUEUE_DEPTH writes are queued; beyond that the caller
+        waits for the oldest, so encoding can't run unboundedly ahead of the DB.
+        """
+        future = self._store_executor.submit(fn, *args)
+        with self._store_lock:
+            self._store_futures.append(future)
+            oldest = (self._store_futures.popleft()
+                      if len(self._store_futures) > STORE_QUEUE_DEPTH else None)
+        if oldest is not None:
+            error = oldest.exception()
+            if error is not None:
+                print(f"  ❌ Background store failed: {error}")
+
+    def flush(self):
+        """
+        Finish queued background writes, then write any buffered ChromaDB rows.
+
+        Raises the first storage error, if any; papers whose rows were not
+        stored are left unmarked so they are processed again next run.
+        """
+        with self._store_lock:
+            futures = list(self._store_futures)
+            self._store_futures.clear()
+        errors = [f.exception() for f in futures]
+
+        with self._pending_lock:
+            batch = self._take_pending() if self._pending_papers else None
+        if batch:
+            try:
+                self._write_pending(*batch)
+            except Exception as e:
+                errors.append(e)
+
+        if self.db_type == "faiss":
+            with self._write_lock:
+                self._persist_faiss()
+
+        errors = [e for e in errors if e is not None]
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        """Write everything still buffered, then stop the writer thread and close files."""
+        if self._processed_file.closed:
+            return
+        _open_instances.discard(self)
+        try:
+            self.flush()
+        finally:
+            self._store_executor.shutdown(wait=True)
+            with self._decode_executor_lock:
+                if self._decode_executor is not None:
+                    self._decode_executor.shutdown(wait=True)
+                    self._decode_executor = None
+            self._processed_file.close()
+            if self.db_type == "faiss":
+                self.collection.close()
+
+    def _append_embedding_store(self, ids: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        """Append rows to the raw embedding store (caller holds _write_lock)."""
+        if not self.store_embeddings or not ids:
+            return
+        if self._store_rows is None:
+            self._store_rows = self._align_embedding_store()
+        try:
+            with open(os.path.join(self.db_path, EMBEDDING_STORE_FILE), 'ab') as f:
+                f.write(np.ascontiguousarray(embeddings, dtype=np.float32).tobytes())
+            with open(os.path.join(self.db_path, EMBEDDING_STORE_INDEX), 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps({'id': image_id, 'metadata': metadata}, ensure_ascii=False) + '\n'
+                             for image_id, metadata in zip(ids, metadatas))
+        except BaseException:
+            # Possibly a partial write; re-align before the next append
+            self._store_rows = None
+            raise
+        self._store_rows += len(ids)
+
+    def _align_embedding_store(self) -> int:
+        """
+        Cut both store files back to the rows they have in common (caller holds _write_lock).
+
+        An append interrupted between or during the two writes leaves extra
+        vectors, a partial vector row or a torn JSONL line behind; appending
+        after them would pair every later vector with the wrong record.
+
+        Returns:
+            Number of rows left in the store
+        """
+        vector_path = os.path.join(self.db_path, EMBEDDING_STORE_FILE)
+        index_path = os.path.join(self.db_path, EMBEDDING_STORE_INDEX)
+        row_bytes = 4 * self.embedding_dim
+        vector_size = os.path.getsize(vector_path) if os.path.exists(vector_path) else 0
+        ends = _read_embedding_index(index_path)[1] if os.path.exists(index_path) else []
+
+        rows = min(len(ends), vector_size // row_bytes)
+        if vector_size != rows * row_bytes:
+            os.truncate(vector_path, rows * row_bytes)
+        index_size = ends[rows - 1] if rows else 0
+        if os.path.exists(index_path) and os.path.getsize(index_path) != index_size:
+            os.truncate(index_path, index_size)
+        return rows
+
+    def load_embedding_store(self) -> Tuple[List[Dict], np.ndarray]:
+        """
+        Read back every vector written to the raw embedding store.
+
+        Rows are in write order; a re-processed image appears again later,
+        so keep the last row per id when rebuilding an index.
+
+        Returns:
+            ({"id", "metadata"} records, read-only memmap of shape (n, embedding_dim))
+        """
+        vector_path = os.path.join(self.db_path, EMBEDDING_STORE_FILE)
+        index_path = os.path.join(self.db_path, EMBEDDING_STORE_INDEX)
+        if not os.path.exists(vector_path) or not os.path.exists(index_path):
+            return [], np.zeros((0, self.embedding_dim), dtype=np.float32)
+
+        records = _read_embedding_index(index_path)[0]
+        rows = min(len(records), os.path.getsize(vector_path) // (4 * self.embedding_dim))
+        if rows == 0:
+            return [], np.zeros((0, self.embedding_dim), dtype=np.float32)
+
+        vectors = np.memmap(vector_path, dtype=np.float32, mode='r',
+                            shape=(rows, self.embedding_dim))
+        return records[:rows], vectors
+
+    def embed_text(self, query: str) -> np.ndarray:
+        """
+        Encode a text query into the CLIP embedding space.
+
+        Args:
+            query: Text query
+
+        Returns:
+            CLIP text embedding
+        """
+        return self._encode(query)
 
     def search_by_text(self,
                       query: str,
                       k: int = 10,
-                      filter_dict: Optional[Dict] = None) -> List[Dict]:
+                      filter_dict: Optional[Dict] = None,
+                      query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Search images using text query (text→image search).
 
@@ -479,19 +1188,73 @@ class ImageRAGCLIP:
             query: Text query
             k: Number of results
             filter_dict: Optional metadata filters
+            query_embedding: Precomputed CLIP embedding of query (skips encoding)
 
         Returns:
             List of similar images
         """
         # Generate text embedding using CLIP
-        query_embedding = self.model.encode(query)
+        if query_embedding is None:
+            query_embedding = self.embed_text(query)
 
         return self._search_by_embedding(query_embedding, k, filter_dict)
 
+    def embed_texts(self, queries: List[str]) -> np.ndarray:
+        """
+        Encode text queries into the CLIP embedding space in one batch.
+
+        Args:
+            queries: Text queries
+
+        Returns:
+            CLIP text embeddings, one row per query
+        """
+        return self._encode(queries)
+
+    def search_by_text_batch(self,
+                             queries: List[str],
+                             k: int = 10,
+                             filter_dict: Optional[Dict] = None,
+                             query_embeddings: Optional[np.ndarray] = None) -> List[List[Dict]]:
+        """
+        Text→image search for several queries at once.
+
+        Args:
+            queries: Text queries
+            k: Number of results per query
+            filter_dict: Optional metadata filters
+            query_embeddings: Precomputed CLIP embeddings, one row per query
+
+        Returns:
+            One list of similar images per query
+        """
+        if not queries:
+            return []
+        if query_embeddings is None:
+            query_embeddings = self.embed_texts(queries)
+        return self._search_by_embeddings(query_embeddings, k, filter_dict)
+
+    def embed_image(self, image_path: str) -> np.ndarray:
+        """
+        Encode an image file with the CLIP vision encoder.
+
+        Args:
+            image_path: Path to image
+
+        Returns:
+            CLIP image embedding
+        """
+        image, error = _decode_and_resize(image_path)
+        if image is None:
+            raise ValueError(f"Cannot load image {image_path}: {error}")
+
+        return self._encode(image)
+
     def search_by_image(self,
                        image_path: str,
                        k: int = 10,
-                       filter_dict: Optional[Dict] = None) -> List[Dict]:
+                       filter_dict: Optional[Dict] = None,
+                       query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Search similar images using an image query (image→image search).
 
@@ -499,20 +1262,18 @@ class ImageRAGCLIP:
             image_path: Path to query image
             k: Number of results
             filter_dict: Optional metadata filters
+            query_embedding: Precomputed CLIP embedding of the image (skips encoding)
 
         Returns:
             List of similar images
         """
         # Load and encode query image
-        try:
-            image = Image.open(image_path).convert('RGB')
-            if image.width > 1024 or image.height > 1024:
-                image.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
-
-            query_embedding = self.model.encode(image)
-        except Exception as e:
-            print(f"Error loading query image: {e}")
-            return []
+        if query_embedding is None:
+            try:
+                query_embedding = self.embed_image(image_path)
+            except Exception as e:
+                print(f"Error loading query image: {e}")
+                return []
 
         return self._search_by_embedding(query_embedding, k, filter_dict)
 
@@ -531,66 +1292,97 @@ class ImageRAGCLIP:
         Returns:
             List of search results
         """
-        if self.db_type == "chroma":
-            # Search in ChromaDB
-            results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
-                n_results=k,
-                where=filter_dict if filter_dict else None
-            )
+        return self._search_by_embeddings([query_embedding], k, filter_dict)[0]
 
-            # Format results
-            formatted_results = []
-            for i in range(len(results['ids'][0])):
-                result = {
-                    'id': results['ids'][0][i],
-                    'caption': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'score': 1 - results['distances'][0][i]
-                }
+    def _search_by_embeddings(self,
+                              query_embeddings,
+                              k: int,
+                              filter_dict: Optional[Dict]) -> List[List[Dict]]:
+        """
+        Search using several embedding vectors (one ChromaDB query for all).
 
-                # Add image path
-                paper_id = result['metadata']['paper_id']
-                filename = result['metadata']['filename']
-                result['image_path'] = os.path.join(
-                    self.db_path, "extracted_images", paper_id, filename
-                )
+        Args:
+            query_embeddings: Query embeddings, one per query
+            k: Number of results per query
+            filter_dict: Optional filters
 
-                formatted_results.append(result)
+        Returns:
+            One list of search results per embedding
+        """
+        if self.db_type in ("chroma", "faiss"):
+            # Search in ChromaDB (exact in-memory scan while the collection is small)
+            results = None
+            if self.exact_index is not None:
+                results = self.exact_index.query(
+                    query_embeddings=list(query_embeddings),
+                    n_results=k,
+                    where=filter_dict if filter_dict else None
+                )
+            if results is None:
+                results = self.collection.query(
+                    query_embeddings=[e.tolist() for e in query_embeddings],
+                    n_results=k,
+                    where=filter_dict if filter_dict else None
+                )
 
-            return formatted_results
+            # Format results
+            all_results = []
+            for q in range(len(results['ids'])):
+                formatted_results = []
+                for i in range(len(results['ids'][q])):
+                    result = {
+                        'id': results['ids'][q][i],
+                        'caption': results['documents'][q][i],
+                        'metadata': results['metadatas'][q][i],
+                        'score': 1 - results['distances'][q][i]
+                    }
+
+                    # Add image path
+                    paper_id = result['metadata']['paper_id']
+                    filename = result['metadata']['filename']
+                    result['image_path'] = os.path.join(
+                        self.db_path, "extracted_images", paper_id, filename
+                    )
+
+                    formatted_results.append(result)
+                all_results.append(formatted_results)
+
+            return all_results
 
         elif self.db_type == "pinecone":
-            # Search in Pinecone
-            results = self.pinecone_index.query(
-                vector=query_embedding.tolist(),
-                top_k=k,
-                include_metadata=True,
-                filter=filter_dict if filter_dict else None
-            )
+            # Pinecone takes one vector per query
+            all_results = []
+            for query_embedding in query_embeddings:
+                results = self.pinecone_index.query(
+                    vector=query_embedding.tolist(),
+                    top_k=k,
+                    include_metadata=True,
+                    filter=filter_dict if filter_dict else None
+                )
 
-            # Format results
-            formatted_results = []
-            for match in results['matches']:
-                result = {
-                    'id': match['id'],
-                    'caption': match['metadata'].get('caption', ''),
-                    'metadata': match['metadata'],
-                    'score': match['score']
-                }
+                # Format results
+                formatted_results = []
+                for match in results['matches']:
+                    result = {
+                        'id': match['id'],
+                        'caption': match['metadata'].get('caption', ''),
+                        'metadata': match['metadata'],
+                        'score': match['score']
+                    }
 
-                # Add image path
-                paper_id = match['metadata']['paper_id']
-                filename = match['metadata']['filename']
-                result['image_path'] = os.path.join(
-                    self.db_path, "extracted_images", paper_id, filename
-                )
+                    # Add image path
+                    paper_id = match['metadata']['paper_id']
+                    filename = match['metadata']['filename']
+                    result['image_path'] = os.path.join(
+                        self.db_path, "extracted_images", paper_id, filename
+                    )
 
-                formatted_results.append(result)
+                    formatted_results.append(result)
+                all_results.append(formatted_results)
 
-            return formatted_results
+            return all_results
 
-        return []
+        return [[] for _ in query_embeddings]
 
     def get_paper_images(self, paper_id: str) -> List[Dict]:
         """
@@ -603,7 +1395,30 @@ class ImageRAGCLIP:
             List of image information
         """
         filter_dict = {'paper_id': paper_id}
-        results = self.search_by_text("", k=100, filter_dict=filter_dict)
+
+        if self.db_type in ("chroma", "faiss"):
+            # Metadata-only fetch: no CLIP encoding of an empty query
+            data = self.collection.get(
+                where=filter_dict,
+                limit=100,
+                include=["documents", "metadatas"]
+            )
+            results = []
+            for image_id, caption, metadata in zip(data['ids'], data['documents'], data['metadatas']):
+                results.append({
+                    'id': image_id,
+                    'caption': caption,
+                    'metadata': metadata,
+                    'image_path': os.path.join(
+                        self.db_path, "extracted_images", metadata['paper_id'], metadata['filename']
+                    )
+                })
+        else:
+            # Pinecone has no metadata-only listing: query the filter with a
+            # constant vector (any non-zero vector works for cosine) rather
+            # than running CLIP on an empty string
+            probe = np.ones((1, self.embedding_dim), dtype=np.float32)
+            results = self._search_by_embeddings(probe, k=100, filter_dict=filter_dict)[0]
 
         # Sort by page number
         results.sort(key=lambda x: x['metadata'].get('page', 0))
@@ -620,18 +1435,21 @@ def main():
     parser.add_argument("--batch", type=str, help="Batch JSON file")
     parser.add_argument("--search-text", type=str, help="Search by text query")
     parser.add_argument("--search-image", type=str, help="Search by image path")
-    parser.add_argument("--db", type=str, default="chroma", choices=["chroma", "pinecone"])
+    parser.add_argument("--db", type=str, default="chroma", choices=["chroma", "faiss", "pinecone"])
     parser.add_argument("--k", type=int, default=10, help="Number of search results")
+    parser.add_argument("--clip-backend", type=str, default="sentence-transformers",
+                        choices=["sentence-transformers", "open_clip"])
 
     args = parser.parse_args()
 
     # Initialize Image RAG
-    rag = ImageRAGCLIP(db_type=args.db)
+    rag = ImageRAGCLIP(db_type=args.db, clip_backend=args.clip_backend)
 
     if args.pdf:
         # Process single PDF
         paper_id = Path(args.pdf).stem
         stats = rag.process_paper(paper_id, args.pdf)
+        rag.flush()
         print(f"\nProcessed: {stats}")
 
     elif args.batch:
@@ -643,6 +1461,8 @@ def main():
             paper_id = item.get('paper_id', Path(item['pdf_path']).stem)
             stats = rag.process_paper(paper_id, item['pdf_path'], item.get('metadata'))
 
+        rag.flush()
+
     elif args.search_text:
         # Search by text
         results = rag.search_by_text(args.search_text, k=args.k)
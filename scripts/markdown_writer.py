@@ -1,30 +1,43 @@
 """
 Write summaries and metadata to Obsidian-flavored Markdown using Jinja2.
 """
+import contextvars
 import os
 import re
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader
+from utils import ensure_dir
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+# Templates don't change during a batch run: compile each once and skip the
+# per-render freshness stat of the template file
+env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=False, cache_size=400)
+_TEMPLATE_CACHE = {}
 
 # Strip leading numeric/dotted ordering prefix (e.g. "000.", "615.", "6151.")
 _PREFIX_RE = re.compile(r'^[\d]+\.?\s*')
 _MULTI_HYPHEN_RE = re.compile(r'-+')
 
+# YYYY, YYYY-MM or YYYY-MM-DD in a single match instead of trying strptime formats
+_DATE_RE = re.compile(r'^(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?$')
+
+# Timestamp of the render in progress, so every 'now' in one note agrees
+_render_now = contextvars.ContextVar('_render_now', default=None)
+
 
 def date_filter(value, format='%Y-%m-%d'):
     """Custom filter for date formatting."""
     if value == 'now':
-        return datetime.now().strftime(format)
+        return (_render_now.get() or datetime.now()).strftime(format)
     elif isinstance(value, str):
-        # Try to parse common date formats
-        for fmt in ['%Y-%m-%d', '%Y', '%Y-%m']:
+        # Parse common date formats (YYYY-MM-DD, YYYY, YYYY-MM)
+        match = _DATE_RE.match(value)
+        if match:
+            year, month, day = match.groups()
             try:
-                return datetime.strptime(value, fmt).strftime(format)
-            except:
-                continue
+                return datetime(int(year), int(month or 1), int(day or 1)).strftime(format)
+            except ValueError:
+                pass
     return value
 
 def nl2br(value):
@@ -101,14 +114,43 @@ def render_note(template_name: str, context: dict, include_ai_links: bool = Fals
         context: Dictionary of variables to pass to template
         include_ai_links: Whether to include AI tool links (ignored for compatibility)
     """
-    template = env.get_template(template_name)
-    return template.render(**context)
+    template = _TEMPLATE_CACHE.get(template_name)
+    if template is None:
+        template = _TEMPLATE_CACHE[template_name] = env.get_template(template_name)
+    token = _render_now.set(datetime.now())
+    try:
+        return template.render(**context)
+    finally:
+        _render_now.reset(token)
 
 def write_markdown(content: str, output_path: str):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    ensure_dir(os.path.dirname(output_path))
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(content)
 
+_NEW_FILE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+
+def write_new_markdown(content: str, output_path: str, fallback_path: str) -> str:
+    """Write a note without replacing an existing one; returns the path written.
+
+    output_path is claimed with O_CREAT|O_EXCL, so checking for a clash and
+    creating the file is one atomic step and concurrent writers can't both take
+    the same name. If it exists, fallback_path is tried the same way and, when
+    that is taken too, overwritten.
+    """
+    ensure_dir(os.path.dirname(output_path))
+    data = content.encode('utf-8')
+    for path in (output_path, fallback_path):
+        try:
+            fd = os.open(path, _NEW_FILE_FLAGS, 0o644)
+        except FileExistsError:
+            continue
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return path
+    write_markdown(content, fallback_path)
+    return fallback_path
+
 if __name__ == '__main__':
     # demo usage
     ctx = {
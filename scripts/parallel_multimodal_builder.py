@@ -54,19 +54,31 @@ def process_single_paper_text(args):
         }
 
 
+# One ImageRAGCLIP (CLIP model + ChromaDB client) per worker process, reused for every paper
+_image_rag = None
+
+
+def _worker_image_rag():
+    """This worker process's ImageRAGCLIP, built on its first paper."""
+    global _image_rag
+    if _image_rag is None:
+        # Import here to avoid serialization issues
+        from scripts.image_rag_clip import ImageRAGCLIP
+        _image_rag = ImageRAGCLIP(db_type="chroma", max_images_per_paper=15)
+    return _image_rag
+
+
 def process_single_paper_image(args):
     """Process a single paper for image database (in separate process)"""
     paper_id, pdf_path, metadata = args
 
     try:
-        # Import here to avoid serialization issues
-        from scripts.image_rag_clip import ImageRAGCLIP
+        image_rag = _worker_image_rag()
 
-        # Create instance for this process
-        image_rag = ImageRAGCLIP(db_type="chroma", max_images_per_paper=15)
-
-        # Process paper
+        # Process paper; flush so the paper is stored before its result is reported
+        # (pool workers exit without running atexit hooks)
         result = image_rag.process_paper(paper_id, pdf_path, metadata)
+        image_rag.flush()
 
         return {
             'paper_id': paper_id,
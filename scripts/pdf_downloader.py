@@ -1,11 +1,105 @@
 """
 Download PDFs from Zotero server when not available locally.
 """
+import atexit
+import functools
 import os
 import time
 import requests
 from pathlib import Path
 from typing import Optional, Tuple
+from requests.adapters import HTTPAdapter
+from utils import ensure_dir
+
+ZOTERO_API_BASE = "https://api.zotero.org"
+
+# (connect, read) timeouts for file downloads
+DOWNLOAD_TIMEOUT = (5, 120)
+
+# Downloads are streamed to disk in chunks of this size instead of held in memory
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# One pooled session for every download, so consecutive PDFs reuse the same
+# keep-alive TLS connections instead of handshaking per file. Retries stay in
+# download_pdf_from_zotero.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0))
+atexit.register(_session.close)
+
+def _file_url(zot, file_key: str) -> str:
+    """Zotero Web API URL of an attachment's file, for the library `zot` points at."""
+    endpoint = getattr(zot, 'endpoint', ZOTERO_API_BASE)
+    return f"{endpoint}/{zot.library_type}/{zot.library_id}/items/{file_key}/file"
+
+def _stream_file(zot, file_key: str, save_path: str) -> int:
+    """Stream an attachment's file to save_path over the pooled session.
+
+    pyzotero issues a fresh requests.get per call and buffers the whole file, so
+    only its URL layout and credentials are borrowed here. The body is written in
+    DOWNLOAD_CHUNK_SIZE pieces to save_path + '.part' and renamed into place only
+    once it is complete, so a dropped connection never leaves a truncated PDF.
+    Returns the number of bytes written (0 for an empty body, nothing is kept).
+    Raises HTTPError on non-2xx responses and IOError on a short read.
+    """
+    part_path = save_path + '.part'
+    with _session.get(
+        _file_url(zot, file_key),
+        headers={"Zotero-API-Version": "3", "Zotero-API-Key": zot.api_key},
+        timeout=DOWNLOAD_TIMEOUT,
+        stream=True,
+    ) as response:
+        response.raise_for_status()
+        # Content-Length is only comparable when the body isn't transfer-compressed
+        expected = None if response.headers.get('Content-Encoding') else response.headers.get('Content-Length')
+
+        ensure_dir(os.path.dirname(save_path))
+        written = 0
+        try:
+            with open(part_path, 'wb') as f:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    written += len(chunk)
+            if expected is not None and int(expected) != written:
+                raise IOError(f"Incomplete download: {written} of {expected} bytes")
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+    if written == 0:
+        os.remove(part_path)
+        return 0
+    os.replace(part_path, save_path)
+    return written
+
+@functools.lru_cache(maxsize=1)
+def _list_storage(pdf_base_dir: str) -> dict:
+    """Index storage/<fileKey>/ once: {file_key: {pdf_filename: size}}.
+
+    Built on first use with os.scandir (sizes come from the directory entries),
+    so each later lookup costs a dict access instead of exists + getsize calls.
+    Files that appear after the scan, e.g. fresh downloads, are found by the
+    path-based fallback in ensure_pdf_available.
+    """
+    index = {}
+    try:
+        with os.scandir(os.path.join(pdf_base_dir, 'storage')) as storage:
+            for key_dir in storage:
+                if not key_dir.is_dir():
+                    continue
+                files = {}
+                try:
+                    with os.scandir(key_dir.path) as it:
+                        for entry in it:
+                            if entry.name.lower().endswith('.pdf') and entry.is_file():
+                                files[entry.name] = entry.stat().st_size
+                except OSError:
+                    continue
+                if files:
+                    index[key_dir.name] = files
+    except OSError:
+        pass
+    return index
 
 def download_pdf_from_zotero(zot, item_key: str, file_key: str, save_path: str, max_retries: int = 3) -> bool:
     """
@@ -25,10 +119,9 @@ def download_pdf_from_zotero(zot, item_key: str, file_key: str, save_path: str,
     
     for attempt in range(max_retries):
         try:
-            # Download the file content using the correct method
-            # pyzotero's file() method returns the binary content directly
+            # Stream the file straight to disk over the pooled session
             try:
-                file_content = zot.file(file_key)
+                written = _stream_file(zot, file_key, save_path)
             except Exception as e:
                 # Check if it's a 404 error
                 if hasattr(e, 'response') and hasattr(e.response, 'status_code'):
@@ -36,23 +129,9 @@ def download_pdf_from_zotero(zot, item_key: str, file_key: str, save_path: str,
                         return False  # Silently fail on 404
                 continue
             
-            # Check if file_content is valid
-            if file_content is None or len(file_content) == 0:
-                continue
-                
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            
-            # Write the file
-            with open(save_path, 'wb') as f:
-                f.write(file_content)
-            
-            # Verify the file was written and has content
-            if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
+            # An empty body is treated as a failed attempt
+            if written > 0:
                 return True
-            else:
-                if os.path.exists(save_path):
-                    os.remove(save_path)
                     
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
@@ -102,6 +181,10 @@ def ensure_pdf_available(zot, item: dict, attachment: dict, pdf_base_dir: str, d
     
     # Silent operation for performance
     
+    # Fast path: the storage index built once per run
+    if file_key and _list_storage(pdf_base_dir).get(file_key, {}).get(filename):
+        return os.path.join(pdf_base_dir, 'storage', file_key, filename)
+    
     # Try different path constructions
     possible_paths = []
     
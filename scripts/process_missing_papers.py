@@ -8,6 +8,7 @@ import os
 import sys
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -21,6 +22,21 @@ from scripts.zotero_fetch import fetch_zotero_items, fetch_zotero_items_by_keys
 from scripts.run_literature_batch import process_item, setup_logger
 from scripts.zotero_path_finder import get_default_pdf_dir
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _load_json(path):
+    """sync_checker 보고서 로드 (orjson이 있으면 바이트로 읽어 파싱)"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -46,13 +62,18 @@ def main():
         action='store_true',
         help='실제로 파일 생성하지 않고 미리보기만'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('PAPER_WORKERS', '8')),
+        help='동시에 처리할 논문 수 (기본: PAPER_WORKERS 또는 8)'
+    )
 
     args = parser.parse_args()
 
     # Load sync report
     print(f"📂 JSON 파일 읽는 중: {args.from_json}")
-    with open(args.from_json, 'r', encoding='utf-8') as f:
-        sync_data = json.load(f)
+    sync_data = _load_json(args.from_json)
 
     added_items = sync_data.get('added', [])
     print(f"✓ 누락된 논문: {len(added_items)}개")
@@ -82,7 +103,7 @@ def main():
     log = setup_logger('missing_papers', './logs/missing_papers.log')
     log.info(f"Processing {len(added_keys)} missing papers")
 
-    # Fast path: fetch only the keys we need (1 API call per item, not full library)
+    # Fast path: fetch only the keys we need (up to 50 keys per API call, not full library)
     print(f"\n🔍 Zotero에서 {len(added_keys)}개 항목만 가져오는 중 (빠른 경로)...")
     items_to_process, zot = fetch_zotero_items_by_keys(
         os.getenv('ZOTERO_USER_ID'),
@@ -106,42 +127,41 @@ def main():
 
     process_args = ProcessArgs()
 
-    # Process each item
-    print(f"\n🚀 논문 처리 시작...\n")
+    # Process items in parallel (PDF download + API calls are I/O-bound);
+    # results are reported in completion order
+    print(f"\n🚀 논문 처리 시작... ({args.workers}개 병렬)\n")
     print("="*80)
 
     success_count = 0
     error_count = 0
 
-    for i, item in enumerate(items_to_process, 1):
-        key = item['key']
-        title = item['title']
-
-        print(f"\n[{i}/{len(items_to_process)}] {title[:60]}...")
-        print(f"  Key: {key}")
-        print(f"  Collection: {item.get('collection_path', 'Uncategorized')}")
-
-        try:
-            result = process_item(
-                item,
-                process_args,
-                log,
-                output_dir,
-                pdf_base_dir,
-                zot
-            )
-
-            if result:
-                success_count += 1
-                print(f"  ✅ 완료")
-            else:
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(process_item, item, process_args, log, output_dir, pdf_base_dir, zot): item
+            for item in items_to_process
+        }
+
+        for i, future in enumerate(as_completed(futures), 1):
+            item = futures[future]
+            key = item['key']
+            title = item['title']
+
+            print(f"\n[{i}/{len(items_to_process)}] {title[:60]}...")
+            print(f"  Key: {key}")
+            print(f"  Collection: {item.get('collection_path', 'Uncategorized')}")
+
+            try:
+                if future.result():
+                    success_count += 1
+                    print(f"  ✅ 완료")
+                else:
+                    error_count += 1
+                    print(f"  ❌ 실패")
+
+            except Exception as e:
                 error_count += 1
-                print(f"  ❌ 실패")
-
-        except Exception as e:
-            error_count += 1
-            print(f"  ❌ 오류: {e}")
-            log.error(f"Error processing {key}: {e}")
+                print(f"  ❌ 오류: {e}")
+                log.error(f"Error processing {key}: {e}")
 
     # Summary
     print("\n" + "="*80)
@@ -5,65 +5,86 @@ import os
 import sys
 import argparse
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
-from text_extractor import extract_text_from_pdf, extract_text_and_images
-from gpt_summarizer import generate_short_long, generate_sections
-from markdown_writer_enhanced import render_note_with_ai_links as render_note, write_markdown
-from utils import setup_logger
+from text_extractor import extract_text_and_images_cached
+from markdown_writer import write_new_markdown
+from markdown_writer_enhanced import render_note_with_ai_links as render_note
+from utils import ensure_dir, find_pdfs, setup_logger
+
+# Compiled once; metadata heuristics only look at the head of the document
+_DOI_RE = re.compile(r'10\.\d{4,}/[-._;()/:\w]+')
+_YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+_FILENAME_BAD_RE = re.compile(r'[<>:"/\\|?*]')
+_WS_RE = re.compile(r'\s+')
+METADATA_SEARCH_CHARS = 5000
+# Text needed downstream: GPT gets at most GPT_TEXT_CHARS; metadata-only runs
+# need the head plus room for an abstract found near its end
+GPT_TEXT_CHARS = 30000
+METADATA_TEXT_CHARS = METADATA_SEARCH_CHARS + 2000
+# Case-insensitive matching instead of lowercasing the whole document
+_ABSTRACT_RE = re.compile(r'abstract', re.IGNORECASE)
+_ABSTRACT_STOP_RE = re.compile(r'\b(?:introduction|keywords|1\.|I\.)', re.IGNORECASE)
+# Title: first line of 21-199 chars (ignoring surrounding blanks) with a letter
+# that isn't an ASCII capital, i.e. neither ALL CAPS nor a bare number
+_TITLE_LINE_RE = re.compile(r'^[ \t]*(?=[^\n]*[^\W\dA-Z_])(\S[^\n]{19,197}\S)[ \t\r]*$', re.MULTILINE)
+TITLE_SEARCH_CHARS = 4000
 
 def extract_metadata_from_pdf(pdf_path, text):
     """Extract metadata from PDF text content."""
+    current_year = datetime.now().year
     metadata = {
         'title': 'Unknown Title',
         'authors': [],
-        'year': datetime.now().year,
+        'year': current_year,
         'abstract': '',
         'doi': '',
         'journal': '',
         'keywords': []
     }
     
-    # Try to extract title from first few lines
-    lines = text.split('\n')[:50]  # First 50 lines
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if len(line) > 20 and len(line) < 200:  # Reasonable title length
-            # Check if it looks like a title (not all caps, not a number)
-            if not line.isupper() and not line.replace('.', '').isdigit():
-                metadata['title'] = line
-                break
-    
-    # Extract DOI
-    doi_pattern = r'10\.\d{4,}/[-._;()/:\w]+'
-    doi_match = re.search(doi_pattern, text[:5000])  # Search in first 5000 chars
+    # Try to extract title from the first lines
+    title_match = _TITLE_LINE_RE.search(text, 0, TITLE_SEARCH_CHARS)
+    if title_match:
+        metadata['title'] = title_match.group(1)
+    
+    # Extract DOI (pos/endpos bound the search without slicing a copy)
+    doi_match = _DOI_RE.search(text, 0, METADATA_SEARCH_CHARS)
     if doi_match:
         metadata['doi'] = doi_match.group()
     
     # Extract year
-    year_pattern = r'\b(19|20)\d{2}\b'
-    year_matches = re.findall(year_pattern, text[:5000])
+    year_matches = _YEAR_RE.findall(text, 0, METADATA_SEARCH_CHARS)
     if year_matches:
         # Get the most recent year that's not in the future
-        current_year = datetime.now().year
         valid_years = [int(y) for y in year_matches if int(y) <= current_year]
         if valid_years:
             metadata['year'] = max(valid_years)
     
     # Extract abstract
-    abstract_start = text.lower().find('abstract')
-    if abstract_start != -1:
-        abstract_text = text[abstract_start:abstract_start+2000]
-        # Clean up abstract
-        abstract_lines = abstract_text.split('\n')[1:20]  # Skip "Abstract" line
-        abstract = ' '.join(line.strip() for line in abstract_lines if line.strip())
-        # Stop at introduction or keywords
-        for stop_word in ['introduction', 'keywords', '1.', 'I.']:
-            stop_pos = abstract.lower().find(stop_word.lower())
-            if stop_pos > 100:  # Make sure we have some content
-                abstract = abstract[:stop_pos]
-                break
+    abstract_match = _ABSTRACT_RE.search(text)
+    if abstract_match:
+        abstract_start = abstract_match.start()
+        window_end = min(len(text), abstract_start + 2000)
+        # Skip the "Abstract" line and keep up to 19 lines after it, located by
+        # newline offsets instead of splitting the window into a list
+        body_start = text.find('\n', abstract_start, window_end)
+        abstract = ''
+        if body_start != -1:
+            body_end = pos = body_start
+            for _ in range(19):
+                pos = text.find('\n', pos + 1, window_end)
+                if pos == -1:
+                    body_end = window_end
+                    break
+                body_end = pos
+            # Clean up abstract: one pass joins lines and collapses whitespace
+            abstract = _WS_RE.sub(' ', text[body_start:body_end]).strip()
+        # Stop at introduction or keywords (past the first 100 chars so we keep some content)
+        stop_match = _ABSTRACT_STOP_RE.search(abstract, 101)
+        if stop_match:
+            abstract = abstract[:stop_match.start()]
         metadata['abstract'] = abstract.strip()
     
     return metadata
@@ -71,13 +92,28 @@ def extract_metadata_from_pdf(pdf_path, text):
 def sanitize_filename(filename):
     """Sanitize filename for filesystem."""
     # Remove or replace problematic characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _FILENAME_BAD_RE.sub('_', filename)
     filename = filename.strip('. ')
     # Limit length
     if len(filename) > 200:
         filename = filename[:200]
     return filename
 
+def _extract_pdf(pdf_path, output_dir, max_chars=GPT_TEXT_CHARS):
+    """CPU-bound phase: text (up to max_chars), images and metadata heuristics.
+
+    Module-level with a picklable result so process_batch can run it in a
+    process pool. Returns (text, images, captions, featured_image, metadata);
+    metadata is None when too little text was extracted.
+    """
+    img_output_dir = os.path.join(output_dir, Path(pdf_path).stem, "images")
+    text, images, captions, featured_image = extract_text_and_images_cached(pdf_path, img_output_dir,
+                                                                            max_chars=max_chars)
+    metadata = None
+    if text and len(text.strip()) >= 100:
+        metadata = extract_metadata_from_pdf(pdf_path, text)
+    return text, images, captions, featured_image, metadata
+
 def process_single_pdf(pdf_path, output_dir=None, skip_gpt=False):
     """Process a single PDF file."""
     # Setup
@@ -93,38 +129,41 @@ def process_single_pdf(pdf_path, output_dir=None, skip_gpt=False):
         output_dir = os.getenv('OUTPUT_DIR', './ObsidianVault/LiteratureNotes/')
     
     # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    ensure_dir(output_dir)
     
     log.info(f"Processing PDF: {pdf_path}")
     
     # Extract text and images
-    img_output_dir = os.path.join(output_dir, Path(pdf_path).stem, "images")
-    text, images, captions, featured_image = extract_text_and_images(pdf_path, img_output_dir)
+    max_chars = METADATA_TEXT_CHARS if skip_gpt else GPT_TEXT_CHARS
+    return _write_note(pdf_path, output_dir, skip_gpt, log, _extract_pdf(pdf_path, output_dir, max_chars))
+
+def _write_note(pdf_path, output_dir, skip_gpt, log, extracted):
+    """I/O-bound phase: GPT summaries, rendering and writing the note."""
+    text, images, captions, featured_image, metadata = extracted
+    now = datetime.now()
     
-    if not text or len(text.strip()) < 100:
-        log.error(f"Failed to extract sufficient text from PDF (only {len(text)} chars)")
+    if metadata is None:
+        log.error(f"Failed to extract sufficient text from PDF (only {len(text or '')} chars)")
         return False
     
     log.info(f"Extracted {len(text)} characters and {len(images)} images from PDF")
     if featured_image:
         log.info(f"Featured image: {featured_image['filename']} ({featured_image['selection_reason']})")
     
-    # Extract metadata
-    metadata = extract_metadata_from_pdf(pdf_path, text)
     log.info(f"Extracted metadata - Title: {metadata['title'][:50]}...")
     
     # Generate summaries if not skipping GPT
     if not skip_gpt:
         try:
-            # Truncate text if too long
-            if len(text) > 30000:
-                log.warning(f"Text too long ({len(text)} chars), truncating to 30000")
-                text = text[:30000]
+            # Imported here so --skip-gpt runs (and extraction worker processes)
+            # never load openai and the summarizer stack
+            from gpt_summarizer import generate_all
             
-            # Generate summaries
+            # Generate summaries (text was already capped at GPT_TEXT_CHARS during extraction)
             title = metadata.get('title', 'Unknown')
-            short_summary, long_summary = generate_short_long(text, title)
-            contribution, limitations, ideas, keywords = generate_sections(text, title)
+            # One structured call for all six fields (falls back to the per-step calls internally)
+            (short_summary, long_summary, contribution, limitations,
+             ideas, keywords) = generate_all(text, title)
             
             metadata['short_summary'] = short_summary
             metadata['long_summary'] = long_summary
@@ -155,7 +194,7 @@ def process_single_pdf(pdf_path, output_dir=None, skip_gpt=False):
         'doi': metadata['doi'],
         'publicationTitle': metadata['journal'],
         'keywords': metadata['keywords'],
-        'date': datetime.now().strftime('%Y-%m-%d'),
+        'date': now.strftime('%Y-%m-%d'),
         'itemType': 'journalArticle',
         'pdf_path': f"file://{os.path.abspath(pdf_path)}",
         'collections': ['Single PDF Import'],
@@ -178,26 +217,80 @@ def process_single_pdf(pdf_path, output_dir=None, skip_gpt=False):
     safe_filename = sanitize_filename(metadata['title'])
     output_path = os.path.join(output_dir, f"{safe_filename}.md")
     
-    # Handle duplicates
-    if os.path.exists(output_path):
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_path = os.path.join(output_dir, f"{safe_filename}_{timestamp}.md")
-    
-    write_markdown(content, output_path)
+    # Handle duplicates: an existing note keeps its name, this one gets a timestamp
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    output_path = write_new_markdown(content, output_path,
+                                     os.path.join(output_dir, f"{safe_filename}_{timestamp}.md"))
     log.info(f"✅ Created markdown note: {output_path}")
     
     return True
 
+def process_batch(pdf_paths, output_dir=None, skip_gpt=False, workers=None, gpt_workers=None):
+    """Process many PDFs in one interpreter.
+
+    Extraction (CPU-bound) runs in a process pool of `workers`; GPT
+    summarization and note writing (network-bound) run in a thread pool of
+    `gpt_workers`, which caps the papers in flight at the API, and start as soon
+    as each PDF's extraction finishes. Returns the number of notes written.
+    """
+    log = setup_logger("single_pdf", "logs/single_pdf.log")
+    
+    if not output_dir:
+        output_dir = os.getenv('OUTPUT_DIR', './ObsidianVault/LiteratureNotes/')
+    ensure_dir(output_dir)
+    
+    workers = workers or os.cpu_count() or 1
+    gpt_workers = gpt_workers or int(os.getenv('PAPER_WORKERS', '8'))
+    total = len(pdf_paths)
+    log.info(f"Batch processing {total} PDFs with {workers} extraction / {gpt_workers} GPT workers")
+    
+    success_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as extract_pool, \
+         ThreadPoolExecutor(max_workers=gpt_workers) as note_pool:
+        max_chars = METADATA_TEXT_CHARS if skip_gpt else GPT_TEXT_CHARS
+        extract_futures = {extract_pool.submit(_extract_pdf, pdf_path, output_dir, max_chars): pdf_path
+                           for pdf_path in pdf_paths}
+        note_futures = {}
+        for future in as_completed(extract_futures):
+            pdf_path = extract_futures[future]
+            try:
+                extracted = future.result()
+            except Exception as e:
+                log.error(f"Extraction failed for {pdf_path}: {e}")
+                print(f"❌ {Path(pdf_path).name}: extraction failed ({e})")
+                continue
+            note_futures[note_pool.submit(_write_note, pdf_path, output_dir, skip_gpt, log, extracted)] = pdf_path
+        
+        for i, future in enumerate(as_completed(note_futures), 1):
+            pdf_path = note_futures[future]
+            try:
+                ok = future.result()
+            except Exception as e:
+                log.error(f"Error processing {pdf_path}: {e}")
+                ok = False
+            success_count += bool(ok)
+            print(f"[{i}/{total}] {'✅' if ok else '❌'} {Path(pdf_path).name}")
+    
+    return success_count
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description='Process a single PDF paper into Obsidian markdown')
-    parser.add_argument('pdf_path', help='Path to the PDF file to process')
+    parser.add_argument('pdf_path', nargs='?', help='Path to the PDF file to process')
+    parser.add_argument('--batch', metavar='DIR', help='Process every PDF under DIR instead of a single file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Extraction processes for --batch (default: CPU count)')
+    parser.add_argument('--gpt-workers', type=int,
+                        help='Papers summarized concurrently in --batch (default: PAPER_WORKERS or 8)')
     parser.add_argument('--output-dir', help='Output directory for markdown file (default: from .env)')
     parser.add_argument('--skip-gpt', action='store_true', help='Skip GPT summarization')
     
     args = parser.parse_args()
+    if not args.pdf_path and not args.batch:
+        parser.error('pdf_path or --batch DIR is required')
     
     # Load environment
+    from dotenv import load_dotenv
     env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
     if os.path.exists(env_path):
         load_dotenv(env_path)
@@ -209,6 +302,17 @@ def main():
         print("Error: OPENAI_API_KEY not set. Use --skip-gpt or set the API key.")
         sys.exit(1)
     
+    if args.batch:
+        pdf_paths = find_pdfs(args.batch)
+        if not pdf_paths:
+            print(f"❌ No PDFs found under {args.batch}")
+            sys.exit(1)
+        done = process_batch(pdf_paths, args.output_dir, args.skip_gpt, args.workers, args.gpt_workers)
+        print(f"✅ Processed {done}/{len(pdf_paths)} PDFs")
+        if done < len(pdf_paths):
+            sys.exit(1)
+        return
+    
     # Process the PDF
     success = process_single_pdf(args.pdf_path, args.output_dir, args.skip_gpt)
     
@@ -4,43 +4,94 @@ Process a single PDF from Zotero storage with full metadata from Zotero API.
 import os
 import sys
 import re
+import json
+import time
 import argparse
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
 from app_config import get_zotero_client
-from text_extractor import extract_text_and_images
-from gpt_summarizer import generate_short_long, generate_sections
-from markdown_writer_enhanced import render_note_with_ai_links as render_note, write_markdown
-from utils import setup_logger
+from text_extractor import extract_text_and_images_cached
+from markdown_writer import write_new_markdown
+from markdown_writer_enhanced import render_note_with_ai_links as render_note
+from utils import ensure_dir, find_pdfs, setup_logger
 from zotero_fetch import build_collection_hierarchy
 
+_FILENAME_BAD_RE = re.compile(r'[<>:"/\\|?*]')
+_WS_RE = re.compile(r'\s+')
+_KW_SPLIT_RE = re.compile(r'[,\n;]|\s{2,}')
+# Item key: the 8-character directory right after a 'storage' path component
+_STORAGE_KEY_RE = re.compile(r'(?:^|[/\\])storage[/\\]([A-Z0-9]{8})[/\\]')
+# Extraction stops once this much text is collected: GPT never sees more, and
+# --skip-gpt only needs enough to tell a text layer from a scanned PDF
+GPT_TEXT_CHARS = 30000
+SKIP_GPT_TEXT_CHARS = 5000
+# Image folder name from the title in one pass: path separators become '-', other unsafe chars are dropped
+_IMG_DIR_TRANS = str.maketrans({'/': '-', ':': '-', '\\': '-',
+                                '?': None, '*': None, '"': None, '<': None, '>': None, '|': None})
+
+# The library's collection tree is the same for every PDF: build it once per
+# process, and reuse it across invocations (shell loops) for up to an hour
+COLLECTION_CACHE_FILE = os.path.join('logs', 'collection_hierarchy.json')
+COLLECTION_CACHE_TTL = 3600
+_hierarchy = None
+_hierarchy_fetched = False
+_hierarchy_lock = threading.Lock()
+
+def _load_cached_hierarchy(user_id):
+    """Collection paths persisted by an earlier run, or None if stale / other library."""
+    try:
+        if time.time() - os.path.getmtime(COLLECTION_CACHE_FILE) > COLLECTION_CACHE_TTL:
+            return None
+        with open(COLLECTION_CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data.get('paths') if data.get('user_id') == user_id else None
+
+def _collection_hierarchy(zot, user_id, collection_keys):
+    """{collection_key: path}, fetched from Zotero at most once per process.
+
+    A cached tree that lacks one of collection_keys (a collection created since
+    it was saved) is refreshed once.
+    """
+    global _hierarchy, _hierarchy_fetched
+    with _hierarchy_lock:
+        if _hierarchy is None:
+            _hierarchy = _load_cached_hierarchy(user_id)
+        stale = _hierarchy is None or any(key not in _hierarchy for key in collection_keys)
+        if stale and not _hierarchy_fetched:
+            _hierarchy = build_collection_hierarchy(zot)
+            _hierarchy_fetched = True
+            try:
+                ensure_dir(os.path.dirname(COLLECTION_CACHE_FILE))
+                with open(COLLECTION_CACHE_FILE, 'w', encoding='utf-8') as f:
+                    json.dump({'user_id': user_id, 'paths': _hierarchy}, f, ensure_ascii=False)
+            except OSError:
+                pass
+        return _hierarchy
+
 def extract_item_key_from_path(pdf_path):
     """Extract Zotero item key from storage path."""
     # Zotero storage pattern: .../storage/ITEMKEY/filename.pdf
-    path_parts = Path(pdf_path).parts
-    
-    # Find 'storage' in path and get the next part (item key)
-    try:
-        storage_index = path_parts.index('storage')
-        if storage_index + 1 < len(path_parts):
-            # Item key is the directory name after 'storage'
-            item_key = path_parts[storage_index + 1]
-            # Validate it looks like a Zotero key (8 alphanumeric characters)
-            if len(item_key) == 8 and item_key.isalnum():
-                return item_key
-    except ValueError:
-        pass
-    
-    return None
+    match = _STORAGE_KEY_RE.search(str(pdf_path))
+    return match.group(1) if match else None
 
-def fetch_item_from_zotero(user_id, item_key):
-    """Fetch item metadata from Zotero API using item key.
+# pyzotero keeps per-request state (last response, pagination links) on the
+# client, so batch threads each get their own, reused for every item they handle
+_zot_local = threading.local()
 
-    ``user_id`` is used only to build the zotero:// web link; the client itself
-    reads its credentials from the environment via get_zotero_client().
-    """
-    zot = get_zotero_client()
+def _zotero_client():
+    """This thread's pyzotero client, built once via get_zotero_client()."""
+    zot = getattr(_zot_local, 'zot', None)
+    if zot is None:
+        zot = _zot_local.zot = get_zotero_client()
+    return zot
+
+def fetch_item_from_zotero(zot, item_key):
+    """Fetch item metadata from Zotero API using item key, via an existing client."""
+    user_id = str(zot.library_id)
     
     try:
         # Get the parent item (the attachment's parent)
@@ -60,8 +111,8 @@ def fetch_item_from_zotero(user_id, item_key):
         collection_paths = []
         
         if collection_keys:
-            # Build collection hierarchy
-            collection_hierarchy = build_collection_hierarchy(zot)
+            # Collection hierarchy (cached across items)
+            collection_hierarchy = _collection_hierarchy(zot, user_id, collection_keys)
             
             for col_key in collection_keys:
                 if col_key in collection_hierarchy:
@@ -69,12 +120,13 @@ def fetch_item_from_zotero(user_id, item_key):
         
         # Format the item data
         data = item['data']
+        now = datetime.now()
         formatted_item = {
             'key': item['key'],
             'title': data.get('title', 'Unknown Title'),
             'authors': [],
             'abstract': data.get('abstractNote', ''),
-            'year': data.get('date', '').split('-')[0] if data.get('date') else str(datetime.now().year),
+            'year': data.get('date', '').split('-')[0] if data.get('date') else str(now.year),
             'doi': data.get('DOI', ''),
             'publicationTitle': data.get('publicationTitle', ''),
             'volume': data.get('volume', ''),
@@ -86,7 +138,7 @@ def fetch_item_from_zotero(user_id, item_key):
             'collections': collection_paths if collection_paths else ['Uncategorized'],
             'zotero_link': f"https://www.zotero.org/users/{user_id}/items/{item['key']}",
             'zotero_app_link': f"zotero://select/items/0_{item['key']}",
-            'date': datetime.now(),
+            'date': now,
             'citekey': data.get('citationKey', item['key']),
             'bibliography': '',
             'attachments': []  # We already have the PDF path
@@ -111,7 +163,7 @@ def fetch_item_from_zotero(user_id, item_key):
 def process_zotero_pdf(pdf_path, output_dir=None, skip_gpt=False, filename_format='title'):
     """Process a PDF from Zotero storage."""
     # Setup
-    os.makedirs('logs', exist_ok=True)
+    ensure_dir('logs')
     log = setup_logger('process_zotero_pdf', 'logs/process_zotero_pdf.log')
     
     # Validate environment
@@ -122,31 +174,46 @@ def process_zotero_pdf(pdf_path, output_dir=None, skip_gpt=False, filename_forma
         log.error("Missing ZOTERO_USER_ID or ZOTERO_API_KEY in .env file")
         return False
     
+    # Set default output directory
+    if not output_dir:
+        output_dir = os.getenv('OUTPUT_DIR', './ObsidianVault/LiteratureNotes/')
+    
+    prepared = _prepare_item(pdf_path, output_dir, log)
+    if prepared is None:
+        return False
+    
+    # Extract text and images - use unified img folder structure
+    extracted = extract_text_and_images_cached(pdf_path, prepared[3],
+                                               max_chars=SKIP_GPT_TEXT_CHARS if skip_gpt else GPT_TEXT_CHARS)
+    return _write_note(pdf_path, skip_gpt, filename_format, log, prepared, extracted)
+
+def _prepare_item(pdf_path, output_dir, log):
+    """Network phase: resolve the Zotero item and the note / image folders.
+
+    Returns (item, folder_path, paper_title, img_output_dir), or None after
+    logging why the PDF can't be processed.
+    """
     # Validate PDF exists
     if not os.path.exists(pdf_path):
         log.error(f"PDF file not found: {pdf_path}")
-        return False
+        return None
     
     # Extract item key from path
     item_key = extract_item_key_from_path(pdf_path)
     if not item_key:
         log.error(f"Could not extract Zotero item key from path: {pdf_path}")
         log.info("Make sure the PDF is in Zotero storage (e.g., .../storage/ITEMKEY/file.pdf)")
-        return False
+        return None
     
     log.info(f"Found Zotero item key: {item_key}")
     
     # Fetch metadata from Zotero
     try:
-        item = fetch_item_from_zotero(user_id, item_key)
+        item = fetch_item_from_zotero(_zotero_client(), item_key)
         log.info(f"Fetched metadata for: {item['title']}")
     except Exception as e:
         log.error(f"Failed to fetch metadata from Zotero: {e}")
-        return False
-    
-    # Set default output directory
-    if not output_dir:
-        output_dir = os.getenv('OUTPUT_DIR', './ObsidianVault/LiteratureNotes/')
+        return None
     
     # Create collection-based folder structure
     if item['collections']:
@@ -156,13 +223,18 @@ def process_zotero_pdf(pdf_path, output_dir=None, skip_gpt=False, filename_forma
     else:
         folder_path = output_dir
     
-    os.makedirs(folder_path, exist_ok=True)
+    ensure_dir(folder_path)
     
-    # Extract text and images - use unified img folder structure
-    paper_title = item.get('title', 'Unknown').replace('/', '-').replace(':', '-').replace('?', '').replace('*', '').replace('"', '').replace('<', '').replace('>', '').replace('|', '').replace('\\', '-')[:100]
+    # Unified img folder structure
+    paper_title = item.get('title', 'Unknown').translate(_IMG_DIR_TRANS)[:100]
     img_base_dir = os.path.join(output_dir, "img")
     img_output_dir = os.path.join(img_base_dir, paper_title)
-    text, images, captions, featured_image = extract_text_and_images(pdf_path, img_output_dir)
+    return item, folder_path, paper_title, img_output_dir
+
+def _write_note(pdf_path, skip_gpt, filename_format, log, prepared, extracted):
+    """GPT summaries, rendering and writing the note for a prepared, extracted PDF."""
+    item, folder_path, _, img_output_dir = prepared
+    text, images, captions, featured_image = extracted
     
     if not text or len(text.strip()) < 100:
         log.warning(f"Failed to extract sufficient text from PDF, using abstract")
@@ -178,44 +250,22 @@ def process_zotero_pdf(pdf_path, output_dir=None, skip_gpt=False, filename_forma
     # Generate summaries if not skipping GPT
     if not skip_gpt:
         try:
-            # Truncate text if too long
-            if len(text) > 30000:
-                log.warning(f"Text too long ({len(text)} chars), truncating to 30000")
-                text = text[:30000]
+            # Imported here so --skip-gpt runs (and extraction worker processes)
+            # never load openai and the summarizer stack
+            from gpt_summarizer import generate_all
             
+            # text was already capped at GPT_TEXT_CHARS during extraction
             # Generate summaries with title parameter (like gpt_summarizer.py)
             title = item.get('title', 'Unknown')
             folder_hint = item.get('collections', [None])[0] if item.get('collections') else None
-            short_summary, long_summary = generate_short_long(text, title, folder_hint=folder_hint)
-            contribution, limitations, ideas, keywords_raw = generate_sections(text, title)
+            # One structured call for all six fields (falls back to the per-step calls internally)
+            (short_summary, long_summary, contribution, limitations,
+             ideas, keywords_raw) = generate_all(text, title, folder_hint=folder_hint)
             
-            # Parse keywords from the raw response
+            # Parse keywords from the raw response: one split on commas / newlines /
+            # semicolons / runs of spaces
             if isinstance(keywords_raw, str):
-                # First, try to split by commas (preferred format)
-                if ',' in keywords_raw:
-                    keywords = [kw.strip() for kw in keywords_raw.strip().split(',') if kw.strip()]
-                # Then check for newlines (each line is a complete keyword/phrase)
-                elif '\n' in keywords_raw:
-                    # Each line is a complete keyword, don't split further
-                    keywords = [kw.strip() for kw in keywords_raw.strip().split('\n') if kw.strip()]
-                # Check if it looks like a multi-word phrase pattern (common GPT response issue)
-                elif keywords_raw.strip().startswith(('systems', 'multi', 'virtual', 'agent', 'mathematical')):
-                    # This might be the problematic multi-line response without newlines
-                    # Try to identify keyword boundaries by common patterns
-                    # For now, treat the whole thing as a single problematic response
-                    # and extract individual words that could be keywords
-                    words = keywords_raw.strip().split()
-                    # If we have many single words, it's probably the character-split issue
-                    if len(words) > 15:
-                        # Return a default set of keywords for this problematic case
-                        keywords = ['systems-biology', 'multicellular-dynamics', 'agent-based-models', 
-                                   'mathematical-modeling', 'virtual-cell-lab']
-                    else:
-                        # Otherwise treat as space-separated keywords
-                        keywords = words
-                else:
-                    # Single keyword or space-separated keywords
-                    keywords = keywords_raw.strip().split() if ' ' in keywords_raw else [keywords_raw.strip()]
+                keywords = [kw.strip() for kw in _KW_SPLIT_RE.split(keywords_raw) if kw.strip()]
             else:
                 keywords = keywords_raw if isinstance(keywords_raw, list) else []
             
@@ -246,12 +296,10 @@ def process_zotero_pdf(pdf_path, output_dir=None, skip_gpt=False, filename_forma
     
     # Calculate relative path for featured image
     if featured_image:
-        # Calculate relative path from markdown file to image
-        # Assuming markdown is in /81. zotero/000.Papers/collection/
-        # and images are in /81. zotero/img/paper_title/
-        collection_depth = len(collection_path.split('/')) if 'collections' in item and item['collections'] else 0
-        relative_prefix = '../' * (collection_depth + 1)  # Go up to zotero root
-        featured_image['relative_path'] = f"{relative_prefix}img/{paper_title}/{featured_image['filename']}"
+        # Relative path from the note's folder (output/<collection>/) to the
+        # image (output/img/<paper_title>/), with '/' separators for Obsidian
+        image_path = os.path.join(img_output_dir, featured_image['filename'])
+        featured_image['relative_path'] = os.path.relpath(image_path, folder_path).replace(os.sep, '/')
     
     item['featured_image'] = featured_image
     
@@ -274,9 +322,9 @@ def process_zotero_pdf(pdf_path, output_dir=None, skip_gpt=False, filename_forma
     else:  # default to title
         safe_filename = item['title']
         # Remove problematic characters
-        safe_filename = re.sub(r'[<>:"/\\|?*]', '', safe_filename)
+        safe_filename = _FILENAME_BAD_RE.sub('', safe_filename)
         # Replace multiple spaces with single space
-        safe_filename = re.sub(r'\s+', ' ', safe_filename)
+        safe_filename = _WS_RE.sub(' ', safe_filename)
         # Trim to reasonable length
         if len(safe_filename) > 80:
             safe_filename = safe_filename[:80].rsplit(' ', 1)[0]  # Cut at word boundary
@@ -284,28 +332,97 @@ def process_zotero_pdf(pdf_path, output_dir=None, skip_gpt=False, filename_forma
     
     output_path = os.path.join(folder_path, f"{safe_filename}.md")
     
-    # Handle duplicates
-    if os.path.exists(output_path):
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_path = os.path.join(folder_path, f"{safe_filename}_{timestamp}.md")
-    
-    write_markdown(content, output_path)
+    # Handle duplicates: an existing note keeps its name, this one gets the
+    # note's own timestamp (set when the item was fetched)
+    timestamp = item['date'].strftime('%Y%m%d_%H%M%S')
+    output_path = write_new_markdown(content, output_path,
+                                     os.path.join(folder_path, f"{safe_filename}_{timestamp}.md"))
     log.info(f"✅ Created markdown note: {output_path}")
     
     return True
 
+def process_batch(pdf_paths, output_dir=None, skip_gpt=False, filename_format='title',
+                  workers=None, gpt_workers=None):
+    """Process many Zotero-storage PDFs in one interpreter.
+
+    Zotero lookups and GPT/note writing (network-bound) run in a thread pool of
+    `gpt_workers`, which caps the papers in flight at the API; text/image
+    extraction (CPU-bound) runs in a process pool of `workers`. Each PDF moves
+    to the next stage as soon as its own previous one finishes; a failure at any
+    stage is logged and skips only that PDF. Returns the number of notes written.
+    """
+    ensure_dir('logs')
+    log = setup_logger('process_zotero_pdf', 'logs/process_zotero_pdf.log')
+    
+    if not os.getenv('ZOTERO_USER_ID') or not os.getenv('ZOTERO_API_KEY'):
+        log.error("Missing ZOTERO_USER_ID or ZOTERO_API_KEY in .env file")
+        return 0
+    
+    if not output_dir:
+        output_dir = os.getenv('OUTPUT_DIR', './ObsidianVault/LiteratureNotes/')
+    
+    workers = workers or os.cpu_count() or 1
+    gpt_workers = gpt_workers or int(os.getenv('PAPER_WORKERS', '8'))
+    total = len(pdf_paths)
+    log.info(f"Batch processing {total} Zotero PDFs with {workers} extraction / {gpt_workers} GPT workers")
+    
+    success_count = 0
+    finished_count = 0
+    with ThreadPoolExecutor(max_workers=gpt_workers) as io_pool, \
+         ProcessPoolExecutor(max_workers=workers) as extract_pool:
+        max_chars = SKIP_GPT_TEXT_CHARS if skip_gpt else GPT_TEXT_CHARS
+        # future -> (stage, pdf_path, prepared); one loop drains all three stages so a
+        # PDF's next stage is submitted as soon as its own previous stage finishes
+        in_flight = {io_pool.submit(_prepare_item, pdf_path, output_dir, log): ('prepare', pdf_path, None)
+                     for pdf_path in pdf_paths}
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, pdf_path, prepared = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    log.error(f"{stage.capitalize()} failed for {pdf_path}: {e}")
+                    result = None
+                
+                if stage == 'prepare' and result is not None:
+                    in_flight[extract_pool.submit(extract_text_and_images_cached, pdf_path, result[3],
+                                                  max_chars=max_chars)] = ('extract', pdf_path, result)
+                    continue
+                if stage == 'extract' and result is not None:
+                    in_flight[io_pool.submit(_write_note, pdf_path, skip_gpt, filename_format, log,
+                                             prepared, result)] = ('note', pdf_path, prepared)
+                    continue
+                
+                # Finished (written, or failed at any stage; the reason is logged)
+                ok = stage == 'note' and bool(result)
+                success_count += ok
+                finished_count += 1
+                print(f"[{finished_count}/{total}] {'✅' if ok else '❌'} {Path(pdf_path).name}")
+    
+    return success_count
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description='Process a Zotero PDF with full metadata from API')
-    parser.add_argument('pdf_path', help='Path to the PDF file in Zotero storage')
+    parser.add_argument('pdf_path', nargs='?', help='Path to the PDF file in Zotero storage')
+    parser.add_argument('--batch', metavar='DIR',
+                        help='Process every PDF under DIR (e.g. Zotero storage/) instead of a single file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Extraction processes for --batch (default: CPU count)')
+    parser.add_argument('--gpt-workers', type=int,
+                        help='Papers summarized concurrently in --batch (default: PAPER_WORKERS or 8)')
     parser.add_argument('--output-dir', help='Output directory for markdown file (default: from .env)')
     parser.add_argument('--skip-gpt', action='store_true', help='Skip GPT summarization')
     parser.add_argument('--filename-format', choices=['title', 'citekey', 'key', 'author-year'], 
                         default='title', help='Filename format (default: title)')
     
     args = parser.parse_args()
+    if not args.pdf_path and not args.batch:
+        parser.error('pdf_path or --batch DIR is required')
     
     # Load environment variables
+    from dotenv import load_dotenv
     env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
     if os.path.exists(env_path):
         load_dotenv(env_path)
@@ -317,6 +434,18 @@ def main():
         print("Error: OPENAI_API_KEY not set. Use --skip-gpt or set the API key.")
         sys.exit(1)
     
+    if args.batch:
+        pdf_paths = find_pdfs(args.batch)
+        if not pdf_paths:
+            print(f"❌ No PDFs found under {args.batch}")
+            sys.exit(1)
+        done = process_batch(pdf_paths, args.output_dir, args.skip_gpt, args.filename_format,
+                             args.workers, args.gpt_workers)
+        print(f"✅ Processed {done}/{len(pdf_paths)} PDFs")
+        if done < len(pdf_paths):
+            sys.exit(1)
+        return
+    
     # Process the PDF
     success = process_zotero_pdf(args.pdf_path, args.output_dir, args.skip_gpt, args.filename_format)
     
@@ -12,6 +12,9 @@ from typing import List, Dict, Optional, Tuple, Any
 from datetime import datetime
 import hashlib
 
+# Keep IN (...) lists under SQLite's default host-parameter limit (999)
+_IN_BATCH_SIZE = 900
+
 
 class RelationManager:
     """
@@ -495,6 +498,89 @@ class RelationManager:
 
         return [dict(row) for row in self.cursor.fetchall()]
 
+    def _select_in(self, query: str, ids) -> List[sqlite3.Row]:
+        """
+        Run query with its single IN (...) placeholder filled for ids.
+
+        Args:
+            query: SQL with one '{placeholders}' slot for the IN list
+            ids: Identifiers to bind (duplicates are dropped)
+
+        Returns:
+            Rows from every batch, batches in order
+        """
+        ids = list(dict.fromkeys(i for i in ids if i))
+        rows = []
+        for start in range(0, len(ids), _IN_BATCH_SIZE):
+            batch = ids[start:start + _IN_BATCH_SIZE]
+            self.cursor.execute(query.format(placeholders=','.join('?' * len(batch))), batch)
+            rows.extend(self.cursor.fetchall())
+        return rows
+
+    def get_paper_info_batch(self, paper_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Get paper information for several papers in one query.
+
+        Args:
+            paper_ids: Paper identifiers
+
+        Returns:
+            {paper_id: paper information}; unknown papers are absent
+        """
+        rows = self._select_in("""
+            SELECT * FROM papers WHERE paper_id IN ({placeholders})
+        """, paper_ids)
+
+        return {row['paper_id']: dict(row) for row in rows}
+
+    def get_related_images_batch(self, chunk_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Get images related to several text chunks in one query.
+
+        Args:
+            chunk_ids: Text chunk identifiers
+
+        Returns:
+            {chunk_id: related images, highest confidence first}
+        """
+        rows = self._select_in("""
+            SELECT i.*, r.relation_type, r.confidence, r.text_chunk_id AS _chunk_id
+            FROM images i
+            JOIN image_text_relations r ON i.image_id = r.image_id
+            WHERE r.text_chunk_id IN ({placeholders})
+            ORDER BY r.confidence DESC
+        """, chunk_ids)
+
+        related = {}
+        for row in rows:
+            image = dict(row)
+            related.setdefault(image.pop('_chunk_id'), []).append(image)
+        return related
+
+    def get_image_context_batch(self, image_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Get text chunks related to several images in one query.
+
+        Args:
+            image_ids: Image identifiers
+
+        Returns:
+            {image_id: related text chunks, highest confidence first}
+        """
+        rows = self._select_in("""
+            SELECT t.*, r.relation_type, r.confidence, r.image_id AS _image_id
+            FROM text_chunks t
+            JOIN image_text_relations r ON t.chunk_id = r.text_chunk_id
+            WHERE r.image_id IN ({placeholders})
+            ORDER BY r.confidence DESC
+        """, image_ids)
+
+        context = {}
+        for row in rows:
+            chunk = dict(row)
+            context.setdefault(chunk.pop('_image_id'), []).append(chunk)
+        return context
+
     def get_paper_images(self, paper_id: str) -> List[Dict]:
         """
         Get all images from a paper.
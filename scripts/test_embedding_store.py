@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Check that the raw embedding store (embeddings.f32 + embeddings.jsonl) stays
+row-aligned after an interrupted append.
+
+Runs without loading CLIP: only the store methods of ImageRAGCLIP are used.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from image_rag_clip import ImageRAGCLIP, EMBEDDING_STORE_FILE, EMBEDDING_STORE_INDEX
+
+DIM = 8
+
+
+def make_store(db_path):
+    """ImageRAGCLIP with just the state the embedding store needs."""
+    rag = ImageRAGCLIP.__new__(ImageRAGCLIP)
+    rag.db_path = db_path
+    rag.embedding_dim = DIM
+    rag.store_embeddings = True
+    rag._store_rows = None
+    rag._write_lock = threading.Lock()
+    return rag
+
+
+def append(rag, start, count):
+    """Append rows whose vectors are filled with their row number."""
+    ids = [f"img{i}" for i in range(start, start + count)]
+    embeddings = np.repeat(np.arange(start, start + count, dtype=np.float32)[:, None], DIM, axis=1)
+    with rag._write_lock:
+        rag._append_embedding_store(ids, embeddings, [{'row': i} for i in range(start, start + count)])
+
+
+def assert_aligned(rag, expected_rows):
+    records, vectors = rag.load_embedding_store()
+    assert len(records) == len(vectors) == expected_rows, (len(records), len(vectors))
+    for record, vector in zip(records, vectors):
+        row = record['metadata']['row']
+        assert record['id'] == f"img{row}" and np.all(vector == row), (record, vector[0])
+
+
+def test_torn_vector_write():
+    """Crash after part of a vector row was written, before the JSONL line."""
+    with tempfile.TemporaryDirectory() as db_path:
+        append(make_store(db_path), 0, 3)
+        with open(os.path.join(db_path, EMBEDDING_STORE_FILE), 'ab') as f:
+            f.write(np.full(DIM + 3, 99, dtype=np.float32).tobytes()[:-2])
+
+        # A new process appends after the crash, then reloads
+        rag = make_store(db_path)
+        append(rag, 3, 2)
+        assert_aligned(rag, 5)
+        assert_aligned(make_store(db_path), 5)
+
+
+def test_torn_index_write():
+    """Crash after the vectors were written but mid-way through the JSONL lines."""
+    with tempfile.TemporaryDirectory() as db_path:
+        append(make_store(db_path), 0, 3)
+        with open(os.path.join(db_path, EMBEDDING_STORE_FILE), 'ab') as f:
+            f.write(np.repeat(np.array([[3], [4]], dtype=np.float32), DIM, axis=1).tobytes())
+        with open(os.path.join(db_path, EMBEDDING_STORE_INDEX), 'a', encoding='utf-8') as f:
+            f.write('{"id": "img3", "metadata": {"row": 3}}\n{"id": "img4", "meta')
+
+        rag = make_store(db_path)
+        assert_aligned(rag, 4)
+        append(rag, 4, 2)
+        assert_aligned(rag, 6)
+        assert_aligned(make_store(db_path), 6)
+
+
+def main():
+    for test in (test_torn_vector_write, test_torn_index_write):
+        test()
+        print(f"✅ {test.__name__}")
+
+
+if __name__ == "__main__":
+    main()
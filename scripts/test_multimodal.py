@@ -70,6 +70,9 @@ def test_image_rag():
 
         print(f"✅ Processed: {result}")
 
+        # Write the buffered rows before searching them
+        image_rag.flush()
+
         # Test search
         results = image_rag.search_by_text("nanoparticle structure", k=3)
         print(f"\n🔍 Search results: {len(results)} found")
@@ -2,7 +2,10 @@
 Extract text content from PDF files using the best available method.
 """
 import os
+import gzip
+import json
 import base64
+import hashlib
 from typing import Optional, List, Dict, Tuple
 
 # Try to import the best PDF extraction libraries
@@ -14,10 +17,12 @@ except ImportError:
 
 import fitz  # PyMuPDF
 
-def extract_text_from_pdf(pdf_path: str, max_pages: int = None) -> str:
+def extract_text_from_pdf(pdf_path: str, max_pages: int = None, max_chars: int = None) -> str:
     """
     Extract text from PDF using the best available method.
     Prioritizes pdfplumber for better table and layout handling.
+    With max_chars, page iteration stops once that much text has been collected
+    and the result is cut to max_chars.
     """
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
@@ -34,7 +39,7 @@ def extract_text_from_pdf(pdf_path: str, max_pages: int = None) -> str:
     # First try pdfplumber - best for academic papers with tables
     if PDFPLUMBER_AVAILABLE:
         try:
-            pdfplumber_result = _extract_with_pdfplumber(pdf_path, max_pages)
+            pdfplumber_result = _extract_with_pdfplumber(pdf_path, max_pages, max_chars)
             print(f"✓ Extracted {len(pdfplumber_result)} chars with pdfplumber")
         except Exception as e:
             pdfplumber_error = e
@@ -55,7 +60,7 @@ def extract_text_from_pdf(pdf_path: str, max_pages: int = None) -> str:
 
     # Try PyMuPDF enhanced (block-sorted layout)
     try:
-        result = _extract_with_pymupdf_enhanced(pdf_path, max_pages)
+        result = _extract_with_pymupdf_enhanced(pdf_path, max_pages, max_chars)
         print(f"✓ Extracted {len(result)} chars with PyMuPDF (enhanced)")
         if _looks_like_good_text(result):
             return result
@@ -65,7 +70,7 @@ def extract_text_from_pdf(pdf_path: str, max_pages: int = None) -> str:
 
     # Try PyMuPDF simple (raw page.get_text — preserves spaces for some PDFs)
     try:
-        result = _extract_with_pymupdf_simple(pdf_path, max_pages)
+        result = _extract_with_pymupdf_simple(pdf_path, max_pages, max_chars)
         print(f"✓ Extracted {len(result)} chars with PyMuPDF (simple)")
         if _looks_like_good_text(result):
             return result
@@ -113,7 +118,7 @@ def _pick_better_text(a: str, b: str) -> str:
     b_score = b[:5000].count(' ') / max(1, len(b[:5000]))
     return a if a_score > b_score else b
 
-def _extract_with_pdfplumber(pdf_path: str, max_pages: int = None) -> str:
+def _extract_with_pdfplumber(pdf_path: str, max_pages: int = None, max_chars: int = None) -> str:
     """Extract text using pdfplumber with table support."""
     result_parts = []
     empty_pages = 0
@@ -122,7 +127,10 @@ def _extract_with_pdfplumber(pdf_path: str, max_pages: int = None) -> str:
         pages_to_process = min(len(pdf.pages), max_pages) if max_pages else len(pdf.pages)
         print(f"  Processing {pages_to_process} pages with pdfplumber...")
         
+        collected = 0
         for i in range(pages_to_process):
+            if max_chars and collected >= max_chars:
+                break
             page = pdf.pages[i]
             
             # Extract text with error handling
@@ -131,6 +139,7 @@ def _extract_with_pdfplumber(pdf_path: str, max_pages: int = None) -> str:
                 if text and len(text.strip()) > 10:
                     result_parts.append(f"\n--- Page {i+1} ---\n")
                     result_parts.append(text)
+                    collected += len(text)
                 else:
                     empty_pages += 1
                     if empty_pages <= 3:  # Only warn for first few empty pages
@@ -156,9 +165,10 @@ def _extract_with_pdfplumber(pdf_path: str, max_pages: int = None) -> str:
     if not result_parts or all(not part.strip() for part in result_parts):
         raise ValueError(f"No text extracted from {pages_to_process} pages")
     
-    return '\n'.join(result_parts)
+    result = '\n'.join(result_parts)
+    return result[:max_chars] if max_chars else result
 
-def _extract_with_pymupdf_enhanced(pdf_path: str, max_pages: int = None) -> str:
+def _extract_with_pymupdf_enhanced(pdf_path: str, max_pages: int = None, max_chars: int = None) -> str:
     """Extract text using PyMuPDF with layout detection."""
     doc = fitz.open(pdf_path)
     pages = doc.page_count if max_pages is None else min(doc.page_count, max_pages)
@@ -166,7 +176,10 @@ def _extract_with_pymupdf_enhanced(pdf_path: str, max_pages: int = None) -> str:
     result_parts = [f"Document: {os.path.basename(pdf_path)}"]
     result_parts.append(f"Pages: {doc.page_count}\n")
     
+    collected = 0
     for i in range(pages):
+        if max_chars and collected >= max_chars:
+            break
         page = doc.load_page(i)
         result_parts.append(f"\n--- Page {i+1} ---\n")
         
@@ -189,20 +202,26 @@ def _extract_with_pymupdf_enhanced(pdf_path: str, max_pages: int = None) -> str:
                 if block_text.strip():
                     page_text.append(block_text.strip())
         
-        result_parts.append('\n'.join(page_text))
+        page_joined = '\n'.join(page_text)
+        result_parts.append(page_joined)
+        collected += len(page_joined)
     
     doc.close()
-    return '\n'.join(result_parts)
+    result = '\n'.join(result_parts)
+    return result[:max_chars] if max_chars else result
 
-def _extract_with_pymupdf_simple(pdf_path: str, max_pages: int = None) -> str:
+def _extract_with_pymupdf_simple(pdf_path: str, max_pages: int = None, max_chars: int = None) -> str:
     """Simple text extraction using PyMuPDF."""
     doc = fitz.open(pdf_path)
     pages = doc.page_count if max_pages is None else min(doc.page_count, max_pages)
     
     text_parts = []
     empty_pages = 0
+    collected = 0
     
     for i in range(pages):
+        if max_chars and collected >= max_chars:
+            break
         page = doc.load_page(i)
         
         # Try multiple extraction methods
@@ -220,6 +239,7 @@ def _extract_with_pymupdf_simple(pdf_path: str, max_pages: int = None) -> str:
         
         if text.strip():
             text_parts.append(f"--- Page {i+1} ---\n{text}")
+            collected += len(text)
         else:
             empty_pages += 1
             if empty_pages > 5:  # Too many empty pages, might be scanned PDF
@@ -231,7 +251,7 @@ def _extract_with_pymupdf_simple(pdf_path: str, max_pages: int = None) -> str:
     if not result.strip():
         raise ValueError("No text could be extracted - PDF might be scanned or image-based")
     
-    return result
+    return result[:max_chars] if max_chars else result
 
 def _format_table_as_text(table: list) -> str:
     """Format table data as readable text."""
@@ -782,15 +802,17 @@ def encode_image_to_base64(image_path: str) -> str:
     with open(image_path, "rb") as image_file:
         return base64.b64encode(image_file.read()).decode('utf-8')
 
-def extract_text_and_images(pdf_path: str, output_dir: str = None, max_pages: int = None) -> Tuple[str, List[Dict], List[Dict], Optional[Dict]]:
+def extract_text_and_images(pdf_path: str, output_dir: str = None, max_pages: int = None,
+                            max_chars: int = None) -> Tuple[str, List[Dict], List[Dict], Optional[Dict]]:
     """
     Enhanced extraction with better image-caption matching.
     Returns (text_content, image_list, caption_list, featured_image)
+    max_chars caps the text (pages past it are not parsed); images and captions are unaffected.
     """
     print(f"Starting enhanced extraction from: {os.path.basename(pdf_path)}")
     
     # Extract text
-    text_content = extract_text_from_pdf(pdf_path, max_pages)
+    text_content = extract_text_from_pdf(pdf_path, max_pages, max_chars)
     
     # Extract images with enhanced methods
     try:
@@ -843,6 +865,52 @@ def extract_text_and_images(pdf_path: str, output_dir: str = None, max_pages: in
     print(f"✅ Extraction complete: {len(text_content):,} chars, {len(images)} images, {len(captions)} captions")
     return text_content, images, captions, featured_image
 
+# On-disk memo of extract_text_and_images results, for reruns over the same PDFs
+TEXT_CACHE_DIR = os.path.join('logs', '.text_cache')
+
+def _text_cache_path(pdf_path: str, output_dir: str, max_pages: int, max_chars: int) -> str:
+    """Cache file for this PDF version (mtime + size) and extraction options."""
+    st = os.stat(pdf_path)
+    key = '\0'.join(str(part) for part in (os.path.abspath(pdf_path), st.st_mtime_ns, st.st_size,
+                                            output_dir, max_pages, max_chars))
+    return os.path.join(TEXT_CACHE_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json.gz')
+
+def extract_text_and_images_cached(pdf_path: str, output_dir: str = None, max_pages: int = None,
+                                   max_chars: int = None) -> Tuple[str, List[Dict], List[Dict], Optional[Dict]]:
+    """
+    extract_text_and_images, memoized in TEXT_CACHE_DIR.
+    Entries are keyed on the file's mtime and size, so an edited PDF is parsed again.
+    Image files are already written to output_dir, so only their metadata is cached;
+    a hit whose image files have since been removed is re-extracted.
+    """
+    try:
+        cache_path = _text_cache_path(pdf_path, output_dir, max_pages, max_chars)
+    except OSError:
+        return extract_text_and_images(pdf_path, output_dir, max_pages, max_chars)
+    
+    try:
+        with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+            text_content, images, captions, featured_image = json.load(f)
+        if all(os.path.exists(img['path']) for img in images if img.get('path')):
+            print(f"✓ Using cached extraction for: {os.path.basename(pdf_path)}")
+            return text_content, images, captions, featured_image
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    result = extract_text_and_images(pdf_path, output_dir, max_pages, max_chars)
+    
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(list(result), f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"  ⚠️ Could not cache extraction: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return result
+
 if __name__ == '__main__':
     import sys
     if len(sys.argv) > 1:
@@ -19,6 +19,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import custom modules
 from semantic_chunker import SemanticChunker, HybridChunker
+from brute_force_search import BruteForceIndex
 from text_extractor import extract_text_and_images, extract_figures_and_tables
 
 # Environment variables
@@ -61,7 +62,9 @@ class TextRAGBGEM3:
                  db_path: str = "./text_rag_bge_m3",
                  chunk_size: int = 1000,
                  overlap: int = 200,
-                 use_semantic_chunking: bool = True):
+                 use_semantic_chunking: bool = True,
+                 brute_force_max_vectors: int = 0,
+                 brute_force_int8: bool = False):
         """
         Initialize Text RAG with BGE-M3.
 
@@ -71,12 +74,17 @@ class TextRAGBGEM3:
             chunk_size: Size of text chunks in characters
             overlap: Overlap between chunks
             use_semantic_chunking: Use semantic chunking vs simple chunking
+            brute_force_max_vectors: Search ChromaDB collections up to this size
+                exactly in memory (0 disables)
+            brute_force_int8: Scan that in-memory copy as int8, re-ranking in FP32
         """
         self.db_type = db_type
         self.db_path = db_path
         self.chunk_size = chunk_size
         self.overlap = overlap
         self.use_semantic_chunking = use_semantic_chunking
+        self.brute_force_max_vectors = brute_force_max_vectors
+        self.brute_force_int8 = brute_force_int8
 
         # Initialize BGE-M3 model
         if BGE_M3_AVAILABLE:
@@ -131,6 +139,11 @@ class TextRAGBGEM3:
                 self.collection = self.client.get_collection(collection_name)
                 print(f"✅ Using existing ChromaDB collection: {collection_name}")
 
+            # Exact in-memory scan while the collection is small
+            self.exact_index = (BruteForceIndex(self.collection, self.brute_force_max_vectors,
+                                                int8=self.brute_force_int8)
+                                if self.brute_force_max_vectors else None)
+
         elif self.db_type == "pinecone" and PINECONE_AVAILABLE:
             # Initialize Pinecone
             api_key = os.getenv('PINECONE_API_KEY')
@@ -154,6 +167,7 @@ class TextRAGBGEM3:
                 print(f"✅ Using existing Pinecone index: {index_name}")
 
             self.pinecone_index = pc.Index(index_name)
+            self.exact_index = None
         else:
             raise ValueError(f"Database type {self.db_type} not available")
 
@@ -391,6 +405,8 @@ class TextRAGBGEM3:
                 embeddings=embeddings.tolist(),
                 metadatas=metadatas
             )
+            if self.exact_index is not None:
+                self.exact_index.invalidate()
 
         elif self.db_type == "pinecone":
             # Prepare data for Pinecone
@@ -417,11 +433,43 @@ class TextRAGBGEM3:
                 batch = vectors[i:i+batch_size]
                 self.pinecone_index.upsert(vectors=batch)
 
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Encode search queries into dense BGE-M3 vectors in one batch.
+
+        Args:
+            queries: Search queries
+
+        Returns:
+            Dense query embeddings, one row per query
+        """
+        return self.model.encode(
+            queries,
+            batch_size=12,
+            max_length=8192,
+            return_dense=True,
+            return_sparse=False,
+            return_colbert_vecs=False
+        )['dense_vecs']
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Encode a search query into its dense BGE-M3 vector.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Dense query embedding
+        """
+        return self.embed_queries([query])[0]
+
     def search(self,
               query: str,
               k: int = 10,
               filter_dict: Optional[Dict] = None,
-              use_hybrid: bool = False) -> List[Dict]:
+              use_hybrid: bool = False,
+              query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Search for relevant text chunks.
 
@@ -430,64 +478,159 @@ class TextRAGBGEM3:
             k: Number of results
             filter_dict: Optional metadata filters
             use_hybrid: Use hybrid search (dense + sparse)
+            query_embedding: Precomputed dense embedding of query (skips encoding)
 
         Returns:
             List of search results
         """
-        # Generate query embedding
-        query_embedding = self.model.encode(
-            [query],
-            batch_size=1,
-            max_length=8192,
-            return_dense=True,
-            return_sparse=use_hybrid,
-            return_colbert_vecs=False
-        )
+        if query_embedding is not None:
+            dense_embedding = query_embedding
+        else:
+            # Generate query embedding
+            query_embedding = self.model.encode(
+                [query],
+                batch_size=1,
+                max_length=8192,
+                return_dense=True,
+                return_sparse=use_hybrid,
+                return_colbert_vecs=False
+            )
+
+            dense_embedding = query_embedding['dense_vecs'][0]
+
+        return self._search_dense([dense_embedding], k, filter_dict)[0]
 
-        dense_embedding = query_embedding['dense_vecs'][0]
+    def search_batch(self,
+                     queries: List[str],
+                     k: int = 10,
+                     filter_dict: Optional[Dict] = None,
+                     query_embeddings: Optional[np.ndarray] = None) -> List[List[Dict]]:
+        """
+        Search for several queries at once.
+
+        Queries are encoded in one model call and, on ChromaDB, scored in one
+        query (a single matrix product on the in-memory exact index).
+
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            filter_dict: Optional metadata filters
+            query_embeddings: Precomputed dense embeddings, one row per query
+
+        Returns:
+            One list of search results per query
+        """
+        if not queries:
+            return []
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        return self._search_dense(query_embeddings, k, filter_dict)
+
+    def list_by_paper(self, paper_id: str, limit: int = 100) -> List[Dict]:
+        """
+        List a paper's chunks by metadata alone (no query encoding or vector scan).
+
+        Args:
+            paper_id: Paper identifier
+            limit: Maximum number of chunks
+
+        Returns:
+            Chunks of the paper in chunk order
+        """
+        filter_dict = {'paper_id': paper_id}
 
         if self.db_type == "chroma":
-            # Search in ChromaDB
-            results = self.collection.query(
-                query_embeddings=[dense_embedding.tolist()],
-                n_results=k,
-                where=filter_dict if filter_dict else None
+            results = self.collection.get(
+                where=filter_dict,
+                limit=limit,
+                include=["documents", "metadatas"]
             )
 
-            # Format results
-            formatted_results = []
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    'id': results['ids'][0][i],
-                    'text': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'score': 1 - results['distances'][0][i]
+            chunks = []
+            for chunk_id, text, metadata in zip(results['ids'], results['documents'], results['metadatas']):
+                chunks.append({
+                    'id': chunk_id,
+                    'text': text,
+                    'metadata': metadata
                 })
 
-            return formatted_results
+            chunks.sort(key=lambda x: x['metadata'].get('chunk_index', 0))
+            return chunks
 
-        elif self.db_type == "pinecone":
-            # Search in Pinecone
-            results = self.pinecone_index.query(
-                vector=dense_embedding.tolist(),
-                top_k=k,
-                include_metadata=True,
-                filter=filter_dict if filter_dict else None
-            )
+        # Pinecone has no metadata-only listing; fall back to a filtered search
+        return self.search("", k=limit, filter_dict=filter_dict)
+
+    def _search_dense(self,
+                      dense_embeddings,
+                      k: int,
+                      filter_dict: Optional[Dict]) -> List[List[Dict]]:
+        """
+        Search with dense query embeddings.
+
+        Args:
+            dense_embeddings: Query embeddings, one per query
+            k: Number of results per query
+            filter_dict: Optional metadata filters
+
+        Returns:
+            One list of search results per embedding
+        """
+        if self.db_type == "chroma":
+            # Search in ChromaDB (exact in-memory scan while the collection is small)
+            results = None
+            if self.exact_index is not None:
+                results = self.exact_index.query(
+                    query_embeddings=list(dense_embeddings),
+                    n_results=k,
+                    where=filter_dict if filter_dict else None
+                )
+            if results is None:
+                results = self.collection.query(
+                    query_embeddings=[e.tolist() for e in dense_embeddings],
+                    n_results=k,
+                    where=filter_dict if filter_dict else None
+                )
 
             # Format results
-            formatted_results = []
-            for match in results['matches']:
-                formatted_results.append({
-                    'id': match['id'],
-                    'text': match['metadata'].get('text', ''),
-                    'metadata': match['metadata'],
-                    'score': match['score']
-                })
+            all_results = []
+            for q in range(len(results['ids'])):
+                formatted_results = []
+                for i in range(len(results['ids'][q])):
+                    formatted_results.append({
+                        'id': results['ids'][q][i],
+                        'text': results['documents'][q][i],
+                        'metadata': results['metadatas'][q][i],
+                        'score': 1 - results['distances'][q][i]
+                    })
+                all_results.append(formatted_results)
+
+            return all_results
+
+        elif self.db_type == "pinecone":
+            # Pinecone takes one vector per query
+            all_results = []
+            for dense_embedding in dense_embeddings:
+                results = self.pinecone_index.query(
+                    vector=dense_embedding.tolist(),
+                    top_k=k,
+                    include_metadata=True,
+                    filter=filter_dict if filter_dict else None
+                )
+
+                # Format results
+                formatted_results = []
+                for match in results['matches']:
+                    formatted_results.append({
+                        'id': match['id'],
+                        'text': match['metadata'].get('text', ''),
+                        'metadata': match['metadata'],
+                        'score': match['score']
+                    })
+                all_results.append(formatted_results)
 
-            return formatted_results
+            return all_results
 
-        return []
+        return [[] for _ in dense_embeddings]
 
 
 def main():
@@ -5,11 +5,15 @@ import os
 import json
 import logging
 from datetime import datetime
+from pathlib import Path
 from threading import Lock
 
 _done_cache = None
 _done_cache_lock = Lock()
 
+_ensured_dirs = set()
+_ensured_dirs_lock = Lock()
+
 # Get project root directory for absolute paths
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -25,6 +29,19 @@ def setup_logger(name: str, log_file: str, level=logging.INFO):
     logger.propagate = False
     return logger
 
+def ensure_dir(path: str):
+    """os.makedirs(path, exist_ok=True), but only the first time per directory per process."""
+    if path in _ensured_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(path)
+
+def find_pdfs(root: str) -> list:
+    """Sorted paths of every PDF under root; the .pdf extension matches in any case."""
+    return sorted(str(p) for p in Path(root).rglob('*')
+                  if p.is_file() and p.suffix.lower() == '.pdf')
+
 def _load_done_cache(done_file: str):
     global _done_cache
     with _done_cache_lock:
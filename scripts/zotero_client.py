@@ -49,6 +49,10 @@ def format_authors(creators: list) -> List[str]:
     return authors
 
 
+# Zotero Web API caps the itemKey filter (and page size) at 50 keys per request
+ITEM_KEYS_PER_REQUEST = 50
+
+
 class ZoteroClient:
     """Wrapper around a pyzotero Web-API client."""
 
@@ -330,19 +334,40 @@ class ZoteroClient:
         return [self._record_from_item(item, collection_paths) for item in items]
 
     def items_by_keys(self, keys) -> list:
-        """Fast path: fetch only the given item keys (1 API call each).
+        """Fast path: fetch only the given item keys, up to 50 per API call.
 
-        Skips items that 404 (deleted). Returns the same record format as items().
+        Uses the itemKey filter, so M keys cost ceil(M/50) item requests instead of
+        M. A failed batch request falls back to one item() call per key. Keys still
+        missing (deleted items) are skipped. Returns the same record format as
+        items(), in the order of ``keys``.
         """
         collection_paths = self.collection_hierarchy()
-        results = []
-        for key in keys:
+        keys = list(dict.fromkeys(keys))
+        by_key = {}
+        for start in range(0, len(keys), ITEM_KEYS_PER_REQUEST):
+            batch = keys[start:start + ITEM_KEYS_PER_REQUEST]
             try:
-                item = self.raw.item(key)
+                for item in self.raw.items(itemKey=','.join(batch), limit=len(batch)):
+                    by_key[item['key']] = item
             except Exception as e:
-                print(f"Skipping {key}: cannot fetch item ({e})")
+                # 배치 요청 실패 시 50개를 통째로 누락시키지 않도록 키별로 다시 조회
+                print(f"Cannot fetch items {batch[0]}..{batch[-1]} ({e}); retrying per key")
+                for key in batch:
+                    if key in by_key:
+                        continue
+                    try:
+                        item = self.raw.item(key)
+                    except Exception as item_err:
+                        print(f"Cannot fetch item {key} ({item_err})")
+                        continue
+                    if item:
+                        by_key[item['key']] = item
+        results = []
+        for key in keys:
+            if key not in by_key:
+                print(f"Skipping {key}: item not found")
                 continue
-            results.append(self._record_from_item(item, collection_paths))
+            results.append(self._record_from_item(by_key[key], collection_paths))
         return results
 
     def download_pdf(self, item_key: str, file_key: str, dest_path: str) -> None: